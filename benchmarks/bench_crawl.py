@@ -0,0 +1,85 @@
+"""Venue crawl throughput with one shard versus several worker processes,
+and a check that a crawl killed halfway resumes without redoing work.
+
+Usage:
+    python benchmarks/bench_crawl.py [--items 1000] [--shards 8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from mock_server import MockWazeServer
+from run import client_kwargs
+
+from waze.crawl import Crawler, venue_task
+
+CRASH_FLAG = "WAZE_BENCH_CRASH_AFTER"
+
+
+def crashing_venue(waze: Any, venue_id: str) -> Any:
+    # kills its worker process at the given venue, like an OOM kill would
+    if venue_id == os.environ.get(CRASH_FLAG):
+        os._exit(1)
+    return venue_task(waze, venue_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    ids = [f"venues.{i}" for i in range(args.items)]
+    failures = []
+    with MockWazeServer(latency=args.latency) as server:
+        kwargs = client_kwargs(server.base_url, "full")
+
+        print(f"{'shards':<8}{'items/s':>9}{'slowest shard/s':>17}")
+        for shards in (1, args.shards):
+            with tempfile.TemporaryDirectory() as directory:
+                crawler = Crawler(directory, "venue", shards, client_kwargs=kwargs)
+                start = time.perf_counter()
+                stats = crawler.run(ids)
+                elapsed = time.perf_counter() - start
+            slowest = min(s.throughput for s in stats)
+            print(f"{shards:<8}{args.items / elapsed:>9.1f}{slowest:>17.1f}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            crawler = Crawler(
+                directory, crashing_venue, args.shards, client_kwargs=kwargs
+            )
+            os.environ[CRASH_FLAG] = ids[len(ids) // 2]
+            try:
+                crawler.run(ids)
+                failures.append("the crashing run did not crash")
+            except BrokenProcessPool:
+                pass
+            before = len(crawler.completed())
+            del os.environ[CRASH_FLAG]
+            server.requests.clear()
+            stats = crawler.run(ids)
+            resumed = server.requests.get("venue", 0)
+            merged = crawler.merge(os.path.join(directory, "merged.ndjson"))
+        print(
+            f"crash: {before} completed before, {resumed} requests to resume, "
+            f"{merged} merged"
+        )
+        if merged != len(ids):
+            failures.append(f"{merged} results merged for {len(ids)} items")
+        # only items whose result was written but not yet checkpointed repeat
+        if resumed > len(ids) - before + args.shards:
+            failures.append(f"{resumed} requests to resume {len(ids) - before} items")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
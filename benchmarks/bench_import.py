@@ -0,0 +1,104 @@
+"""Cold import and client construction time, each in a fresh interpreter.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 15] [--output import.json]
+    python benchmarks/bench_import.py --compare import.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> statements timed after interpreter startup
+CASES: Dict[str, str] = {
+    "import waze": "import waze",
+    "Countries.MY": "from waze import Countries; Countries.MY.value",
+    "import Waze": "from waze import Waze",
+    "Waze()": "from waze import Waze, Countries; Waze(locale=Countries.MY)",
+    "import AsyncWaze": "from waze import AsyncWaze",
+    "first parse": (
+        "from waze.parsing import parse_locations; "
+        "parse_locations([{'name': 'a', 'cleanName': 'a', 'address': 'b', "
+        "'venueId': 'c', 'latLng': {'lat': 1, 'lng': 2}}])"
+    ),
+}
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(statement: str, repeat: int) -> List[float]:
+    """Milliseconds to run `statement` in `repeat` fresh interpreters."""
+    env = {**os.environ, "PYTHONPATH": ROOT, "PYTHONDONTWRITEBYTECODE": "1"}
+    times = []
+    for _ in range(repeat):
+        out = subprocess.check_output(
+            [sys.executable, "-c", SCRIPT.format(statement=statement)],
+            env=env,
+            text=True,
+        )
+        times.append(float(out) * 1000)
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="previous JSON results to compare with")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    print(f"{'case':<18}{'min (ms)':>10}{'median (ms)':>13}")
+    for name, statement in CASES.items():
+        times = measure(statement, args.repeat)
+        results[name] = {"min_ms": min(times), "median_ms": statistics.median(times)}
+        line = f"{name:<18}{min(times):>10.1f}{statistics.median(times):>13.1f}"
+        if name in baseline:
+            line += f"{results[name]['median_ms'] / baseline[name]['median_ms']:>8.2f}x"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "meta": {
+                        "revision": git_revision(),
+                        "python": sys.version.split()[0],
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
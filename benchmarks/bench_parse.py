@@ -0,0 +1,84 @@
+"""Parse time per endpoint for each `validate` mode.
+
+Usage:
+    python benchmarks/bench_parse.py [--vertices 3000] [--number 200]
+"""
+
+import argparse
+import timeit
+from typing import Any, Callable, Dict
+
+from fixtures import load_payloads
+
+from waze import Coordinate
+from waze.parsing import (
+    decode,
+    loads,
+    parse_locations,
+    parse_plan,
+    parse_review,
+    parse_route,
+    parse_venue,
+)
+
+MODES = ("full", "fast", "none")
+
+
+def parsers() -> Dict[str, Callable[[Any, str], Any]]:
+    src = Coordinate(latitude=1.3068, longitude=103.7884)
+    dst = Coordinate(latitude=3.0815, longitude=101.5851)
+    return {
+        "geocode": parse_locations,
+        "venue": parse_venue,
+        "reviews": parse_review,
+        "plan": lambda payload, mode: parse_plan(src, dst, payload, validate=mode),
+    }
+
+
+def parse_time(body: bytes, endpoint: str, mode: str, number: int = 200) -> float:
+    """Best-of-5 time in microseconds to decode and parse `body`."""
+    parse = parsers()[endpoint]
+    timer = timeit.Timer(lambda: parse(decode(body, mode), mode))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def route_time(body: bytes, mode: str, number: int = 200) -> float:
+    """Best-of-5 time in microseconds to build the fastest route of an already
+    decoded plan, which leaves out the decoding every mode shares."""
+    src = Coordinate(latitude=1.3068, longitude=103.7884)
+    dst = Coordinate(latitude=3.0815, longitude=101.5851)
+    route = loads(body)["alternatives"][0]
+    timer = timeit.Timer(lambda: parse_route(src, dst, route, validate=mode))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--vertices", type=int, help="synthetic fixtures with a plan this long"
+    )
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.vertices)
+    results = {
+        f"{endpoint}.{mode}": parse_time(
+            payloads[endpoint], endpoint, mode, args.number
+        )
+        for endpoint in payloads
+        for mode in MODES
+    }
+
+    print(f"{'endpoint':<10}" + "".join(f"{m + ' (us)':>14}" for m in MODES))
+    for endpoint in payloads:
+        row = "".join(f"{results[f'{endpoint}.{m}']:>14.1f}" for m in MODES)
+        print(f"{endpoint:<10}{row}")
+
+    route = "".join(
+        f"{route_time(payloads['plan'], m, args.number):>14.1f}" for m in MODES[:2]
+    )
+    print(f"{'route':<10}{route}{'-':>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Size and load time of route history kept as JSON lines of `model_dump`
+versus a `RouteStore` file.
+
+Polls a few corridors repeatedly, most polls returning a geometry seen before,
+as happens when a corridor is monitored every few minutes.
+
+Usage:
+    python benchmarks/bench_store.py [--polls 500] [--corridors 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from fixtures import load_payloads
+
+from waze import Coordinate
+from waze.geometry import GeoPath
+from waze.models import WazeTravelPlan
+from waze.parsing import decode, parse_plan
+from waze.store import RouteStore, RouteStoreWriter
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=500)
+    parser.add_argument("--corridors", type=int, default=5)
+    parser.add_argument("--variants", type=int, default=3)
+    args = parser.parse_args()
+
+    src = Coordinate(latitude=1.3068, longitude=103.7884)
+    base = parse_plan(src, src, decode(load_payloads()["plan"], "full"), 1)
+    coords = base.geoPath.to_list()
+    # a few alternative geometries per corridor, shifted so none coincide
+    variants = [
+        [
+            GeoPath.from_coords(
+                Coordinate(
+                    latitude=c.latitude + corridor * 0.01,
+                    longitude=c.longitude + variant * 1e-5,
+                )
+                for c in coords
+            )
+            for variant in range(args.variants)
+        ]
+        for corridor in range(args.corridors)
+    ]
+    random.seed(0)
+    plans = [
+        base.model_copy(
+            update={
+                "geoPath": random.choice(random.choice(variants)),
+                "totalSeconds": random.randint(1800, 5400),
+            }
+        )
+        for _ in range(args.polls)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "routes.ndjson")
+        store_path = os.path.join(directory, "routes.wzrs")
+
+        start = time.perf_counter()
+        with open(json_path, "w") as f:
+            for plan in plans:
+                f.write(plan.model_dump_json() + "\n")
+        json_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with RouteStoreWriter(store_path) as writer:
+            for i, plan in enumerate(plans):
+                writer.write(plan, timestamp=i * 300)
+        store_write = time.perf_counter() - start
+
+        index = args.polls // 2
+        start = time.perf_counter()
+        with open(json_path) as f:
+            for i, line in enumerate(f):
+                if i == index:
+                    WazeTravelPlan.model_validate(json.loads(line))
+                    break
+        json_one = time.perf_counter() - start
+        start = time.perf_counter()
+        with open(json_path) as f:
+            for line in f:
+                WazeTravelPlan.model_validate(json.loads(line))
+        json_all = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with RouteStore(store_path) as store:
+            store[index]
+        store_one = time.perf_counter() - start
+        start = time.perf_counter()
+        with RouteStore(store_path) as store:
+            list(store)
+        store_all = time.perf_counter() - start
+
+        sizes = os.path.getsize(json_path), os.path.getsize(store_path)
+
+    print(f"{args.polls} polls, {len(coords)} vertices each")
+    print(f"{'format':<8}{'MiB':>9}{'write s':>9}{'one route ms':>14}{'all s':>8}")
+    for name, size, write, one, every in (
+        ("json", sizes[0], json_write, json_one, json_all),
+        ("store", sizes[1], store_write, store_one, store_all),
+    ):
+        print(
+            f"{name:<8}{size / 2**20:>9.2f}{write:>9.2f}{one * 1000:>14.2f}"
+            f"{every:>8.2f}"
+        )
+    print(f"geometries stored once: {writer.deduplicated} of {args.polls} reused")
+
+
+if __name__ == "__main__":
+    main()
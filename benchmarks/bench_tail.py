@@ -0,0 +1,92 @@
+"""Tail latency of geocode calls against a mock server where a share of
+requests stall, with and without hedging, and how fast a circuit breaker fails
+once the endpoint starts erroring.
+
+Usage:
+    python benchmarks/bench_tail.py [--requests 500] [--stall-rate 0.03]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from mock_server import MockWazeServer
+from run import client_kwargs, percentile
+
+from waze import CircuitBreaker, CircuitOpenError, Hedge, Waze, WazeHTTPError
+
+
+def latencies(
+    base_url: str, n: int, hedge: Optional[Hedge], threads: int
+) -> Dict[str, Any]:
+    hedging = {"geocode": hedge} if hedge is not None else None
+    with Waze(
+        pool_maxsize=threads, hedging=hedging, **client_kwargs(base_url, "full")
+    ) as waze:
+
+        def one(i: int) -> float:
+            start = time.perf_counter()
+            waze.geocode(f"query {i}")
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            values: List[float] = list(executor.map(one, range(n)))
+    return {
+        "p50_ms": percentile(values, 50) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+
+def fail_fast(base_url: str, n: int) -> Dict[str, float]:
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=60)
+    kwargs = {**client_kwargs(base_url, "full"), "backoff_factor": 0.05}
+    result = {"errors": 0, "rejected": 0, "seconds": 0.0}
+    with Waze(breakers={"geocode": breaker}, **kwargs) as waze:
+        start = time.perf_counter()
+        for i in range(n):
+            try:
+                waze.geocode(f"query {i}")
+            except CircuitOpenError:
+                result["rejected"] += 1
+            except WazeHTTPError:
+                result["errors"] += 1
+        result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--stall", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with MockWazeServer(
+        latency=args.latency, stall_rate=args.stall_rate, stall=args.stall
+    ) as server:
+        hedge = Hedge(quantile=0.95)
+        rows = [
+            ("plain", latencies(server.base_url, args.requests, None, args.threads)),
+            ("hedged", latencies(server.base_url, args.requests, hedge, args.threads)),
+        ]
+        print(f"{'mode':<10}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        for mode, r in rows:
+            print(
+                f"{mode:<10}{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}"
+            )
+        print(f"duplicates sent: {hedge.hedged}, won: {hedge.wins}")
+
+        server.stall_rate, server.error_rate = 0.0, 1.0
+        r = fail_fast(server.base_url, 100)
+        print(
+            f"breaker: {r['errors']} errors, {r['rejected']} rejected "
+            f"in {r['seconds']:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Autocomplete requests and keystroke latency when typing into a search box,
+with a geocode call per keystroke versus `Typeahead`.
+
+The mock server answers every query with the same few locations, a complete
+result set, as most specific queries get once a few characters are typed.
+
+Usage:
+    python benchmarks/bench_typeahead.py [--interval 0.2] [--latency 0.05]
+"""
+
+import argparse
+import json
+import threading
+import time
+from typing import Dict, List
+
+from fixtures import load_payloads
+from mock_server import MockWazeServer
+from run import client_kwargs, percentile
+
+from waze import Typeahead, Waze
+
+QUERIES = ["subang parade", "sunway pyramid", "mid valley", "suria klcc"]
+
+
+def per_keystroke(waze: Waze, interval: float) -> List[float]:
+    latencies = []
+    for query in QUERIES:
+        for i in range(1, len(query) + 1):
+            start = time.perf_counter()
+            waze.geocode(query[:i])
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            time.sleep(max(interval - elapsed, 0))
+    return latencies
+
+
+def typeahead(waze: Waze, interval: float, debounce: float) -> List[float]:
+    box = Typeahead(waze, debounce=debounce)
+    latencies: List[float] = []
+    typed: Dict[str, float] = {}
+    done = threading.Event()
+
+    def show(text: str, results: list) -> None:
+        latencies.append(time.perf_counter() - typed[text])
+        if text in QUERIES:
+            done.set()
+
+    for query in QUERIES:
+        box.cache.clear()  # no help from the previous query
+        done.clear()
+        for i in range(1, len(query) + 1):
+            typed[query[:i]] = time.perf_counter()
+            box.type(query[:i], show)
+            time.sleep(interval)
+        done.wait(5)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interval", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--debounce", type=float, default=0.15)
+    args = parser.parse_args()
+
+    payloads = load_payloads()
+    payloads["geocode"] = json.dumps(json.loads(payloads["geocode"])[:4]).encode()
+    keystrokes = sum(len(q) for q in QUERIES)
+    print(f"{keystrokes} keystrokes, {args.interval * 1000:.0f}ms apart")
+    print(f"{'mode':<14}{'requests':>9}{'shown':>7}{'p50 ms':>9}{'p99 ms':>9}")
+    with MockWazeServer(payloads=payloads, latency=args.latency) as server:
+        for mode in ("per-keystroke", "typeahead"):
+            server.requests.clear()
+            with Waze(**client_kwargs(server.base_url, "full")) as waze:
+                if mode == "typeahead":
+                    latencies = typeahead(waze, args.interval, args.debounce)
+                else:
+                    latencies = per_keystroke(waze, args.interval)
+            print(
+                f"{mode:<14}{server.requests.get('geocode', 0):>9}"
+                f"{len(latencies):>7}{percentile(latencies, 50) * 1000:>9.1f}"
+                f"{percentile(latencies, 99) * 1000:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
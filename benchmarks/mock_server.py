@@ -0,0 +1,187 @@
+"""Local mock of the Waze live-map API serving fixture responses.
+
+Usage:
+    python benchmarks/mock_server.py --port 8765 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from fixtures import load_payloads
+
+
+class MockWazeServer:
+    """Threaded HTTP server replaying fixtures for `user-drive`,
+    `autocomplete`, `venues/{id}` and `venues/reviews/{id}`.
+
+    Args:
+        payloads (Dict[str, bytes], optional): Body per endpoint. Defaults to
+            `fixtures.load_payloads()`.
+        latency (float, optional): Mean added latency in seconds. Defaults to 0.
+        jitter (float, optional): Uniform jitter around `latency`. Defaults to 0.
+        error_rate (float, optional): Share of requests answered with
+            `error_status`. Defaults to 0.
+        error_status (int, optional): Status of injected errors. Defaults to 503.
+        stall_rate (float, optional): Share of requests delayed by another
+            `stall` seconds, a latency tail independent per request.
+            Defaults to 0.
+        stall (float, optional): Added delay of stalled requests in seconds.
+            Defaults to 1.
+        fail_first (int, optional): Number of first requests answered with
+            `error_status`, for deterministic retry tests. Defaults to 0.
+        port (int, optional): Port to bind, 0 picks a free one. Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        payloads: Optional[Dict[str, bytes]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        stall_rate: float = 0.0,
+        stall: float = 1.0,
+        fail_first: int = 0,
+        port: int = 0,
+    ):
+        self.payloads = payloads if payloads is not None else load_payloads()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.fail_first = fail_first
+        self.requests: Dict[str, int] = {}
+        self.connections = 0  # TCP connections accepted
+        self.in_flight = 0
+        self.peak_in_flight = 0  # most requests handled at once
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    def start(self) -> "MockWazeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockWazeServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _endpoint(self, path: str) -> Optional[str]:
+        if path.startswith("/user-drive"):
+            return "plan"
+        if path.startswith("/autocomplete"):
+            return "geocode"
+        if path.startswith("/venues/reviews/"):
+            return "reviews"
+        if path.startswith("/venues/"):
+            return "venue"
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def handle(self) -> None:
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up, e.g. a cancelled hedge
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def _reply(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                endpoint = server._endpoint(self.path)
+                with server._lock:
+                    server.requests[endpoint] = server.requests.get(endpoint, 0) + 1
+                    failing = server.fail_first > 0
+                    if failing:
+                        server.fail_first -= 1
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                try:
+                    self._respond(endpoint, failing)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def _respond(self, endpoint: Optional[str], failing: bool) -> None:
+                delay = server.latency + random.uniform(-server.jitter, server.jitter)
+                if random.random() < server.stall_rate:
+                    delay += server.stall
+                if delay > 0:
+                    time.sleep(delay)
+
+                if endpoint is None:
+                    status, body = 404, b"{}"
+                elif failing or random.random() < server.error_rate:
+                    status, body = server.error_status, b"{}"
+                else:
+                    status, body = 200, server.payloads[endpoint]
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _reply
+            do_POST = _reply
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Waze API server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = MockWazeServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        stall_rate=args.stall_rate,
+        stall=args.stall,
+        port=args.port,
+    ).start()
+    print(f"Serving fixtures on {server.base_url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,249 @@
+"""Throughput, latency, parse time and memory of the clients against the
+local mock server.
+
+Usage:
+    python benchmarks/run.py --concurrency 1,8,32 --requests 500 \
+        --latency 0.02 --error-rate 0.01 --output results.json
+    python benchmarks/run.py --compare baseline.json --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from bench_parse import parse_time
+from fixtures import ENDPOINTS, load_payloads
+from mock_server import MockWazeServer
+
+from waze import AsyncWaze, Coordinate, Countries, Waze
+from waze.models import WazeVenue
+
+SRC = Coordinate(latitude=1.3068, longitude=103.7884)
+DST = Coordinate(latitude=3.0815, longitude=101.5851)
+VENUE = WazeVenue(googlePlaceId="ChIJ")
+
+
+def calls(waze: Any) -> Dict[str, Callable[[int], Any]]:
+    # vary inputs so requests are never coalesced or cached
+    return {
+        "plan": lambda i: waze.plan(
+            SRC, Coordinate(latitude=DST.latitude + i * 1e-6, longitude=DST.longitude)
+        ),
+        "geocode": lambda i: waze.geocode(f"subang parade {i}"),
+        "venue": lambda i: waze.venue(str(i)),
+        "reviews": lambda i: waze.reviews(
+            VENUE.model_copy(update={"googlePlaceId": str(i)})
+        ),
+    }
+
+
+def client_kwargs(base_url: str, validate: str) -> Dict[str, Any]:
+    return dict(
+        locale=Countries.MY,
+        log_level="quiet",
+        _base_url=base_url,
+        coalesce_requests=False,
+        validate=validate,
+        max_retries=3,
+        backoff_factor=0.0,
+    )
+
+
+def run_sync(base_url: str, endpoint: str, n: int, concurrency: int, validate: str):
+    waze = Waze(pool_maxsize=concurrency, **client_kwargs(base_url, validate))
+    call = calls(waze)[endpoint]
+    latencies: List[float] = []
+    errors = 0
+
+    def timed(i: int) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            call(i)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(n)))
+    elapsed = time.perf_counter() - start
+    waze.close()
+    return latencies, errors, elapsed
+
+
+def run_async(base_url: str, endpoint: str, n: int, concurrency: int, validate: str):
+    async def main():
+        async with AsyncWaze(
+            max_concurrency=concurrency,
+            max_connections=concurrency,
+            **client_kwargs(base_url, validate),
+        ) as waze:
+            call = calls(waze)[endpoint]
+            latencies: List[float] = []
+            errors = 0
+
+            async def timed(i: int) -> None:
+                nonlocal errors
+                start = time.perf_counter()
+                try:
+                    await call(i)
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+            indices = iter(range(n))
+
+            async def worker() -> None:
+                for i in indices:
+                    await timed(i)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            return latencies, errors, time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+RUNNERS = {"sync": run_sync, "async": run_async}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def peak_memory(run: Callable[..., Any], *args) -> float:
+    """Peak traced allocations in MiB, measured in a separate pass so tracing
+    does not skew the latency numbers."""
+    tracemalloc.start()
+    try:
+        run(*args)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {
+            (r["client"], r["endpoint"], r["concurrency"]): r
+            for r in json.load(f)["results"]
+        }
+    print(f"\nvs {baseline_path}")
+    for r in results:
+        old = baseline.get((r["client"], r["endpoint"], r["concurrency"]))
+        if old is None:
+            continue
+        print(
+            f"{r['client']:<7}{r['endpoint']:<9}c={r['concurrency']:<4}"
+            f"rps {r['rps'] / old['rps']:>6.2f}x  "
+            f"p99 {r['p99_ms'] / old['p99_ms']:>6.2f}x  "
+            f"parse {r['parse_us'] / old['parse_us']:>6.2f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Waze client benchmarks")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--clients", default="sync,async")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--validate", default="full", choices=("full", "fast", "none"))
+    parser.add_argument(
+        "--vertices", type=int, help="synthetic fixtures with a plan this long"
+    )
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="previous JSON results to compare with")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.vertices)
+    server = MockWazeServer(
+        payloads, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate
+    ).start()
+
+    results = []
+    print(
+        f"{'client':<7}{'endpoint':<9}{'conc':>5}{'rps':>9}{'p50 ms':>9}"
+        f"{'p99 ms':>9}{'parse us':>10}{'mem MiB':>9}{'errors':>7}"
+    )
+    try:
+        for endpoint in args.endpoints.split(","):
+            parse_us = parse_time(payloads[endpoint], endpoint, args.validate, 50)
+            for client in args.clients.split(","):
+                run = RUNNERS[client]
+                for concurrency in map(int, args.concurrency.split(",")):
+                    run_args = (
+                        server.base_url,
+                        endpoint,
+                        args.requests,
+                        concurrency,
+                        args.validate,
+                    )
+                    latencies, errors, elapsed = run(*run_args)
+                    memory = peak_memory(
+                        run, *run_args[:2], min(args.requests, 100), *run_args[3:]
+                    )
+                    result = {
+                        "client": client,
+                        "endpoint": endpoint,
+                        "concurrency": concurrency,
+                        "requests": args.requests,
+                        "errors": errors,
+                        "rps": args.requests / elapsed,
+                        "p50_ms": percentile(latencies, 50) * 1e3,
+                        "p99_ms": percentile(latencies, 99) * 1e3,
+                        "parse_us": parse_us,
+                        "peak_mem_mib": memory,
+                    }
+                    results.append(result)
+                    print(
+                        f"{client:<7}{endpoint:<9}{concurrency:>5}{result['rps']:>9.1f}"
+                        f"{result['p50_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+                        f"{parse_us:>10.1f}{memory:>9.2f}{errors:>7}"
+                    )
+    finally:
+        server.stop()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
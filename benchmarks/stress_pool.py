@@ -0,0 +1,132 @@
+"""Stress test of `WazePool` shared by many threads against the mock server.
+
+Checks that every call succeeds, that concurrent first requests agree on one
+inferred locale, and that connections are reused rather than opened per
+request, and compares throughput with a new client per request.
+
+Usage:
+    python benchmarks/stress_pool.py [--threads 64] [--size 16] [--requests 4000]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from mock_server import MockWazeServer
+from run import calls, client_kwargs, percentile
+
+from waze import Coordinate, Waze, WazePool
+
+# points in different countries, so a racy locale inference would disagree
+ORIGINS = [
+    Coordinate(latitude=1.3068, longitude=103.7884),  # SG
+    Coordinate(latitude=3.0815, longitude=101.5851),  # MY
+    Coordinate(latitude=13.7563, longitude=100.5018),  # TH
+    Coordinate(latitude=-6.2088, longitude=106.8456),  # ID
+]
+
+
+def hammer(call: Callable[[str, int], Any], n: int, threads: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: List[Exception] = []
+    lock = threading.Lock()
+    endpoints = list(calls(None))
+
+    def one(i: int) -> None:
+        endpoint = random.choice(endpoints)
+        start = time.perf_counter()
+        try:
+            call(endpoint, i)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(one, range(n)))
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": n / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": errors,
+    }
+
+
+def check_locale(base_url: str, threads: int, size: int) -> bool:
+    kwargs = client_kwargs(base_url, "full")
+    del kwargs["locale"]
+    with WazePool(size=size, **kwargs) as pool:
+        barrier = threading.Barrier(threads)
+
+        def first(i: int) -> None:
+            barrier.wait()
+            pool.plan(ORIGINS[i % len(ORIGINS)], ORIGINS[(i + 1) % len(ORIGINS)])
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(first, range(threads)))
+        locales = {(c.locale.latitude, c.locale.longitude) for c in pool._clients}
+        return len(locales) == 1 and pool.locale is not None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--size", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    failures = []
+    with MockWazeServer(latency=args.latency) as server:
+        kwargs = client_kwargs(server.base_url, "full")
+
+        if not check_locale(server.base_url, args.threads, args.size):
+            failures.append("sessions inferred different locales")
+
+        server.connections = 0
+        with WazePool(size=args.size, **kwargs) as pool:
+            pooled = calls(pool)
+            result = hammer(lambda e, i: pooled[e](i), args.requests, args.threads)
+            sessions = len(pool._clients)
+        pool_connections = server.connections
+
+        server.connections = 0
+
+        def per_request(endpoint: str, i: int) -> Any:
+            with Waze(**kwargs) as waze:
+                return calls(waze)[endpoint](i)
+
+        baseline = hammer(per_request, args.requests, args.threads)
+        baseline_connections = server.connections
+
+    print(f"{'mode':<14}{'rps':>9}{'p50 ms':>9}{'p99 ms':>9}{'conns':>7}{'errors':>8}")
+    for mode, r, conns in (
+        ("pool", result, pool_connections),
+        ("per-request", baseline, baseline_connections),
+    ):
+        print(
+            f"{mode:<14}{r['rps']:>9.1f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+            f"{conns:>7}{len(r['errors']):>8}"
+        )
+    print(f"pool sessions: {sessions}/{args.size}")
+
+    if result["errors"]:
+        failures.append(f"{len(result['errors'])} errors, e.g. {result['errors'][0]!r}")
+    if sessions > args.size:
+        failures.append(f"{sessions} sessions for a pool of {args.size}")
+    if pool_connections > args.size:
+        failures.append(f"{pool_connections} connections for a pool of {args.size}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import os
+import sys
+from typing import Any, Callable, Dict, Iterator, List
+
+import pytest
+
+# the benchmarks' mock server doubles as the stub API of the tests
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks")
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from fixtures import load_payloads  # noqa: E402
+from mock_server import MockWazeServer  # noqa: E402
+
+from waze import Countries  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def payloads() -> Dict[str, bytes]:
+    return load_payloads()
+
+
+@pytest.fixture
+def mock_server(
+    payloads: Dict[str, bytes],
+) -> Iterator[Callable[..., MockWazeServer]]:
+    """Starts `MockWazeServer`s with the given options, stopped after the test."""
+    servers: List[MockWazeServer] = []
+
+    def start(**kwargs: Any) -> MockWazeServer:
+        kwargs.setdefault("payloads", payloads)
+        server = MockWazeServer(**kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def client_kwargs() -> Callable[..., Dict[str, Any]]:
+    """Client arguments pointing at a server, without backoff sleeps."""
+
+    def kwargs(server: MockWazeServer, **overrides: Any) -> Dict[str, Any]:
+        return {
+            "locale": Countries.MY,
+            "log_level": "quiet",
+            "_base_url": server.base_url,
+            "coalesce_requests": False,
+            "max_retries": 3,
+            "backoff_factor": 0.0,
+            **overrides,
+        }
+
+    return kwargs
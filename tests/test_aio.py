@@ -0,0 +1,132 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from waze import AsyncWaze, MemoryCache, WazeHTTPError  # noqa: E402
+from waze.models import WazeVenue  # noqa: E402
+from waze.utils import make_retry  # noqa: E402
+
+
+def run(client_kwargs, server, calls, **overrides):
+    """Runs `calls(waze)` on a fresh `AsyncWaze` against `server`."""
+
+    async def main():
+        async with AsyncWaze(**client_kwargs(server, **overrides)) as waze:
+            return await calls(waze)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_until_success(mock_server, client_kwargs, status):
+    server = mock_server(fail_first=2, error_status=status)
+    locations = run(client_kwargs, server, lambda waze: waze.geocode("subang"))
+    assert len(locations) == 10
+    assert server.requests["geocode"] == 3
+
+
+def test_gives_up_after_max_retries(mock_server, client_kwargs):
+    server = mock_server(error_rate=1.0, error_status=503)
+    with pytest.raises(WazeHTTPError) as info:
+        run(client_kwargs, server, lambda waze: waze.geocode("subang"))
+    assert info.value.status_code == 503
+    assert server.requests["geocode"] == 4
+
+
+def test_client_errors_are_not_retried(mock_server, client_kwargs):
+    server = mock_server(error_rate=1.0, error_status=404)
+    with pytest.raises(WazeHTTPError) as info:
+        run(client_kwargs, server, lambda waze: waze.geocode("subang"))
+    assert info.value.status_code == 404
+    assert server.requests["geocode"] == 1
+
+
+def test_backoff_follows_retry_policy(mock_server, client_kwargs, monkeypatch):
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", record)
+    server = mock_server(fail_first=3)
+    run(
+        client_kwargs,
+        server,
+        lambda waze: waze.venue("1"),
+        backoff_factor=0.5,
+    )
+
+    # the same urllib3 policy the sync client mounts
+    retry, expected = make_retry(3, 0.5), []
+    for _ in range(3):
+        retry = retry.increment("GET", "/", error=ConnectionError())
+        expected.append(retry.get_backoff_time())
+    assert delays == expected
+
+
+def test_connections_are_reused(mock_server, client_kwargs):
+    server = mock_server()
+
+    async def sequential(waze):
+        for i in range(20):
+            await waze.geocode(f"subang {i}")
+
+    run(client_kwargs, server, sequential)
+    assert server.requests["geocode"] == 20
+    assert server.connections == 1
+
+
+def test_pool_bounds_connections(mock_server, client_kwargs):
+    server = mock_server(latency=0.02)
+
+    async def burst(waze):
+        await asyncio.gather(*(waze.venue(str(i)) for i in range(50)))
+
+    run(client_kwargs, server, burst, max_connections=4, max_concurrency=50)
+    assert server.requests["venue"] == 50
+    assert server.connections <= 4
+
+
+def test_max_concurrency_limits_requests_in_flight(mock_server, client_kwargs):
+    server = mock_server(latency=0.05)
+
+    async def burst(waze):
+        start = time.perf_counter()
+        await asyncio.gather(*(waze.venue(str(i)) for i in range(12)))
+        return time.perf_counter() - start
+
+    elapsed = run(client_kwargs, server, burst, max_concurrency=3)
+    assert server.peak_in_flight == 3
+    # four waves of three requests
+    assert elapsed >= 4 * 0.05
+
+
+def test_created_outside_event_loop(mock_server, client_kwargs):
+    server = mock_server()
+    waze = AsyncWaze(**client_kwargs(server))
+
+    async def use():
+        try:
+            return await asyncio.gather(*(waze.venue(str(i)) for i in range(5)))
+        finally:
+            await waze.aclose()
+
+    assert len(asyncio.run(use())) == 5
+
+
+def test_venues_without_reviews_are_cached(mock_server, client_kwargs, payloads):
+    server = mock_server(error_rate=1.0, error_status=500)
+    venue = WazeVenue(**json.loads(payloads["venue"]))
+
+    async def calls(waze):
+        return [await waze.reviews(venue) for _ in range(3)]
+
+    results = run(client_kwargs, server, calls, cache=MemoryCache(), max_retries=2)
+    assert results == [[], [], []]
+    assert server.requests["reviews"] == 3
@@ -0,0 +1,168 @@
+import json
+
+import pytest
+
+from waze import Coordinate, MemoryCache, PlanCache, SqliteCache, Waze
+from waze import cache as cache_module
+from waze.models import WazeVenue
+
+
+class Clock:
+    """Stands in for the `time` module of `waze.cache`."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    monotonic = time
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCache(maxsize=3)
+    else:
+        cache = SqliteCache(str(tmp_path / "cache.db"), maxsize=3, evict_every=1)
+        yield cache
+        cache.close()
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.set("a", {"v": 1}, ttl=10)
+    cache.set("b", {"v": 2})
+    clock.now += 9
+    assert cache.get("a") == {"v": 1}
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.get("b") == {"v": 2}  # no ttl, never expires
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entry_is_evicted(cache, clock):
+    for key in "abc":
+        cache.set(key, key)
+        clock.now += 1
+    assert cache.get("a") == "a"  # "b" is now the least recently used
+    clock.now += 1
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+    assert len(cache) == 3
+
+
+def test_sqlite_cache_persists(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    cache = SqliteCache(path)
+    cache.set("a", [1, 2], ttl=60)
+    cache.close()
+    cache = SqliteCache(path)
+    assert cache.get("a") == [1, 2]
+    clock.now += 60
+    assert cache.get("a") is None
+    cache.close()
+
+
+def test_client_serves_cached_responses_until_ttl(mock_server, client_kwargs, clock):
+    server = mock_server()
+    kwargs = client_kwargs(server, cache=MemoryCache(), cache_ttl={"geocode": 30})
+    with Waze(**kwargs) as waze:
+        first = waze.geocode("Subang Parade")
+        assert waze.geocode("  subang parade ") == first
+        assert server.requests["geocode"] == 1
+        clock.now += 30
+        waze.geocode("subang parade")
+        assert server.requests["geocode"] == 2
+    assert waze.cache_stats.hits == {"geocode": 1}
+    assert waze.cache_stats.misses == {"geocode": 2}
+
+
+SUBANG = Coordinate(latitude=3.0815, longitude=101.5851)
+STAR_VISTA = Coordinate(latitude=1.3068, longitude=103.7884)
+
+
+def near(point, meters_north=0.0, meters_east=0.0):
+    return Coordinate(
+        latitude=point.latitude + meters_north / 111_320,
+        longitude=point.longitude + meters_east / 111_320,
+    )
+
+
+def plan_payload(etas=()):
+    histogram = [{"eta": eta, "routeLengthInMinutes": 30, "text": ""} for eta in etas]
+    return {"alternatives": [{"response": {"etaHistograms": histogram}}]}
+
+
+@pytest.mark.parametrize("geohash_precision", [None, 7])
+def test_plan_cache_shares_entries_within_a_cell(clock, geohash_precision):
+    plans = PlanCache(grid_meters=50, geohash_precision=geohash_precision)
+    plans.put(SUBANG, STAR_VISTA, 1, plan_payload())
+    clock.now += 5
+
+    payload, age = plans.get(near(SUBANG, 2, 2), near(STAR_VISTA, -2, 1))
+    assert payload == plan_payload()
+    assert age == 5
+    assert plans.get(near(SUBANG, 500), STAR_VISTA) is None
+    assert plans.get(SUBANG, near(STAR_VISTA, meters_east=500)) is None
+
+
+def test_plan_cache_keys_do_not_collide(clock):
+    plans = PlanCache()
+    keys = {
+        plans.key(SUBANG, STAR_VISTA),
+        plans.key(STAR_VISTA, SUBANG),
+        plans.key(SUBANG, STAR_VISTA, n_paths=3),
+        # cells on either side of the equator and the prime meridian
+        plans.key(Coordinate(latitude=1e-5, longitude=1e-5), SUBANG),
+        plans.key(Coordinate(latitude=-1e-5, longitude=1e-5), SUBANG),
+        plans.key(Coordinate(latitude=1e-5, longitude=-1e-5), SUBANG),
+    }
+    assert len(keys) == 6
+
+
+def test_plan_cache_entries_expire_after_ttl(clock):
+    plans = PlanCache(ttl=60)
+    plans.put(SUBANG, STAR_VISTA, 1, plan_payload())
+    clock.now += 59
+    assert plans.get(SUBANG, STAR_VISTA) is not None
+    clock.now += 1
+    assert plans.get(SUBANG, STAR_VISTA) is None
+
+
+def test_plan_cache_expires_with_the_histogram_slot(clock):
+    plans = PlanCache(ttl=600)
+    now = clock.now
+    plans.put(SUBANG, STAR_VISTA, 1, plan_payload([now - 300, now + 30, now + 930]))
+    clock.now += 29
+    assert plans.get(SUBANG, STAR_VISTA) is not None
+    clock.now += 1
+    assert plans.get(SUBANG, STAR_VISTA) is None
+
+    # a histogram that already ended leaves the ttl alone
+    plans.put(SUBANG, STAR_VISTA, 1, plan_payload([clock.now - 60]))
+    clock.now += 599
+    assert plans.get(SUBANG, STAR_VISTA) is not None
+
+
+def test_client_caches_venues_without_reviews(
+    mock_server, client_kwargs, clock, payloads
+):
+    server = mock_server(error_rate=1.0, error_status=500)
+    venue = WazeVenue(**json.loads(payloads["venue"]))
+    kwargs = client_kwargs(server, cache=MemoryCache(), max_retries=2)
+    with Waze(**kwargs) as waze:
+        assert waze.reviews(venue) == []
+        assert server.requests["reviews"] == 3
+        assert waze.reviews(venue) == []
+        assert server.requests["reviews"] == 3
+        clock.now += waze.cache_ttl["no_reviews"]
+        assert waze.reviews(venue) == []
+        assert server.requests["reviews"] == 6
@@ -0,0 +1,28 @@
+import pytest
+
+from waze import Coordinate, Countries
+
+
+def test_value_is_a_cached_coordinate():
+    assert Countries.MY.value == Coordinate(latitude=4.210484, longitude=101.975766)
+    assert Countries.MY.value is Countries.MY.value
+    assert Countries.MY.centroid == (4.210484, 101.975766)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        Countries.MY.value,
+        Coordinate(latitude=4.210484, longitude=101.975766),
+        (4.210484, 101.975766),
+    ],
+)
+def test_members_are_found_by_value(value):
+    assert Countries(value) is Countries.MY
+
+
+def test_unknown_values_are_rejected():
+    with pytest.raises(ValueError):
+        Countries(Coordinate(latitude=4.2, longitude=101.9))
+    with pytest.raises(ValueError):
+        Countries("MY")
@@ -0,0 +1,63 @@
+import json
+
+from waze.crawl import Crawler, shard_of
+
+
+def echo(waze, item):
+    return {"item": item}
+
+
+def test_resumes_after_torn_logs(mock_server, client_kwargs, tmp_path):
+    server = mock_server()
+    kwargs = client_kwargs(server)
+    ids = [str(i) for i in range(60)]
+    crawler = Crawler(str(tmp_path), "venue", shards=3, client_kwargs=kwargs)
+
+    stats = crawler.run(ids[:40])
+    assert sum(s.done for s in stats) == 40
+    assert server.requests["venue"] == 40
+
+    # a crash mid-write: a half written result and a torn checkpoint line
+    shard = shard_of(ids[0], 3)
+    with open(tmp_path / f"shard-{shard:03d}.ndjson", "ab") as f:
+        f.write(b'{"key": "99", "res')
+    log = tmp_path / f"shard-{shard:03d}.log"
+    lines = log.read_bytes().splitlines(keepends=True)
+    log.write_bytes(b"".join(lines[:-1]) + lines[-1][:-2])
+    torn = json.loads(lines[-1])
+    assert torn not in crawler.completed()
+
+    server.requests.clear()
+    stats = crawler.run(ids)
+    # the 20 new items and the one whose checkpoint was torn
+    assert server.requests["venue"] == 21
+    assert sum(s.skipped for s in stats) == 39
+    assert crawler.completed() == set(ids)
+
+    merged = tmp_path / "merged.ndjson"
+    assert crawler.merge(str(merged)) == 60
+    records = [json.loads(line) for line in merged.read_text().splitlines()]
+    assert sorted(r["key"] for r in records) == sorted(ids)
+    assert all(r["result"]["name"] for r in records)
+
+
+def test_failed_items_are_retried(mock_server, client_kwargs, tmp_path):
+    server = mock_server(fail_first=5, error_status=503)
+    kwargs = client_kwargs(server, max_retries=0)
+    crawler = Crawler(str(tmp_path), "venue", shards=1, client_kwargs=kwargs)
+    ids = [str(i) for i in range(10)]
+
+    (stats,) = crawler.run(ids)
+    assert (stats.done, stats.errors) == (5, 5)
+    (stats,) = crawler.run(ids)
+    assert (stats.done, stats.skipped, stats.errors) == (5, 5, 0)
+    assert len(list(crawler.results())) == 10
+
+
+def test_custom_task_and_keys(tmp_path):
+    items = [{"id": i, "tags": ["a", "b"]} for i in range(20)]
+    crawler = Crawler(str(tmp_path), echo, shards=4, processes=2)
+    crawler.run(items + items[:5])  # duplicates are crawled once
+    results = dict(crawler.results())
+    assert len(results) == 20
+    assert sorted(r["item"]["id"] for r in results.values()) == list(range(20))
@@ -0,0 +1,83 @@
+import math
+import time
+
+from waze import Coordinate, Waze
+from waze.departures import (
+    HISTOGRAM,
+    MISSING,
+    REQUESTED,
+    DepartureSeries,
+    covering_departures,
+)
+
+SRC = Coordinate(latitude=1.3068, longitude=103.7884)
+DST = Coordinate(latitude=3.0815, longitude=101.5851)
+
+
+def series(slots=6, start=0, step=600):
+    return DepartureSeries(SRC, DST, start, step, slots)
+
+
+def test_fill_sets_the_slot_within_a_minute():
+    s = series()
+    assert s.fill(1230, 42.0, REQUESTED)
+    assert s.at(1200) == 42.0
+    assert s.source[2] == REQUESTED
+    # more than a minute from the nearest slot, or outside the grid
+    assert not s.fill(1300, 1.0, REQUESTED)
+    assert not s.fill(-600, 1.0, REQUESTED)
+    assert not s.fill(3600, 1.0, REQUESTED)
+
+
+def test_histogram_never_replaces_a_requested_value():
+    s = series()
+    s.fill(600, 10.0, REQUESTED)
+    assert s.fill_histogram([(600, 99), (1800, 30)]) == 1
+    assert s.at(600) == 10.0
+    assert s.at(1800) == 30
+    assert s.source[3] == HISTOGRAM
+    assert s.fill(1800, 31.0, REQUESTED)
+    assert s.source[3] == REQUESTED
+
+
+def test_gaps_lists_the_missing_slots():
+    s = series()
+    s.fill(0, 1.0, REQUESTED)
+    s.fill_histogram([(1200, 2), (3000, 3)])
+    assert s.gaps() == [600, 1800, 2400]
+    assert [m for _, m in s][:3] == [1.0, None, 2]
+    assert math.isnan(s.minutes[1]) and s.source[1] == MISSING
+
+
+def test_containing_is_the_slot_a_time_falls_in():
+    s = series()
+    assert s.containing(0) == 0
+    assert s.containing(599) == 0
+    assert s.containing(600) == 1
+    assert s.containing(-1) is None
+    assert s.containing(3600) is None
+
+
+def test_covering_departures_reach_every_gap():
+    gaps = [0, 600, 1200, 1800, 2400, 3000, 3600]
+    departures = covering_departures(gaps, before=1200, after=600)
+    assert departures == [1200, 3600]
+    for gap in gaps:
+        assert any(d - 1200 <= gap <= d + 600 for d in departures)
+
+
+def test_covering_departures_without_reach_requests_each_gap():
+    assert covering_departures([0, 600, 1200], 0, 0) == [0, 600, 1200]
+    assert covering_departures([], 600, 600) == []
+
+
+def test_departures_fill_the_current_slot(mock_server, client_kwargs):
+    server = mock_server()
+    with Waze(**client_kwargs(server)) as waze:
+        start = time.time() - 1800
+        s = waze.departures(SRC, DST, start=start, end=start + 3 * 3600, step=3600)
+
+    # the recorded histograms are long past, so every slot needs a request
+    assert s.source[0] == REQUESTED
+    assert s.gaps() == []
+    assert s.requests == 3
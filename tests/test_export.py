@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from waze import Coordinate
+from waze.export import SCHEMAS, ArrowSink, NDJSONSink, open_sink
+from waze.models import PlanResult
+from waze.parsing import parse_plan, parse_venue
+
+SRC = Coordinate(latitude=1.3068, longitude=103.7884)
+DST = Coordinate(latitude=3.0815, longitude=101.5851)
+
+
+@pytest.fixture
+def plan(payloads):
+    return parse_plan(SRC, DST, payloads["plan"])
+
+
+@pytest.fixture
+def venue(payloads):
+    return parse_venue(json.loads(payloads["venue"]))
+
+
+@pytest.fixture
+def raw_route(payloads):
+    return json.loads(payloads["plan"])["alternatives"][0]
+
+
+def read_ndjson(sink, table):
+    with open(sink.path(table), "rb") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_ndjson_sink_splits_plans_into_tables(tmp_path, plan, venue):
+    with NDJSONSink(str(tmp_path)) as sink:
+        sink.write_all([plan, plan, venue])
+
+    routes = read_ndjson(sink, "routes")
+    assert [r["route_id"] for r in routes] == [0, 1]
+    assert routes[0]["routeName"] == plan.routeName
+    assert routes[0]["totalSeconds"] == plan.totalSeconds
+    assert routes[0]["vertices"] == len(plan.geoPath)
+
+    vertices = read_ndjson(sink, "vertices")
+    assert len(vertices) == 2 * len(plan.geoPath)
+    first = plan.geoPath[0]
+    assert vertices[0] == {
+        "route_id": 0,
+        "seq": 0,
+        "longitude": first.longitude,
+        "latitude": first.latitude,
+    }
+    assert len(read_ndjson(sink, "alerts")) == 2 * len(plan.alerts)
+    assert len(read_ndjson(sink, "eta_histograms")) == 2 * len(plan.etaHistograms)
+    assert read_ndjson(sink, "venues")[0]["name"] == venue.name
+    assert sink.rows["routes"] == 2
+
+
+def test_plan_results_with_raw_routes_are_written(tmp_path, plan, raw_route):
+    results = [
+        PlanResult(index=0, src=SRC, dst=DST, plan=raw_route),
+        PlanResult(index=1, src=SRC, dst=DST, error=RuntimeError("failed")),
+        PlanResult(index=2, src=SRC, dst=DST, plan=plan),
+    ]
+    with NDJSONSink(str(tmp_path)) as sink:
+        sink.write_all(results)
+
+    raw, validated = read_ndjson(sink, "routes")
+    assert raw == {**validated, "route_id": 0}
+    assert sink.rows["vertices"] == 2 * len(plan.geoPath)
+
+
+def test_unknown_items_are_rejected(tmp_path):
+    with NDJSONSink(str(tmp_path)) as sink:
+        with pytest.raises(TypeError):
+            sink.write({"alternatives": []})
+
+
+def test_tables_flush_in_batches(tmp_path, plan):
+    with NDJSONSink(str(tmp_path), max_batch_bytes=1024) as sink:
+        sink.write(plan)
+        # the vertices crossed the ceiling and were written at once
+        assert sink.rows["vertices"] == len(plan.geoPath)
+        assert sink.rows["routes"] == 0
+    assert sink.rows["routes"] == 1
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_arrow_sink_round_trips(tmp_path, plan, venue, raw_route, format):
+    pa = pytest.importorskip("pyarrow")
+    with open_sink(str(tmp_path), format=format, max_batch_bytes=4096) as sink:
+        assert isinstance(sink, ArrowSink)
+        sink.write_all(
+            [plan, venue, PlanResult(index=0, src=SRC, dst=DST, plan=raw_route)]
+        )
+
+    tables = {}
+    for table in SCHEMAS:
+        if format == "parquet":
+            import pyarrow.parquet as pq
+
+            tables[table] = pq.read_table(sink.path(table))
+        else:
+            with pa.memory_map(sink.path(table)) as source:
+                tables[table] = pa.ipc.open_file(source).read_all()
+        assert tables[table].column_names == [name for name, _ in SCHEMAS[table]]
+
+    routes = tables["routes"].to_pylist()
+    assert [r["route_id"] for r in routes] == [0, 1]
+    assert routes[0]["cacheAge"] is None
+    assert routes[1]["totalLength"] == plan.totalLength
+    vertices = tables["vertices"]
+    assert vertices.num_rows == 2 * len(plan.geoPath)
+    lons, _ = plan.geoPath.columns()
+    assert vertices.column("longitude").to_pylist()[: len(lons)] == list(lons)
+    assert tables["venues"].column("id").to_pylist() == [venue.id]
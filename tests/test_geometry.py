@@ -0,0 +1,49 @@
+import struct
+
+from waze import Coordinate
+from waze.geometry import GeoPath
+from waze.models import WazeTravelPlan
+
+SRC = Coordinate(latitude=1.3068, longitude=103.7884)
+DST = Coordinate(latitude=3.0815, longitude=101.5851)
+
+
+def plan():
+    return WazeTravelPlan(
+        src=SRC,
+        dst=DST,
+        routeName="E2",
+        geoPath=[{"x": 103.7884, "y": 1.3068}, {"x": 101.5851, "y": 3.0815}],
+        alerts=[],
+        totalSeconds=14392,
+        totalLength=368387,
+        isToll=True,
+        isFastest=True,
+        tollPriceInfo={"tollPrice": 44.59},
+    )
+
+
+def test_plan_json_schema_lists_coordinates():
+    for mode in ("validation", "serialization"):
+        schema = WazeTravelPlan.model_json_schema(mode=mode)
+        geo_path = schema["properties"]["geoPath"]
+        assert geo_path["type"] == "array"
+        assert geo_path["items"] == {"$ref": "#/$defs/Coordinate"}
+
+
+def test_geo_path_round_trips_through_json():
+    original = plan()
+    dumped = original.model_dump(by_alias=True)
+    assert dumped["geoPath"][0] == {"name": None, "y": 1.3068, "x": 103.7884}
+
+    restored = WazeTravelPlan.model_validate_json(original.model_dump_json())
+    assert isinstance(restored.geoPath, GeoPath)
+    assert restored.geoPath == original.geoPath
+
+
+def test_to_wkb_packs_a_line_string():
+    path = plan().geoPath
+    wkb = path.to_wkb()
+    order, kind, n = struct.unpack_from("=BII", wkb)
+    assert (kind, n) == (2, 2)
+    assert struct.unpack_from("=4d", wkb, 9) == (103.7884, 1.3068, 101.5851, 3.0815)
@@ -0,0 +1,69 @@
+import math
+
+from waze import Coordinate, Waze
+from waze.matrix import ERROR, OK, PENDING, TravelMatrix
+
+A = Coordinate(latitude=3.0815, longitude=101.5851)
+B = Coordinate(latitude=3.1390, longitude=101.6869)
+C = Coordinate(latitude=1.3068, longitude=103.7884)
+
+
+def test_duplicate_pairs_are_requested_once(mock_server, client_kwargs):
+    server = mock_server()
+    with Waze(**client_kwargs(server)) as waze:
+        matrix = waze.matrix([A, B, A], [C, B, C], max_workers=2)
+
+    # A->C, A->B, B->C, while B->B needs no request
+    assert server.requests["plan"] == 3
+    assert matrix.status == bytearray([OK]) * 9
+    assert matrix.duration(0, 0) == matrix.duration(2, 2) == 14392
+    assert matrix.distance(2, 0) == 368387
+    assert matrix.duration(1, 1) == matrix.distance(1, 1) == 0
+
+
+def test_symmetric_matrix_requests_one_direction(mock_server, client_kwargs):
+    server = mock_server()
+    with Waze(**client_kwargs(server)) as waze:
+        matrix = waze.matrix([A, B, C], [A, B, C], symmetric=True)
+
+    assert server.requests["plan"] == 3
+    assert matrix.duration(0, 2) == matrix.duration(2, 0)
+
+
+def test_refresh_only_refetches_stale_cells(mock_server, client_kwargs):
+    server = mock_server()
+    with Waze(**client_kwargs(server)) as waze:
+        matrix = waze.matrix([A, B], [C])
+        assert server.requests["plan"] == 2
+
+        waze.refresh_matrix(matrix, max_age=60)
+        assert server.requests["plan"] == 2
+
+        matrix.fetched_at[1] -= 120
+        waze.refresh_matrix(matrix, max_age=60)
+    assert server.requests["plan"] == 3
+    assert matrix.status == bytearray([OK, OK])
+
+
+def test_failed_cells_are_kept_and_retried(mock_server, client_kwargs):
+    server = mock_server(fail_first=1, error_status=503)
+    with Waze(**client_kwargs(server, max_retries=0)) as waze:
+        matrix = waze.matrix([A], [B, C], max_workers=1)
+        assert matrix.status == bytearray([ERROR, OK])
+        assert math.isnan(matrix.duration(0, 0))
+        assert (0, 0) in matrix.errors
+
+        waze.refresh_matrix(matrix)
+    assert server.requests["plan"] == 3
+    assert matrix.status == bytearray([OK, OK])
+    assert matrix.errors == {}
+
+
+def test_stale_lists_pending_and_old_cells():
+    matrix = TravelMatrix([A, B], [C])
+    assert matrix.status == bytearray([PENDING, PENDING])
+    assert list(matrix.stale()) == [(0, 0), (1, 0)]
+    matrix.set(0, 0, 60, 1000, fetched_at=0)
+    matrix.set(1, 0, 60, 1000)
+    assert list(matrix.stale()) == []
+    assert list(matrix.stale(max_age=3600)) == [(0, 0)]
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from waze import Coordinate, PlanCache, RouteMonitor, Waze
+
+SRC = Coordinate(latitude=1.3068, longitude=103.7884)
+WATCHLIST = [
+    (SRC, Coordinate(latitude=3.0815, longitude=101.5851)),
+    (SRC, Coordinate(latitude=3.1390, longitude=101.6869)),
+]
+
+
+def test_stream_records_every_route_each_cycle(mock_server, client_kwargs):
+    server = mock_server()
+    with Waze(**client_kwargs(server)) as waze:
+        monitor = RouteMonitor(waze, WATCHLIST, interval=0.2)
+        records = list(monitor.stream(cycles=3))
+
+    assert sorted(r.route for r in records) == [0, 0, 0, 1, 1, 1]
+    for record in records:
+        assert record.error is None
+        assert (record.totalSeconds, record.totalLength) == (14392, 368387)
+        assert len(record.alertIds) == 20
+
+
+def test_polls_bypass_the_plan_cache(mock_server, client_kwargs):
+    server = mock_server()
+    cache = PlanCache(ttl=600)
+    with Waze(**client_kwargs(server, plan_cache=cache)) as waze:
+        waze.plan(*WATCHLIST[0])
+        records = list(RouteMonitor(waze, WATCHLIST, interval=0.2).stream(cycles=2))
+
+    assert len(records) == 4
+    assert server.requests["plan"] == 5
+    assert waze.cache_stats.hits.get("plan", 0) == 0
+
+
+def test_failed_polls_are_recorded(mock_server, client_kwargs):
+    server = mock_server(error_rate=1.0, error_status=503)
+    with Waze(**client_kwargs(server, max_retries=0)) as waze:
+        records = list(RouteMonitor(waze, WATCHLIST, interval=0.1).stream(cycles=1))
+
+    assert len(records) == 2
+    for record in records:
+        assert record.totalSeconds is None
+        assert "503" in record.error
+
+
+def test_empty_watchlist_is_rejected(mock_server, client_kwargs):
+    with Waze(**client_kwargs(mock_server())) as waze:
+        with pytest.raises(ValueError):
+            RouteMonitor(waze, [])
+
+
+def test_astream_bypasses_the_plan_cache(mock_server, client_kwargs):
+    pytest.importorskip("httpx")
+    from waze import AsyncWaze
+
+    server = mock_server()
+
+    async def main():
+        kwargs = client_kwargs(server, plan_cache=PlanCache(ttl=600))
+        async with AsyncWaze(**kwargs) as waze:
+            await waze.plan(*WATCHLIST[0])
+            monitor = RouteMonitor(waze, WATCHLIST, interval=0.2)
+            return [r async for r in monitor.astream(cycles=2)]
+
+    records = asyncio.run(main())
+    assert sorted(r.route for r in records) == [0, 0, 1, 1]
+    assert all(r.totalSeconds == 14392 for r in records)
+    assert server.requests["plan"] == 5
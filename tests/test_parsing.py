@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from waze import Coordinate, parsing
+from waze.geometry import GeoPath
+from waze.models import WazeTravelPlan
+from waze.parsing import RouteAlternatives, parse_plan, parse_route
+
+SRC = Coordinate(latitude=1.3068, longitude=103.7884)
+DST = Coordinate(latitude=3.0815, longitude=101.5851)
+
+
+@pytest.fixture
+def route(payloads):
+    return json.loads(payloads["plan"])["alternatives"][0]
+
+
+def test_fast_route_matches_full(payloads):
+    full = parse_plan(SRC, DST, payloads["plan"], cache_age=3.0)
+    fast = parse_plan(SRC, DST, payloads["plan"], cache_age=3.0, validate="fast")
+
+    assert fast == full
+    assert fast.geoPath == full.geoPath
+    assert fast.alerts[0].location.latitude == full.alerts[0].location.latitude
+
+
+def test_fast_route_skips_validation(monkeypatch, route):
+    def fail(*args, **kwargs):
+        raise AssertionError("validated on the fast path")
+
+    monkeypatch.setattr(WazeTravelPlan, "__init__", fail)
+    monkeypatch.setattr(GeoPath, "from_coords", fail)
+
+    plan = parse_route(SRC, DST, route, validate="fast")
+    assert len(plan.geoPath) == len(route["coords"])
+
+
+def test_fast_route_rejects_malformed_route(route):
+    del route["response"]["totalSeconds"]
+    with pytest.raises(ValueError):
+        parse_route(SRC, DST, route, validate="fast")
+
+
+@pytest.fixture
+def alternatives(route):
+    routes = []
+    for i in range(4):
+        alternative = json.loads(json.dumps(route))
+        alternative["response"]["routeName"] = f"Route {i}"
+        alternative["response"]["totalSeconds"] += i * 600
+        alternative["response"]["isFastest"] = i == 0
+        routes.append(alternative)
+    return json.dumps({"alternatives": routes}).encode()
+
+
+@pytest.fixture
+def built(monkeypatch):
+    """Names of the routes parsed into a `WazeTravelPlan`."""
+    names = []
+    parse = parsing.parse_route
+
+    def spy(src, dst, route, *args):
+        names.append(route["response"]["routeName"])
+        return parse(src, dst, route, *args)
+
+    monkeypatch.setattr(parsing, "parse_route", spy)
+    return names
+
+
+@pytest.mark.parametrize("validate", ["full", "fast"])
+def test_alternatives_are_parsed_on_access(alternatives, built, validate):
+    routes = parse_plan(SRC, DST, alternatives, n_paths=3, validate=validate)
+    assert isinstance(routes, RouteAlternatives)
+    assert len(routes) == 3
+    assert built == []
+
+    assert routes[1].routeName == "Route 1"
+    assert routes[-1].totalSeconds == routes[0].totalSeconds + 1200
+    assert routes[1] is routes[1]
+    assert built == ["Route 1", "Route 2", "Route 0"]
+
+
+def test_alternatives_slices_parse_only_their_routes(alternatives, built):
+    routes = parse_plan(SRC, DST, alternatives, n_paths=4)
+    assert [plan.routeName for plan in routes[1:3]] == ["Route 1", "Route 2"]
+    assert [plan.routeName for plan in routes[::3]] == ["Route 0", "Route 3"]
+    assert routes[10:] == []
+    assert built == ["Route 1", "Route 2", "Route 0", "Route 3"]
+
+
+def test_alternatives_fastest_is_the_first_route(alternatives, built):
+    routes = parse_plan(SRC, DST, alternatives, n_paths=4, cache_age=12.0)
+    fastest = routes.fastest
+    assert fastest.routeName == "Route 0"
+    assert fastest.isFastest
+    assert fastest.cacheAge == 12.0
+    assert fastest is routes[0]
+    assert built == ["Route 0"]
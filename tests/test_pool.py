@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from waze import Coordinate, Waze, WazePool
+from waze.models import WazeVenue
+
+SRC = Coordinate(latitude=1.3068, longitude=103.7884)
+DST = Coordinate(latitude=3.0815, longitude=101.5851)
+
+
+def test_pool_shared_by_many_threads(mock_server, client_kwargs):
+    server = mock_server(latency=0.005, jitter=0.005)
+    errors = []
+    lock = threading.Lock()
+
+    with WazePool(size=4, **client_kwargs(server)) as pool:
+        calls = [
+            lambda i: pool.plan(SRC, Coordinate(latitude=3 + i * 1e-4, longitude=101)),
+            lambda i: pool.geocode(f"subang {i}"),
+            lambda i: pool.venue(str(i)),
+            lambda i: pool.reviews(WazeVenue(googlePlaceId=str(i))),
+        ]
+
+        def one(i: int) -> None:
+            try:
+                calls[i % len(calls)](i)
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            list(executor.map(one, range(400)))
+        sessions = len(pool._clients)
+
+    assert errors == []
+    assert sum(server.requests.values()) == 400
+    assert sessions <= 4
+    # sessions share one pool of at most `size` connections
+    assert server.connections <= 4
+
+
+def test_pool_plan_forwards_options(mock_server, client_kwargs, monkeypatch):
+    server = mock_server()
+    seen = []
+    plan = Waze.plan
+
+    def record(self, *args, **kwargs):
+        seen.append(kwargs)
+        return plan(self, *args, **kwargs)
+
+    monkeypatch.setattr(Waze, "plan", record)
+    with WazePool(size=2, **client_kwargs(server)) as pool:
+        pool.plan(SRC, DST, interval=15, arrive_at=False, at=30)
+
+    assert seen == [{"interval": 15, "arrive_at": False, "at": 30}]
+
+
+def test_closed_pool_hands_out_no_sessions(mock_server, client_kwargs):
+    pool = WazePool(size=2, **client_kwargs(mock_server()))
+    pool.geocode("subang")
+    pool.close()
+
+    with pytest.raises(RuntimeError):
+        pool.geocode("subang")
+    with pytest.raises(RuntimeError):
+        with pool.client():
+            pass
+
+
+def test_close_wakes_threads_waiting_for_a_session(mock_server, client_kwargs):
+    pool = WazePool(size=1, **client_kwargs(mock_server()))
+    errors = []
+
+    def wait_for_session():
+        try:
+            pool.geocode("subang")
+        except RuntimeError as e:
+            errors.append(e)
+
+    with pool.client():
+        waiters = [threading.Thread(target=wait_for_session) for _ in range(3)]
+        for waiter in waiters:
+            waiter.start()
+        time.sleep(0.1)
+        assert errors == []
+        pool.close()
+        for waiter in waiters:
+            waiter.join(timeout=1)
+
+    assert not any(waiter.is_alive() for waiter in waiters)
+    assert len(errors) == 3
+    assert pool._idle == []
@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+
+from waze import ratelimit
+from waze.ratelimit import AIMDLimiter, TokenBucket
+
+
+class Clock:
+    """Stands in for the `time` module of `waze.ratelimit`."""
+
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+        self.slept = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return clock
+
+
+def test_bucket_allows_a_burst_of_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=5)
+    assert [bucket.reserve() for _ in range(5)] == [0.0] * 5
+    assert bucket.reserve() == 0.5
+
+
+def test_bucket_queues_waiters_in_arrival_order(clock):
+    bucket = TokenBucket(rate=2, capacity=1)
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.5, 1.0, 1.5]
+
+
+def test_bucket_refills_at_rate_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=4)
+    for _ in range(4):
+        bucket.reserve()
+    clock.now += 1
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+
+    clock.now += 100
+    assert [bucket.reserve() for _ in range(5)] == [0.0] * 4 + [0.5]
+
+
+def test_bucket_acquire_sleeps_out_the_delay(clock):
+    bucket = TokenBucket(rate=4, capacity=1)
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.slept == [0.25]
+
+
+def test_bucket_rejects_a_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_aimd_grows_about_one_per_round_trip(clock):
+    limiter = AIMDLimiter(initial=4, latency_factor=None)
+    for _ in range(2):
+        started = [limiter.acquire() for _ in range(limiter.limit)]
+        clock.now += 0.1
+        for started_at in started:
+            limiter.release(started_at)
+    assert limiter.limit == 5
+    assert limiter.in_flight == 0
+
+
+def test_aimd_stays_within_bounds(clock):
+    limiter = AIMDLimiter(initial=10, min_limit=2, max_limit=3, latency_factor=None)
+    assert limiter.limit == 3
+    for _ in range(10):
+        limiter.release(limiter.acquire())
+    assert limiter.limit == 3
+    for _ in range(5):
+        clock.now += 1
+        limiter.release(limiter.acquire(), congested=True)
+    assert limiter.limit == 2
+
+
+def test_aimd_backs_off_once_per_round_trip_on_429(clock):
+    limiter = AIMDLimiter(initial=8)
+    started = [limiter.acquire() for _ in range(3)]
+    clock.now += 0.1
+    limiter.release(started[0], congested=True)
+    assert limiter.limit == 4
+    # started before the decrease, so they saw the old limit
+    limiter.release(started[1], congested=True)
+    limiter.release(started[2], congested=True)
+    assert limiter.limit == 4
+
+    started_at = limiter.acquire()
+    clock.now += 0.1
+    limiter.release(started_at, congested=True)
+    assert limiter.limit == 2
+
+
+def test_aimd_backs_off_on_a_latency_spike(clock):
+    limiter = AIMDLimiter(initial=8, latency_factor=3)
+    started_at = limiter.acquire()
+    clock.now += 0.1
+    limiter.release(started_at)
+    assert limiter.limit == 8
+
+    started_at = limiter.acquire()
+    clock.now += 1.0
+    limiter.release(started_at)
+    assert limiter.limit == 4
+
+
+def test_aimd_blocks_callers_over_the_limit(clock):
+    limiter = AIMDLimiter(initial=1, latency_factor=None)
+    started_at = limiter.acquire()
+    acquired = threading.Event()
+
+    def second():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not acquired.wait(0.1)
+    limiter.release(started_at)
+    assert acquired.wait(1)
+    thread.join()
+    assert limiter.in_flight == 1
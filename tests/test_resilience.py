@@ -0,0 +1,160 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from waze import AsyncWaze, CircuitBreaker, CircuitOpenError, Hedge, Hooks, Waze
+from waze import WazeHTTPError
+
+
+def failing_calls(waze, n):
+    errors = []
+    for i in range(n):
+        try:
+            waze.venue(str(i))
+        except WazeHTTPError as e:
+            errors.append(e)
+    return errors
+
+
+def test_breaker_opens_after_consecutive_failures(mock_server, client_kwargs):
+    server = mock_server(error_rate=1.0, error_status=503)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    kwargs = client_kwargs(server, max_retries=0, breakers={"venue": breaker})
+    with Waze(**kwargs) as waze:
+        errors = failing_calls(waze, 10)
+
+    assert [type(e) for e in errors[:3]] == [WazeHTTPError] * 3
+    assert all(e.status_code == 503 for e in errors[:3])
+    assert all(isinstance(e, CircuitOpenError) for e in errors[3:])
+    assert server.requests["venue"] == 3
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.rejected == 7
+
+
+def test_breaker_ignores_client_errors(mock_server, client_kwargs):
+    server = mock_server(error_rate=1.0, error_status=404)
+    breaker = CircuitBreaker(failure_threshold=3)
+    kwargs = client_kwargs(server, max_retries=0, breakers={"venue": breaker})
+    with Waze(**kwargs) as waze:
+        errors = failing_calls(waze, 5)
+
+    assert not any(isinstance(e, CircuitOpenError) for e in errors)
+    assert server.requests["venue"] == 5
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_closes_after_successful_trial(mock_server, client_kwargs):
+    server = mock_server(error_rate=1.0, error_status=503)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    kwargs = client_kwargs(server, max_retries=0, breakers={"venue": breaker})
+    with Waze(**kwargs) as waze:
+        failing_calls(waze, 3)
+        assert breaker.state == CircuitBreaker.OPEN
+        time.sleep(0.05)
+        # the trial fails, so the circuit opens again
+        with pytest.raises(WazeHTTPError):
+            waze.venue("1")
+        assert breaker.state == CircuitBreaker.OPEN
+        server.error_rate = 0.0
+        time.sleep(0.05)
+        waze.venue("1")
+        assert breaker.state == CircuitBreaker.CLOSED
+        waze.venue("2")
+    assert server.requests["venue"] == 5
+
+
+def test_async_breaker_opens(mock_server, client_kwargs):
+    pytest.importorskip("httpx")
+    server = mock_server(error_rate=1.0, error_status=502)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    async def main():
+        kwargs = client_kwargs(server, max_retries=0, breakers={"venue": breaker})
+        async with AsyncWaze(**kwargs) as waze:
+            results = [
+                await asyncio.gather(waze.venue(str(i)), return_exceptions=True)
+                for i in range(5)
+            ]
+        return [r for (r,) in results]
+
+    errors = asyncio.run(main())
+    assert sum(isinstance(e, CircuitOpenError) for e in errors) == 3
+    assert server.requests["venue"] == 2
+
+
+def test_hedge_cuts_stalled_requests(mock_server, client_kwargs):
+    server = mock_server(latency=0.01, stall_rate=0.1, stall=0.5)
+    hedge = Hedge(quantile=0.5, min_samples=5)
+    kwargs = client_kwargs(server, hedging={"venue": hedge})
+    with Waze(**kwargs) as waze:
+        for i in range(5):
+            waze.venue(str(i))
+        latencies = []
+        for i in range(100):
+            start = time.perf_counter()
+            waze.venue(str(i))
+            latencies.append(time.perf_counter() - start)
+
+    assert hedge.wins > 0
+    # ~10 first copies stall, only the ~1 whose duplicate stalls too is slow
+    assert sum(latency >= 0.5 for latency in latencies) <= 5
+    assert server.requests["venue"] == 105 + hedge.hedged
+
+
+def test_hedged_requests_report_connect_time(mock_server, client_kwargs):
+    server = mock_server(latency=0.02)
+    hooks = Hooks()
+    events = []
+    hooks.on_request(events.append)
+    hedge = Hedge(min_samples=1)
+    hedge.observe(0.005)  # hedge from the first request on
+    kwargs = client_kwargs(server, hooks=hooks, hedging={"venue": hedge})
+    with Waze(**kwargs) as waze:
+        waze.venue("1")
+
+    assert hedge.hedged == 1
+    # the first request opened a connection, on a thread of the hedge executor
+    assert events[0].connect is not None
+    assert events[0].status_code == 200
+
+
+def primed_hedge(delay):
+    hedge = Hedge(quantile=0.5, min_samples=1)
+    hedge.observe(delay)
+    return hedge
+
+
+def test_hedge_delay_excludes_time_queued_for_a_worker():
+    hedge = primed_hedge(0.05)
+    calls = []
+
+    def fn():
+        calls.append(time.perf_counter())
+        time.sleep(0.01)
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(time.sleep, 0.2)
+        assert hedge.call(fn, executor) == "ok"
+
+    assert len(calls) == 1
+    assert hedge.hedged == 0
+
+
+def test_hedge_drops_a_duplicate_still_queued():
+    hedge = primed_hedge(0.02)
+    calls = []
+
+    def fn():
+        calls.append(time.perf_counter())
+        time.sleep(0.1)
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executor.submit(time.sleep, 0.5)
+        assert hedge.call(fn, executor) == "ok"
+
+    assert len(calls) == 1
+    assert hedge.hedged == 0
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from waze.singleflight import AsyncSingleFlight, SingleFlight, request_key
+
+CALLERS = 8
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def run_concurrently(flight, fn):
+    """Calls `flight.do` from every caller while the leader's call blocks,
+    returning the outcome of each caller."""
+    release = threading.Event()
+
+    def blocking():
+        release.wait(2)
+        return fn()
+
+    def call(_):
+        try:
+            return flight.do("key", blocking)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        futures = [pool.submit(call, i) for i in range(CALLERS)]
+        wait_for(lambda: flight.shared == CALLERS - 1)
+        release.set()
+        return [f.result() for f in futures]
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    results = run_concurrently(flight, lambda: calls.append(1) or object())
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flight._calls == {}
+
+
+def test_exception_reaches_every_caller_then_clears_the_key():
+    flight = SingleFlight()
+    error = RuntimeError("boom")
+
+    def fail():
+        raise error
+
+    assert run_concurrently(flight, fail) == [error] * CALLERS
+    assert flight._calls == {}
+    assert flight.do("key", lambda: 42) == 42
+
+
+def test_sequential_calls_are_not_shared():
+    flight = SingleFlight()
+    assert [flight.do("key", lambda: i) for i in range(3)] == [0, 1, 2]
+    assert flight.shared == 0
+
+
+def gather(flight, fn, cancel=0):
+    """Awaits `flight.do` from every caller, cancelling the first `cancel`."""
+
+    async def main():
+        release = asyncio.Event()
+
+        async def blocking():
+            await release.wait()
+            return fn()
+
+        tasks = [
+            asyncio.ensure_future(flight.do("key", blocking)) for _ in range(CALLERS)
+        ]
+        await asyncio.sleep(0)
+        for task in tasks[:cancel]:
+            task.cancel()
+        release.set()
+        return await asyncio.gather(*tasks[cancel:], return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def test_async_callers_share_one_call():
+    flight = AsyncSingleFlight()
+    calls = []
+    results = gather(flight, lambda: calls.append(1) or object())
+
+    assert len(calls) == 1
+    assert flight.shared == CALLERS - 1
+    assert all(r is results[0] for r in results)
+    assert flight._calls == {}
+
+
+def test_async_exception_reaches_every_caller_then_clears_the_key():
+    flight = AsyncSingleFlight()
+    error = RuntimeError("boom")
+
+    def fail():
+        raise error
+
+    assert gather(flight, fail) == [error] * CALLERS
+    assert flight._calls == {}
+
+
+def test_cancelled_leader_does_not_cancel_the_call():
+    flight = AsyncSingleFlight()
+    results = gather(flight, lambda: 42, cancel=1)
+    assert results == [42] * (CALLERS - 1)
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ({"x": 1, "y": 2}, {"y": 2, "x": 1}),
+        ({"from": {"x": 1.0, "y": 2.0}}, {"from": {"y": 2.0, "x": 1.0}}),
+    ],
+)
+def test_request_key_ignores_key_order(a, b):
+    assert request_key("post", "/plan", json_body=a) == request_key(
+        "POST", "/plan", json_body=b
+    )
+    assert request_key("POST", "/plan", json_body=a) != request_key(
+        "POST", "/other", json_body=a
+    )
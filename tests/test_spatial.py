@@ -0,0 +1,156 @@
+import random
+
+import pytest
+
+from waze import Coordinate, SpatialIndex
+from waze.geometry import GeoPath
+from waze.models import Alert, ViewBox
+from waze.spatial import _segment_distance, _segment_intersects_box
+from waze.utils import haversine
+
+
+def point(rng: random.Random) -> Coordinate:
+    return Coordinate(
+        latitude=rng.uniform(3.0, 3.3), longitude=rng.uniform(101.5, 101.8)
+    )
+
+
+def walk(rng: random.Random, n: int) -> GeoPath:
+    start = point(rng)
+    lat, lon = start.latitude, start.longitude
+    coords = []
+    for _ in range(n):
+        lat += rng.uniform(-0.004, 0.004)
+        lon += rng.uniform(-0.004, 0.004)
+        coords.append(Coordinate(latitude=lat, longitude=lon))
+    return GeoPath.from_coords(coords)
+
+
+def segments(path: GeoPath):
+    coords = path.to_list()
+    for a, b in zip(coords, coords[1:]):
+        yield a.longitude, a.latitude, b.longitude, b.latitude
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = random.Random(7)
+    alerts = [
+        Alert(id=i, type="POLICE", subtype="", location=point(rng)) for i in range(500)
+    ]
+    routes = [walk(rng, 60) for _ in range(30)]
+    queries = [point(rng) for _ in range(25)]
+    return alerts, routes, queries
+
+
+@pytest.fixture(scope="module")
+def index(data):
+    alerts, routes, _ = data
+    index = SpatialIndex(cell_degrees=0.02)
+    for alert in alerts:
+        index.add_alert(alert)
+    for route in routes:
+        index.add_route(route)
+    return index
+
+
+def box_around(p: Coordinate, size: float) -> ViewBox:
+    return ViewBox(
+        long1=p.longitude - size,
+        lat1=p.latitude - size,
+        long2=p.longitude + size,
+        lat2=p.latitude + size,
+    )
+
+
+def distance(p: Coordinate, alert: Alert) -> float:
+    loc = alert.location
+    return haversine(p.latitude, p.longitude, loc.latitude, loc.longitude)
+
+
+@pytest.mark.parametrize("size", [0.005, 0.03, 1.0])
+def test_alerts_in_bbox_match_brute_force(data, index, size):
+    alerts, _, queries = data
+    for q in queries:
+        box = box_around(q, size)
+        expected = {
+            a.id
+            for a in alerts
+            if box.lat1 <= a.location.latitude <= box.lat2
+            and box.long1 <= a.location.longitude <= box.long2
+        }
+        assert {a.id for a in index.alerts_in_bbox(box)} == expected
+
+
+def test_alerts_within_match_brute_force(data, index):
+    alerts, _, queries = data
+    for q in queries:
+        expected = sorted(
+            (distance(q, a), a.id) for a in alerts if distance(q, a) <= 3000
+        )
+        assert [a.id for a in index.alerts_within(q, 3000)] == [
+            id_ for _, id_ in expected
+        ]
+
+
+@pytest.mark.parametrize("k", [1, 5, 600])
+def test_nearest_alerts_match_brute_force(data, index, k):
+    alerts, _, queries = data
+    far = Coordinate(latitude=4.0, longitude=102.5)
+    for q in queries + [far]:
+        expected = sorted((distance(q, a), a.id) for a in alerts)[:k]
+        found = index.nearest_alerts(q, k)
+        assert [a.id for _, a in found] == [id_ for _, id_ in expected]
+        assert [d for d, _ in found] == pytest.approx([d for d, _ in expected])
+
+
+def test_routes_in_bbox_match_brute_force(data, index):
+    _, routes, queries = data
+    for q in queries:
+        box = box_around(q, 0.01)
+        expected = {
+            route_id
+            for route_id, route in enumerate(routes)
+            if any(_segment_intersects_box(*s, box) for s in segments(route))
+        }
+        assert index.routes_in_bbox(box) == expected
+
+
+def test_routes_within_match_brute_force(data, index):
+    _, routes, queries = data
+    for q in queries:
+        expected = {
+            route_id
+            for route_id, route in enumerate(routes)
+            if any(
+                _segment_distance(q.latitude, q.longitude, *s) <= 1500
+                for s in segments(route)
+            )
+        }
+        assert index.routes_within(q, 1500) == expected
+
+
+def test_readding_a_route_replaces_it(data):
+    _, routes, _ = data
+    index = SpatialIndex(cell_degrees=0.02)
+    old, new = routes[0], routes[1][:10]
+    index.add_route(old, route_id=3)
+    assert index.add_route(new, route_id=3) == 3
+
+    everywhere = ViewBox(long1=100, lat1=2, long2=103, lat2=4)
+    assert index.routes_in_bbox(everywhere) == {3}
+    # nothing is left of the old geometry where it doesn't overlap the new
+    for lon0, lat0, lon1, lat1 in segments(old):
+        box = ViewBox(
+            long1=min(lon0, lon1),
+            lat1=min(lat0, lat1),
+            long2=max(lon0, lon1),
+            lat2=max(lat0, lat1),
+        )
+        hit = any(_segment_intersects_box(*s, box) for s in segments(new))
+        assert index.routes_in_bbox(box) == ({3} if hit else set())
+
+    index.remove_route(3)
+    assert index.routes_in_bbox(everywhere) == set()
+    with pytest.raises(KeyError):
+        index.remove_route(3)
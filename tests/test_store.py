@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from waze import Coordinate, RouteStore, RouteStoreWriter
+from waze.geometry import GeoPath
+from waze.models import Alert
+from waze.parsing import decode, parse_plan
+from waze.store import decode_path, encode_path
+
+
+@pytest.fixture(scope="module")
+def plan(payloads):
+    src = Coordinate(latitude=1.3068, longitude=103.7884)
+    dst = Coordinate(latitude=3.0815, longitude=101.5851)
+    return parse_plan(src, dst, decode(payloads["plan"], "full"), 1)
+
+
+def rounded(plan, precision=6):
+    """A plan's fields as stored, coordinates at `precision` decimals."""
+    data = plan.model_dump()
+    coords = [
+        (round(c.longitude, precision), round(c.latitude, precision))
+        for c in plan.geoPath
+    ]
+    data["geoPath"] = coords
+    for point in [data["src"], data["dst"]] + [a["location"] for a in data["alerts"]]:
+        point["latitude"] = round(point["latitude"], precision)
+        point["longitude"] = round(point["longitude"], precision)
+    return data
+
+
+def test_path_encoding_round_trip():
+    coords = [
+        Coordinate(latitude=lat, longitude=lon)
+        for lat, lon in [(-33.8688, 151.2093), (0, 0), (89.9, -179.9), (1.5, 1e-7)]
+    ]
+    path = GeoPath.from_coords(coords)
+    decoded = decode_path(encode_path(path, 7), len(path), 7)
+    for a, b in zip(decoded, coords):
+        assert a.latitude == pytest.approx(b.latitude, abs=1e-7)
+        assert a.longitude == pytest.approx(b.longitude, abs=1e-7)
+    assert len(decode_path(encode_path(GeoPath(), 6), 0, 6)) == 0
+
+
+def test_round_trip(plan, tmp_path):
+    path = str(tmp_path / "routes.wzrs")
+    variants = [
+        plan,
+        plan.model_copy(update={"etaHistograms": None, "cacheAge": 42.5}),
+        plan.model_copy(
+            update={
+                "alerts": [],
+                "isToll": False,
+                "routeName": "Jalan Ampang",
+                "geoPath": plan.geoPath[:50],
+            }
+        ),
+        plan.model_copy(
+            update={
+                "alerts": [
+                    Alert(
+                        id=-1,
+                        type="HAZARD",
+                        subtype="HAZARD_ON_ROAD_POT_HOLE",
+                        location=Coordinate(latitude=-6.2, longitude=106.8),
+                    )
+                ]
+            }
+        ),
+    ]
+    with RouteStoreWriter(path) as writer:
+        for i, variant in enumerate(variants * 3):
+            assert writer.write(variant, timestamp=1_700_000_000 + i) == i
+    # the two distinct geometries are stored once each
+    assert writer.deduplicated == 10
+    assert not os.path.exists(f"{path}.tmp")
+
+    with RouteStore(path) as store:
+        assert len(store) == 12
+        for i, stored in enumerate(store):
+            assert rounded(stored) == rounded(variants[i % 4])
+            assert store.timestamp(i) == 1_700_000_000 + i
+        assert [p.routeName for p in store[-4:-2]] == [
+            plan.routeName,
+            plan.routeName,
+        ]
+        assert store.column("totalSeconds") == [plan.totalSeconds] * 12
+        assert store.column("src_latitude") == [round(plan.src.latitude, 6)] * 12
+        assert len(store.geometry(2)) == 50
+
+
+def test_failed_write_leaves_no_file(plan, tmp_path):
+    path = str(tmp_path / "routes.wzrs")
+    with pytest.raises(RuntimeError):
+        with RouteStoreWriter(path) as writer:
+            writer.write(plan)
+            raise RuntimeError
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,116 @@
+import pytest
+
+from waze import typeahead as typeahead_module
+from waze.typeahead import TypeaheadCache
+
+SCOPE = (101.0, 3.0, 102.0, 3.5)
+OTHER = (103.0, 1.0, 104.0, 1.5)
+
+
+class Clock:
+    """Stands in for the `time` module of `waze.typeahead`."""
+
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(typeahead_module, "time", clock)
+    return clock
+
+
+def location(name, address):
+    return {"name": name, "address": address}
+
+
+MALLS = [
+    location("Subang Parade", "Jalan SS 16/1, Selangor"),
+    location("Sunway Pyramid", "Jalan PJS 11/15, Selangor"),
+    location("Summit USJ", "Persiaran Kewajipan, Selangor"),
+]
+
+
+def test_complete_prefix_answers_longer_queries(clock):
+    cache = TypeaheadCache(saturation=10)
+    cache.store(SCOPE, "su", MALLS)
+
+    assert cache.lookup(SCOPE, "su") == MALLS
+    assert cache.lookup(SCOPE, "sub") == [MALLS[0]]
+    assert cache.lookup(SCOPE, "sunway p") == [MALLS[1]]
+    assert cache.lookup(SCOPE, "suz") == []
+    assert (cache.stats.hits, cache.stats.filtered) == (1, 3)
+
+
+def test_saturated_prefix_needs_a_request(clock):
+    cache = TypeaheadCache(saturation=3)
+    cache.store(SCOPE, "su", MALLS)
+    assert cache.lookup(SCOPE, "su") == MALLS
+    assert cache.lookup(SCOPE, "sub") is None
+
+
+def test_longest_complete_prefix_wins(clock):
+    cache = TypeaheadCache(saturation=10)
+    cache.store(SCOPE, "s", MALLS)
+    cache.store(SCOPE, "sum", [MALLS[2]])
+    assert cache.lookup(SCOPE, "summit") == [MALLS[2]]
+
+
+def test_scopes_are_kept_apart(clock):
+    cache = TypeaheadCache()
+    cache.store(SCOPE, "su", MALLS)
+    assert cache.lookup(OTHER, "su") is None
+    assert cache.lookup(OTHER, "sub") is None
+
+
+def test_least_recently_used_query_is_evicted(clock):
+    cache = TypeaheadCache(max_entries=2)
+    cache.store(SCOPE, "sub", [MALLS[0]])
+    cache.store(SCOPE, "sun", [MALLS[1]])
+    assert cache.lookup(SCOPE, "sub") == [MALLS[0]]  # "sun" is now the oldest
+    cache.store(OTHER, "sum", [MALLS[2]])
+
+    assert len(cache) == 2
+    assert cache.lookup(SCOPE, "sun") is None
+    assert cache.lookup(SCOPE, "sub") == [MALLS[0]]
+    assert cache.lookup(OTHER, "sum") == [MALLS[2]]
+
+
+def test_eviction_prunes_the_trie(clock):
+    cache = TypeaheadCache(max_entries=1)
+    cache.store(SCOPE, "subang", [MALLS[0]])
+    cache.store(OTHER, "x", [])
+    assert SCOPE not in cache._roots
+
+    cache.store(SCOPE, "su", MALLS)
+    cache.store(SCOPE, "subang", [MALLS[0]])
+    # "su" is evicted but its node still leads to "subang"
+    assert cache.lookup(SCOPE, "su") is None
+    assert cache.lookup(SCOPE, "subang") == [MALLS[0]]
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TypeaheadCache(ttl=60)
+    cache.store(SCOPE, "su", MALLS)
+    clock.now += 60
+    assert cache.lookup(SCOPE, "sub") == [MALLS[0]]
+    clock.now += 1
+    assert cache.lookup(SCOPE, "su") is None
+    assert cache.lookup(SCOPE, "sub") is None
+
+    cache.store(SCOPE, "su", MALLS)
+    assert cache.lookup(SCOPE, "su") == MALLS
+
+
+def test_clear_drops_every_scope(clock):
+    cache = TypeaheadCache()
+    cache.store(SCOPE, "su", MALLS)
+    cache.store(OTHER, "su", MALLS)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.lookup(SCOPE, "su") is None
+    assert cache.lookup(OTHER, "sub") is None
@@ -0,0 +1,57 @@
+import pytest
+
+from waze import Coordinate, EnrichmentPipeline, Waze, WazeHTTPError
+from waze.models import WazeTravelPlan
+
+SRC = Coordinate(latitude=1.3068, longitude=103.7884)
+
+
+def pairs(n):
+    return [
+        (SRC, Coordinate(latitude=3.0815 + i * 1e-3, longitude=101.5851))
+        for i in range(n)
+    ]
+
+
+def test_plan_many_returns_per_pair_errors(mock_server, client_kwargs):
+    server = mock_server(fail_first=2, error_status=503)
+    with Waze(**client_kwargs(server, max_retries=0)) as waze:
+        results = list(waze.plan_many(pairs(6), max_workers=1))
+
+    assert [r.index for r in results] == list(range(6))
+    failed = [r for r in results if not r.ok]
+    assert [r.index for r in failed] == [0, 1]
+    for result in failed:
+        assert isinstance(result.error, WazeHTTPError)
+        assert result.error.status_code == 503
+        assert result.plan is None
+    for result, (src, dst) in zip(results[2:], pairs(6)[2:]):
+        assert isinstance(result.plan, WazeTravelPlan)
+        assert (result.src, result.dst) == (src, dst)
+
+
+def test_plan_many_unordered_yields_every_pair(mock_server, client_kwargs):
+    server = mock_server(latency=0.01, jitter=0.01)
+    with Waze(**client_kwargs(server)) as waze:
+        results = list(waze.plan_many(pairs(20), max_workers=4, ordered=False))
+
+    assert sorted(r.index for r in results) == list(range(20))
+    assert all(r.ok for r in results)
+
+
+def test_plan_many_without_validation_yields_raw_routes(mock_server, client_kwargs):
+    server = mock_server()
+    with Waze(**client_kwargs(server, validate="none")) as waze:
+        results = list(waze.plan_many(pairs(3), max_workers=2))
+
+    assert all(r.ok for r in results)
+    for result in results:
+        assert isinstance(result.plan, dict)
+        assert "coords" in result.plan
+
+
+def test_enrichment_pipeline_rejects_unvalidated_client(mock_server, client_kwargs):
+    server = mock_server()
+    with Waze(**client_kwargs(server, validate="none")) as waze:
+        with pytest.raises(ValueError):
+            EnrichmentPipeline(waze)
@@ -1,4 +1,104 @@
-from .waze import Waze, Coordinate
-from .cfg import Countries
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
 
-__all__ = ["Waze", "Coordinate", "Countries"]
+if TYPE_CHECKING:
+    from .waze import Waze
+    from .models import Coordinate
+    from .aio import AsyncWaze
+    from .cache import MemoryCache, PlanCache, SqliteCache
+    from .cfg import Countries
+    from .crawl import Crawler
+    from .departures import DepartureSeries
+    from .exceptions import WazeHTTPError
+    from .export import open_sink
+    from .matrix import TravelMatrix
+    from .metrics import Hooks, Metrics
+    from .monitor import RouteMonitor, RouteRecord
+    from .pipeline import EnrichedVenue, EnrichmentPipeline
+    from .pool import WazePool
+    from .ratelimit import AIMDLimiter, TokenBucket
+    from .resilience import CircuitBreaker, CircuitOpenError, Hedge
+    from .spatial import SpatialIndex
+    from .store import RouteStore, RouteStoreWriter
+    from .typeahead import AsyncTypeahead, Typeahead, TypeaheadCache
+
+# submodule of every public name, imported on first attribute access so that
+# `import waze` does not pull in requests, httpx, pydantic or pyarrow
+_LAZY = {
+    "Waze": "waze",
+    "AsyncWaze": "aio",
+    "AsyncTypeahead": "typeahead",
+    "AIMDLimiter": "ratelimit",
+    "CircuitBreaker": "resilience",
+    "CircuitOpenError": "resilience",
+    "Coordinate": "models",
+    "Countries": "cfg",
+    "Crawler": "crawl",
+    "DepartureSeries": "departures",
+    "EnrichedVenue": "pipeline",
+    "EnrichmentPipeline": "pipeline",
+    "Hedge": "resilience",
+    "Hooks": "metrics",
+    "MemoryCache": "cache",
+    "Metrics": "metrics",
+    "PlanCache": "cache",
+    "RouteMonitor": "monitor",
+    "RouteRecord": "monitor",
+    "RouteStore": "store",
+    "RouteStoreWriter": "store",
+    "SpatialIndex": "spatial",
+    "SqliteCache": "cache",
+    "TokenBucket": "ratelimit",
+    "TravelMatrix": "matrix",
+    "Typeahead": "typeahead",
+    "TypeaheadCache": "typeahead",
+    "WazeHTTPError": "exceptions",
+    "WazePool": "pool",
+    "open_sink": "export",
+}
+
+__all__ = [
+    "Waze",
+    "AsyncWaze",
+    "AsyncTypeahead",
+    "AIMDLimiter",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "Coordinate",
+    "Countries",
+    "Crawler",
+    "DepartureSeries",
+    "EnrichedVenue",
+    "EnrichmentPipeline",
+    "Hedge",
+    "Hooks",
+    "MemoryCache",
+    "Metrics",
+    "PlanCache",
+    "RouteMonitor",
+    "RouteRecord",
+    "RouteStore",
+    "RouteStoreWriter",
+    "SpatialIndex",
+    "SqliteCache",
+    "TokenBucket",
+    "TravelMatrix",
+    "Typeahead",
+    "TypeaheadCache",
+    "WazeHTTPError",
+    "WazePool",
+    "open_sink",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(__all__)
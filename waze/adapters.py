@@ -0,0 +1,49 @@
+import socket
+from typing import List, Optional, Tuple
+
+from requests.adapters import DEFAULT_POOLBLOCK, HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+def keep_alive_socket_options(idle: float) -> List[Tuple[int, int, int]]:
+    """Socket options enabling TCP keep-alive probes after `idle` seconds
+    without traffic, on top of urllib3's defaults."""
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # TCP_KEEPIDLE on Linux, TCP_KEEPALIVE on macOS
+    idle_option = getattr(
+        socket, "TCP_KEEPIDLE", getattr(socket, "TCP_KEEPALIVE", None)
+    )
+    if idle_option is not None:
+        options.append((socket.IPPROTO_TCP, idle_option, max(int(idle), 1)))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(int(idle), 1)))
+    return options
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """`HTTPAdapter` that can probe idle pooled connections with TCP
+    keep-alive, so NATs and load balancers do not silently drop them between
+    requests.
+
+    Args:
+        keep_alive (float, optional): Idle seconds before the first probe,
+            None leaves keep-alive off. Defaults to None.
+        **kwargs: `HTTPAdapter` arguments (`pool_connections`, `pool_maxsize`,
+            `pool_block`, `max_retries`)
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["keep_alive"]
+
+    def __init__(self, keep_alive: Optional[float] = None, **kwargs):
+        self.keep_alive = keep_alive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(
+        self, connections: int, maxsize: int, block: bool = DEFAULT_POOLBLOCK, **kwargs
+    ) -> None:
+        if self.keep_alive is not None:
+            kwargs.setdefault(
+                "socket_options", keep_alive_socket_options(self.keep_alive)
+            )
+        super().init_poolmanager(connections, maxsize, block, **kwargs)
@@ -0,0 +1,536 @@
+import asyncio
+import itertools
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, ProtocolError
+from urllib3.util.retry import Retry
+
+from .cache import (
+    Cache,
+    CacheStats,
+    PlanCache,
+    make_cache_key,
+    normalize_query,
+)
+from .exceptions import WazeHTTPError
+from .logger import get_logger
+from .metrics import Hooks, HttpxTrace, RequestEvent, timed
+from .ratelimit import AIMDLimiter, TokenBucket
+from .resilience import CircuitBreaker, Hedge
+from .singleflight import AsyncSingleFlight, request_key
+from .utils import get_search_bbox, make_retry, nearest_country
+
+from .models import (
+    Coordinate,
+    ViewBox,
+    WazeLocation,
+    WazeReview,
+    WazeTravelPlan,
+    WazeVenue,
+)
+
+from .cfg import (
+    BASE_URL,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_HEADERS,
+    DEFAULT_TIMEOUTS,
+    GEOCODE_EXT,
+    PLANNER_EXT,
+    REVIEWS_EXT,
+    VENUES_EXT,
+    Countries,
+)
+from .parsing import (
+    RouteAlternatives,
+    ValidateMode,
+    decode,
+    geocode_params,
+    loads,
+    parse_locations,
+    parse_plan,
+    parse_review,
+    parse_venue,
+    plan_body,
+    resolve_locale,
+    venue_id,
+)
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class _RetryResponse:
+    """Minimal stand-in for a urllib3 response so `Retry` can inspect it."""
+
+    def __init__(self, response: "httpx.Response"):
+        self.status = response.status_code
+        self.headers = response.headers
+
+    def get_redirect_location(self) -> bool:
+        return False
+
+
+def _retry_delay(retry: Retry, response: Optional[_RetryResponse] = None) -> float:
+    if retry.respect_retry_after_header and response is not None:
+        retry_after = retry.get_retry_after(response)
+        if retry_after:
+            return retry_after
+    return retry.get_backoff_time()
+
+
+def _as_urllib3_error(error: Exception) -> Exception:
+    # `Retry` classifies errors by urllib3 exception type
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return ConnectTimeoutError(str(error))
+    # timeouts have an empty message
+    return ProtocolError(str(error) or type(error).__name__)
+
+
+class AsyncWaze:
+    """asyncio counterpart of `Waze`, backed by a pooled `httpx.AsyncClient`.
+
+    Retries follow the same urllib3 `Retry` policy as `Waze`, and at most
+    `max_concurrency` requests are in flight at any time.
+    """
+
+    def __init__(
+        self,
+        locale: Optional[Union[Coordinate, Countries]] = None,
+        log_level: Optional[Literal["normal", "verbose", "quiet"]] = "normal",
+        _base_url: str = BASE_URL,
+        _planner_ext: str = PLANNER_EXT,
+        _geocode_ext: str = GEOCODE_EXT,
+        _venues_ext: str = VENUES_EXT,
+        _reviews_ext: str = REVIEWS_EXT,
+        _headers: Dict[str, Any] = DEFAULT_HEADERS,
+        max_retries: int = 3,
+        backoff_factor: float = 0.3,
+        max_connections: int = 10,
+        max_keepalive_connections: Optional[int] = None,
+        max_concurrency: int = 10,
+        cache: Optional[Cache] = None,
+        cache_ttl: Optional[Dict[str, float]] = None,
+        plan_cache: Optional[PlanCache] = None,
+        rate_limits: Optional[Dict[str, TokenBucket]] = None,
+        concurrency_limiter: Optional[AIMDLimiter] = None,
+        coalesce_requests: bool = True,
+        validate: ValidateMode = "full",
+        hooks: Optional[Hooks] = None,
+        timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+        hedging: Optional[Dict[str, Hedge]] = None,
+        breakers: Optional[Dict[str, CircuitBreaker]] = None,
+        **client_kwargs,
+    ):
+        if httpx is None:
+            raise ImportError(
+                "AsyncWaze requires httpx, install it with "
+                "`pip install waze-traffic-api[async]`"
+            )
+        self.locale = resolve_locale(locale) if locale is not None else None
+        self.logger = get_logger(log_level)
+        self._base_url = _base_url
+        self._planner_ext = _planner_ext
+        self._geocode_ext = _geocode_ext
+        self._venues_ext = _venues_ext
+        self._reviews_ext = _reviews_ext
+        self._headers = _headers
+        self.cache = cache
+        self.cache_ttl = {**DEFAULT_CACHE_TTL, **(cache_ttl or {})}
+        self.cache_stats = CacheStats()
+        self.plan_cache = plan_cache
+        self.rate_limits = rate_limits or {}
+        self.concurrency_limiter = concurrency_limiter
+        self.validate = validate
+        self.single_flight = AsyncSingleFlight() if coalesce_requests else None
+        self.instrumentation = hooks
+        self.timeouts = {
+            endpoint: httpx.Timeout(read, connect=connect)
+            for endpoint, (connect, read) in {
+                **DEFAULT_TIMEOUTS,
+                **(timeouts or {}),
+            }.items()
+        }
+        self.hedging = hedging or {}
+        self.breakers = breakers or {}
+        self._retry = make_retry(max_retries, backoff_factor)
+        self.max_concurrency = max_concurrency
+        # created on first use, on Python < 3.10 it binds to the running loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        client_kwargs.setdefault("timeout", None)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            **client_kwargs,
+        )
+
+    async def __aenter__(self) -> "AsyncWaze":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        endpoint: Optional[str],
+        trace: Optional[HttpxTrace] = None,
+        **kwargs,
+    ) -> "httpx.Response":
+        # each attempt, retries included, is rate limited and counted
+        bucket = self.rate_limits.get(endpoint)
+        if bucket is not None:
+            await bucket.acquire_async()
+        limiter = self.concurrency_limiter
+        started_at = await limiter.acquire_async() if limiter is not None else 0.0
+        throttled = False
+        try:
+            if trace is not None:
+                kwargs["extensions"] = {"trace": trace}
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            async with self._semaphore:
+                response = await self._dispatch(method, url, endpoint, **kwargs)
+            throttled = response.status_code == 429
+            return response
+        finally:
+            if limiter is not None:
+                limiter.release(started_at, congested=throttled)
+
+    async def _dispatch(
+        self, method: str, url: str, endpoint: Optional[str], **kwargs
+    ) -> "httpx.Response":
+        hedge = self.hedging.get(endpoint)
+        if hedge is None:
+            return await self._client.request(method, url, **kwargs)
+        bucket = self.rate_limits.get(endpoint)
+        sent = itertools.count()
+
+        async def send() -> "httpx.Response":
+            if next(sent) and bucket is not None:
+                await bucket.acquire_async()  # the duplicate is a request too
+            return await self._client.request(method, url, **kwargs)
+
+        return await hedge.acall(send)
+
+    async def _make_request(
+        self, method: str, url: str, endpoint: Optional[str] = None, **kwargs
+    ) -> "httpx.Response":
+        if self.single_flight is None:
+            return await self._request(method, url, endpoint, **kwargs)
+        # identical requests already in flight share one response
+        key = request_key(
+            method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data")
+        )
+        return await self.single_flight.do(
+            key, lambda: self._request(method, url, endpoint, **kwargs)
+        )
+
+    async def _request(
+        self, method: str, url: str, endpoint: Optional[str] = None, **kwargs
+    ) -> "httpx.Response":
+        if endpoint in self.timeouts:
+            kwargs.setdefault("timeout", self.timeouts[endpoint])
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            return await self._traced_request(method, url, endpoint, **kwargs)
+        breaker.before(endpoint)
+        failed: Optional[bool] = None
+        try:
+            response = await self._traced_request(method, url, endpoint, **kwargs)
+            failed = False
+            return response
+        except WazeHTTPError as e:
+            failed = CircuitBreaker.is_failure(e.status_code)
+            raise
+        finally:
+            breaker.record(failed)
+
+    async def _traced_request(
+        self, method: str, url: str, endpoint: Optional[str] = None, **kwargs
+    ) -> "httpx.Response":
+        if self.instrumentation is None:
+            return await self._attempt(method, url, endpoint, None, **kwargs)
+        trace = HttpxTrace()
+        start = time.perf_counter()
+        response: Optional["httpx.Response"] = None
+        error: Optional[Exception] = None
+        try:
+            response = await self._attempt(method, url, endpoint, trace, **kwargs)
+            return response
+        except WazeHTTPError as e:
+            error = e
+            raise
+        finally:
+            self.instrumentation.emit_request(
+                RequestEvent(
+                    endpoint,
+                    method,
+                    url,
+                    response.status_code if response is not None else None,
+                    trace.attempts - 1,
+                    len(response.request.content) if response is not None else 0,
+                    len(response.content) if response is not None else 0,
+                    trace.connect,
+                    trace.ttfb,
+                    time.perf_counter() - start,
+                    error,
+                )
+            )
+
+    async def _attempt(
+        self,
+        method: str,
+        url: str,
+        endpoint: Optional[str],
+        trace: Optional[HttpxTrace],
+        **kwargs,
+    ) -> "httpx.Response":
+        retry = self._retry
+        while True:
+            if trace is not None:
+                trace.attempts += 1
+            try:
+                response = await self._send(method, url, endpoint, trace, **kwargs)
+            except httpx.TransportError as e:
+                try:
+                    retry = retry.increment(method, url, error=_as_urllib3_error(e))
+                except (MaxRetryError, ProtocolError, ConnectTimeoutError) as err:
+                    self.logger.error("HTTP request failed: %s", err)
+                    raise WazeHTTPError(f"HTTP request failed: {err}") from e
+                await asyncio.sleep(_retry_delay(retry))
+                continue
+
+            has_retry_after = "Retry-After" in response.headers
+            if retry.is_retry(method, response.status_code, has_retry_after):
+                retry_response = _RetryResponse(response)
+                try:
+                    retry = retry.increment(method, url, response=retry_response)
+                except MaxRetryError as e:
+                    self.logger.error("HTTP request failed: %s", e)
+                    raise WazeHTTPError(
+                        f"HTTP request failed: {e}", response.status_code
+                    ) from e
+                await asyncio.sleep(_retry_delay(retry, retry_response))
+                continue
+
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                self.logger.error("HTTP request failed: %s", e)
+                raise WazeHTTPError(
+                    f"HTTP request failed: {e}", response.status_code
+                ) from e
+            return response
+
+    async def _fetch_payload(
+        self, endpoint: str, key: str, fetch: Callable[[], Awaitable["httpx.Response"]]
+    ) -> Any:
+        if self.cache is None:
+            content = (await fetch()).content
+            return timed(
+                self.instrumentation, endpoint, "decode", decode, content, self.validate
+            )
+        payload = self.cache.get(key)
+        self.cache_stats.record(endpoint, hit=payload is not None)
+        if payload is None:
+            content = (await fetch()).content
+            payload = timed(self.instrumentation, endpoint, "decode", loads, content)
+            self.cache.set(key, payload, self.cache_ttl.get(endpoint))
+        return payload
+
+    def _infer_locale(self, near: Coordinate) -> None:
+        if self.locale is None:
+            # no locale given, use the country closest to a point we were handed
+            self.locale = resolve_locale(nearest_country(near))
+            self.logger.info("Locale set to %s", self.locale)
+
+    async def geocode(
+        self, query: str, radius: int = 100, viewbox: Optional[ViewBox] = None
+    ) -> List[WazeLocation]:
+        """Searches for places matching `query`.
+
+        Args:
+            query (str): Search text
+            radius (int, optional): Kilometers around the locale to search.
+                Defaults to 100.
+            viewbox (ViewBox, optional): Area to search instead of the one
+                around the locale. Defaults to None.
+
+        Returns:
+            List[WazeLocation]: Matching places
+        """
+        if viewbox is None:
+            viewbox = get_search_bbox(resolve_locale(self.locale), radius)
+        params = geocode_params(query, viewbox)
+        self.logger.info(
+            "[geocode] Making request with the following parameters:\n%s", params
+        )
+
+        async def fetch() -> "httpx.Response":
+            return await self._make_request(
+                "GET",
+                self._base_url + self._geocode_ext,
+                params=params,
+                endpoint="geocode",
+            )
+
+        key = make_cache_key("geocode", normalize_query(query), viewbox.model_dump())
+        payload = await self._fetch_payload("geocode", key, fetch)
+        return timed(
+            self.instrumentation,
+            "geocode",
+            "validate",
+            parse_locations,
+            payload,
+            self.validate,
+        )
+
+    async def venue(self, location: Union[WazeLocation, str]) -> WazeVenue:
+        id_ = venue_id(location)
+
+        async def fetch() -> "httpx.Response":
+            return await self._make_request(
+                "GET",
+                f"{self._base_url}{self._venues_ext}/{id_}",
+                endpoint="venue",
+            )
+
+        key = make_cache_key("venue", id_)
+        payload = await self._fetch_payload("venue", key, fetch)
+        return timed(
+            self.instrumentation,
+            "venue",
+            "validate",
+            parse_venue,
+            payload,
+            self.validate,
+        )
+
+    async def reviews(self, venue: WazeVenue) -> List[WazeReview]:
+        if not venue.googlePlaceId:
+            self.logger.info("Venue has no googlePlaceId, skipping reviews.")
+            return []
+
+        async def fetch() -> "httpx.Response":
+            return await self._make_request(
+                "GET",
+                f"{self._base_url}{self._reviews_ext}/{venue.googlePlaceId}",
+                endpoint="reviews",
+            )
+
+        key = make_cache_key("reviews", venue.googlePlaceId)
+        try:
+            payload = await self._fetch_payload("reviews", key, fetch)
+            if payload == []:  # cached "no reviews" answer
+                return []
+            return timed(
+                self.instrumentation,
+                "reviews",
+                "validate",
+                parse_review,
+                payload,
+                self.validate,
+            )
+        except WazeHTTPError as e:
+            if e.status_code == 500:
+                self.logger.info("No reviews found for this venue.")
+                # spares the next call the whole retry sequence
+                if self.cache is not None:
+                    self.cache.set(key, [], self.cache_ttl.get("no_reviews"))
+                return []
+            raise
+
+    async def plan(
+        self,
+        src: Coordinate,
+        dst: Coordinate,
+        n_paths: int = 1,
+        *,
+        interval: Optional[int] = None,
+        arrive_at: Optional[bool] = None,
+        at: Optional[int] = None,
+    ) -> Union[WazeTravelPlan, RouteAlternatives]:
+        """Plans a route from `src` to `dst`.
+
+        With `n_paths` > 1 every alternative of the single round trip is
+        returned as a lazily parsed `RouteAlternatives`, fastest first.
+        `interval` and `arrive_at` are sent as the planner's `interval` and
+        `arriveAt` fields, `at` departs that many minutes from now; left None
+        the server defaults apply.
+        """
+        if self.locale is None:
+            self._infer_locale(near=src)
+        payload, age = await self._plan_payload(
+            src, dst, n_paths, interval=interval, arrive_at=arrive_at, at=at
+        )
+        return timed(
+            self.instrumentation,
+            "plan",
+            "validate",
+            parse_plan,
+            src,
+            dst,
+            payload,
+            n_paths,
+            age,
+            self.validate,
+        )
+
+    async def _plan_payload(
+        self,
+        src: Coordinate,
+        dst: Coordinate,
+        n_paths: int = 1,
+        interval: Optional[int] = None,
+        arrive_at: Optional[bool] = None,
+        at: Optional[int] = None,
+        fresh: bool = False,
+    ) -> Tuple[Any, Optional[float]]:
+        body = plan_body(src, dst, n_paths, interval, arrive_at, at)
+        # the plan cache only holds responses for the default options
+        plan_cache = (
+            self.plan_cache
+            if interval is None and arrive_at is None and at is None
+            else None
+        )
+        self.logger.info(
+            "[plan] Making request with the following parameters:\n%s", body
+        )
+
+        if plan_cache is not None and not fresh:
+            cached = plan_cache.get(src, dst, n_paths)
+            self.cache_stats.record("plan", hit=cached is not None)
+            if cached is not None:
+                return cached
+
+        response = await self._make_request(
+            "POST",
+            self._base_url + self._planner_ext,
+            endpoint="plan",
+            headers=self._headers,
+            json=body,
+        )
+        payload = timed(self.instrumentation, "plan", "decode", loads, response.content)
+        if plan_cache is not None:
+            plan_cache.put(src, dst, n_paths, payload)
+        return payload, None
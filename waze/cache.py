@@ -0,0 +1,254 @@
+import json
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .models import Coordinate
+from .utils import geohash
+
+METERS_PER_DEGREE = 111_320.0
+
+
+def make_cache_key(endpoint: str, *parts: Any) -> str:
+    """Builds a stable cache key from an endpoint name and request parts."""
+    return json.dumps([endpoint, *parts], separators=(",", ":"), default=str)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).lower()
+
+
+class Cache(ABC):
+    """Interface for response caches used by `Waze`.
+
+    Values are the decoded JSON payloads of responses, so any backend able
+    to store JSON compatible objects can be plugged in.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Stores `value` for `ttl` seconds, forever if `ttl` is None."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drops every entry."""
+
+
+class MemoryCache(Cache):
+    """Thread-safe in-memory LRU cache with per-entry expiry.
+
+    Args:
+        maxsize (int, optional): Maximum number of entries. Defaults to 1024.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SqliteCache(Cache):
+    """Persistent LRU cache stored in a sqlite database.
+
+    Eviction runs every `evict_every` writes, so the table may briefly hold
+    up to `maxsize + evict_every` entries.
+
+    Args:
+        path (str): Database file, created if missing.
+        maxsize (int, optional): Maximum number of entries. Defaults to 100_000.
+        evict_every (int, optional): Writes between evictions. Defaults to 256.
+    """
+
+    def __init__(self, path: str, maxsize: int = 100_000, evict_every: int = 256):
+        self.path = path
+        self.maxsize = maxsize
+        self.evict_every = evict_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)"
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            self._writes += 1
+            if self._writes % self.evict_every:
+                return
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class CacheStats:
+    """Per-endpoint cache hit and miss counters."""
+
+    def __init__(self):
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, hit: bool) -> None:
+        counter = self.hits if hit else self.misses
+        with self._lock:
+            counter[endpoint] = counter.get(endpoint, 0) + 1
+
+    def hit_rate(self, endpoint: Optional[str] = None) -> float:
+        if endpoint is None:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        else:
+            hits, misses = self.hits.get(endpoint, 0), self.misses.get(endpoint, 0)
+        total = hits + misses
+        return hits / total if total else 0.0
+
+    def __repr__(self) -> str:
+        return f"CacheStats(hits={self.hits}, misses={self.misses})"
+
+
+class PlanCache:
+    """Reuses recent planner responses between nearby points.
+
+    `src` and `dst` are snapped to a grid, either `grid_meters` wide cells or
+    geohash cells of `geohash_precision` characters, so requests a few meters
+    apart share an entry. An entry stays fresh for `ttl` seconds, but never
+    past the end of the `etaHistograms` slot it was fetched in, since the
+    server's traffic prediction moves on at that point.
+
+    Args:
+        ttl (float, optional): Maximum age of a reused plan in seconds.
+            Defaults to 120.
+        grid_meters (float, optional): Size of a grid cell. Defaults to 50.
+        geohash_precision (int, optional): Snap to geohash cells instead of a
+            metric grid. Defaults to None.
+        backend (Cache, optional): Storage for entries. Defaults to a
+            `MemoryCache` of 4096 entries.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 120,
+        grid_meters: float = 50,
+        geohash_precision: Optional[int] = None,
+        backend: Optional[Cache] = None,
+    ):
+        self.ttl = ttl
+        self.grid_meters = grid_meters
+        self.geohash_precision = geohash_precision
+        self.backend = backend if backend is not None else MemoryCache(4096)
+
+    def snap(self, point: Coordinate) -> Any:
+        if self.geohash_precision is not None:
+            return geohash(point, self.geohash_precision)
+        step = self.grid_meters / METERS_PER_DEGREE
+        row = math.floor(point.latitude / step)
+        # shrink longitude steps with the cosine of the cell's latitude
+        lon_step = step / max(math.cos(math.radians((row + 0.5) * step)), 1e-6)
+        return row, math.floor(point.longitude / lon_step)
+
+    def key(self, src: Coordinate, dst: Coordinate, n_paths: int = 1) -> str:
+        return make_cache_key("plan", self.snap(src), self.snap(dst), n_paths)
+
+    def get(
+        self, src: Coordinate, dst: Coordinate, n_paths: int = 1
+    ) -> Optional[Tuple[Any, float]]:
+        """Returns the cached planner payload and its age in seconds."""
+        entry = self.backend.get(self.key(src, dst, n_paths))
+        if entry is None:
+            return None
+        fetched_at, payload = entry
+        return payload, max(time.time() - fetched_at, 0.0)
+
+    def put(self, src: Coordinate, dst: Coordinate, n_paths: int, payload: Any) -> None:
+        now = time.time()
+        ttl = self.ttl
+        slot_end = self._histogram_slot_end(payload, now)
+        if slot_end is not None:
+            ttl = min(ttl, slot_end - now)
+        if ttl > 0:
+            self.backend.set(self.key(src, dst, n_paths), [now, payload], ttl)
+
+    @staticmethod
+    def _histogram_slot_end(payload: Any, now: float) -> Optional[float]:
+        try:
+            histogram = payload["alternatives"][0]["response"]["etaHistograms"]
+        except (KeyError, IndexError, TypeError):
+            return None
+        upcoming = [item["eta"] for item in histogram or () if item["eta"] > now]
+        return min(upcoming) if upcoming else None
@@ -1,6 +1,9 @@
 from enum import Enum
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional, Tuple
 
-from .models import Coordinate
+if TYPE_CHECKING:
+    from .models import Coordinate
 
 BASE_URL = "https://www.waze.com/live-map/api/"
 PLANNER_EXT = "user-drive?geo_env=row"
@@ -16,252 +19,299 @@ DEFAULT_HEADERS = {
     "Referer": "https://www.waze.com/live-map/directions?from=",
 }
 
+RETRY_STATUS_FORCELIST = [429, 500, 502, 503, 504]
+RETRY_ALLOWED_METHODS = ["HEAD", "GET", "OPTIONS", "POST"]
+
+# seconds a cached response stays fresh, per endpoint
+DEFAULT_CACHE_TTL = {
+    "geocode": 24 * 60 * 60,
+    "venue": 3 * 24 * 60 * 60,
+    "reviews": 24 * 60 * 60,
+    # the 500 the reviews endpoint answers for a venue without reviews
+    "no_reviews": 60 * 60,
+}
+
+# (connect, read) timeouts in seconds per endpoint, plan responses are the
+# largest and slowest
+DEFAULT_TIMEOUTS = {
+    "plan": (3.05, 30.0),
+    "geocode": (3.05, 10.0),
+    "venue": (3.05, 10.0),
+    "reviews": (3.05, 10.0),
+}
+
+
+@lru_cache(maxsize=None)
+def _coordinate(latitude: float, longitude: float) -> "Coordinate":
+    from .models import Coordinate
+
+    return Coordinate(latitude=latitude, longitude=longitude)
+
 
 class Countries(Enum):
     """IS0-3166 Alpha-2 Codes
     https://github.com/google/dspl/blob/master/samples/google/canonical/countries.csv
+
+    Centroids are stored as (latitude, longitude) tuples, `value` builds the
+    `Coordinate` on first access. Members can be looked up by either, so
+    `Countries(Countries.MY.value)` is `Countries.MY`.
     """
 
-    AD = Coordinate(latitude=42.546245, longitude=1.601554)
-    AE = Coordinate(latitude=23.424076, longitude=53.847818)
-    AF = Coordinate(latitude=33.93911, longitude=67.709953)
-    AG = Coordinate(latitude=17.060816, longitude=-61.796428)
-    AI = Coordinate(latitude=18.220554, longitude=-63.068615)
-    AL = Coordinate(latitude=41.153332, longitude=20.168331)
-    AM = Coordinate(latitude=40.069099, longitude=45.038189)
-    AN = Coordinate(latitude=12.226079, longitude=-69.060087)
-    AO = Coordinate(latitude=-11.202692, longitude=17.873887)
-    AQ = Coordinate(latitude=-75.250973, longitude=-0.071389)
-    AR = Coordinate(latitude=-38.416097, longitude=-63.616672)
-    AS = Coordinate(latitude=-14.270972, longitude=-170.132217)
-    AT = Coordinate(latitude=47.516231, longitude=14.550072)
-    AU = Coordinate(latitude=-25.274398, longitude=133.775136)
-    AW = Coordinate(latitude=12.52111, longitude=-69.968338)
-    AZ = Coordinate(latitude=40.143105, longitude=47.576927)
-    BA = Coordinate(latitude=43.915886, longitude=17.679076)
-    BB = Coordinate(latitude=13.193887, longitude=-59.543198)
-    BD = Coordinate(latitude=23.684994, longitude=90.356331)
-    BE = Coordinate(latitude=50.503887, longitude=4.469936)
-    BF = Coordinate(latitude=12.238333, longitude=-1.561593)
-    BG = Coordinate(latitude=42.733883, longitude=25.48583)
-    BH = Coordinate(latitude=25.930414, longitude=50.637772)
-    BI = Coordinate(latitude=-3.373056, longitude=29.918886)
-    BJ = Coordinate(latitude=9.30769, longitude=2.315834)
-    BM = Coordinate(latitude=32.321384, longitude=-64.75737)
-    BN = Coordinate(latitude=4.535277, longitude=114.727669)
-    BO = Coordinate(latitude=-16.290154, longitude=-63.588653)
-    BR = Coordinate(latitude=-14.235004, longitude=-51.92528)
-    BS = Coordinate(latitude=25.03428, longitude=-77.39628)
-    BT = Coordinate(latitude=27.514162, longitude=90.433601)
-    BV = Coordinate(latitude=-54.423199, longitude=3.413194)
-    BW = Coordinate(latitude=-22.328474, longitude=24.684866)
-    BY = Coordinate(latitude=53.709807, longitude=27.953389)
-    BZ = Coordinate(latitude=17.189877, longitude=-88.49765)
-    CA = Coordinate(latitude=56.130366, longitude=-106.346771)
-    CC = Coordinate(latitude=-12.164165, longitude=96.870956)
-    CD = Coordinate(latitude=-4.038333, longitude=21.758664)
-    CF = Coordinate(latitude=6.611111, longitude=20.939444)
-    CG = Coordinate(latitude=-0.228021, longitude=15.827659)
-    CH = Coordinate(latitude=46.818188, longitude=8.227512)
-    CI = Coordinate(latitude=7.539989, longitude=-5.54708)
-    CK = Coordinate(latitude=-21.236736, longitude=-159.777671)
-    CL = Coordinate(latitude=-35.675147, longitude=-71.542969)
-    CM = Coordinate(latitude=7.369722, longitude=12.354722)
-    CN = Coordinate(latitude=35.86166, longitude=104.195397)
-    CO = Coordinate(latitude=4.570868, longitude=-74.297333)
-    CR = Coordinate(latitude=9.748917, longitude=-83.753428)
-    CU = Coordinate(latitude=21.521757, longitude=-77.781167)
-    CV = Coordinate(latitude=16.002082, longitude=-24.013197)
-    CX = Coordinate(latitude=-10.447525, longitude=105.690449)
-    CY = Coordinate(latitude=35.126413, longitude=33.429859)
-    CZ = Coordinate(latitude=49.817492, longitude=15.472962)
-    DE = Coordinate(latitude=51.165691, longitude=10.451526)
-    DJ = Coordinate(latitude=11.825138, longitude=42.590275)
-    DK = Coordinate(latitude=56.26392, longitude=9.501785)
-    DM = Coordinate(latitude=15.414999, longitude=-61.370976)
-    DO = Coordinate(latitude=18.735693, longitude=-70.162651)
-    DZ = Coordinate(latitude=28.033886, longitude=1.659626)
-    EC = Coordinate(latitude=-1.831239, longitude=-78.183406)
-    EE = Coordinate(latitude=58.595272, longitude=25.013607)
-    EG = Coordinate(latitude=26.820553, longitude=30.802498)
-    EH = Coordinate(latitude=24.215527, longitude=-12.885834)
-    ER = Coordinate(latitude=15.179384, longitude=39.782334)
-    ES = Coordinate(latitude=40.463667, longitude=-3.74922)
-    ET = Coordinate(latitude=9.145, longitude=40.489673)
-    FI = Coordinate(latitude=61.92411, longitude=25.748151)
-    FJ = Coordinate(latitude=-16.578193, longitude=179.414413)
-    FK = Coordinate(latitude=-51.796253, longitude=-59.523613)
-    FM = Coordinate(latitude=7.425554, longitude=150.550812)
-    FO = Coordinate(latitude=61.892635, longitude=-6.911806)
-    FR = Coordinate(latitude=46.227638, longitude=2.213749)
-    GA = Coordinate(latitude=-0.803689, longitude=11.609444)
-    GB = Coordinate(latitude=55.378051, longitude=-3.435973)
-    GD = Coordinate(latitude=12.262776, longitude=-61.604171)
-    GE = Coordinate(latitude=42.315407, longitude=43.356892)
-    GF = Coordinate(latitude=3.933889, longitude=-53.125782)
-    GG = Coordinate(latitude=49.465691, longitude=-2.585278)
-    GH = Coordinate(latitude=7.946527, longitude=-1.023194)
-    GI = Coordinate(latitude=36.137741, longitude=-5.345374)
-    GL = Coordinate(latitude=71.706936, longitude=-42.604303)
-    GM = Coordinate(latitude=13.443182, longitude=-15.310139)
-    GN = Coordinate(latitude=9.945587, longitude=-9.696645)
-    GP = Coordinate(latitude=16.995971, longitude=-62.067641)
-    GQ = Coordinate(latitude=1.650801, longitude=10.267895)
-    GR = Coordinate(latitude=39.074208, longitude=21.824312)
-    GS = Coordinate(latitude=-54.429579, longitude=-36.587909)
-    GT = Coordinate(latitude=15.783471, longitude=-90.230759)
-    GU = Coordinate(latitude=13.444304, longitude=144.793731)
-    GW = Coordinate(latitude=11.803749, longitude=-15.180413)
-    GY = Coordinate(latitude=4.860416, longitude=-58.93018)
-    GZ = Coordinate(latitude=31.354676, longitude=34.308825)
-    HK = Coordinate(latitude=22.396428, longitude=114.109497)
-    HM = Coordinate(latitude=-53.08181, longitude=73.504158)
-    HN = Coordinate(latitude=15.199999, longitude=-86.241905)
-    HR = Coordinate(latitude=45.1, longitude=15.2)
-    HT = Coordinate(latitude=18.971187, longitude=-72.285215)
-    HU = Coordinate(latitude=47.162494, longitude=19.503304)
-    ID = Coordinate(latitude=-0.789275, longitude=113.921327)
-    IE = Coordinate(latitude=53.41291, longitude=-8.24389)
-    IL = Coordinate(latitude=31.046051, longitude=34.851612)
-    IM = Coordinate(latitude=54.236107, longitude=-4.548056)
-    IN = Coordinate(latitude=20.593684, longitude=78.96288)
-    IO = Coordinate(latitude=-6.343194, longitude=71.876519)
-    IQ = Coordinate(latitude=33.223191, longitude=43.679291)
-    IR = Coordinate(latitude=32.427908, longitude=53.688046)
-    IS = Coordinate(latitude=64.963051, longitude=-19.020835)
-    IT = Coordinate(latitude=41.87194, longitude=12.56738)
-    JE = Coordinate(latitude=49.214439, longitude=-2.13125)
-    JM = Coordinate(latitude=18.109581, longitude=-77.297508)
-    JO = Coordinate(latitude=30.585164, longitude=36.238414)
-    JP = Coordinate(latitude=36.204824, longitude=138.252924)
-    KE = Coordinate(latitude=-0.023559, longitude=37.906193)
-    KG = Coordinate(latitude=41.20438, longitude=74.766098)
-    KH = Coordinate(latitude=12.565679, longitude=104.990963)
-    KI = Coordinate(latitude=-3.370417, longitude=-168.734039)
-    KM = Coordinate(latitude=-11.875001, longitude=43.872219)
-    KN = Coordinate(latitude=17.357822, longitude=-62.782998)
-    KP = Coordinate(latitude=40.339852, longitude=127.510093)
-    KR = Coordinate(latitude=35.907757, longitude=127.766922)
-    KW = Coordinate(latitude=29.31166, longitude=47.481766)
-    KY = Coordinate(latitude=19.513469, longitude=-80.566956)
-    KZ = Coordinate(latitude=48.019573, longitude=66.923684)
-    LA = Coordinate(latitude=19.85627, longitude=102.495496)
-    LB = Coordinate(latitude=33.854721, longitude=35.862285)
-    LC = Coordinate(latitude=13.909444, longitude=-60.978893)
-    LI = Coordinate(latitude=47.166, longitude=9.555373)
-    LK = Coordinate(latitude=7.873054, longitude=80.771797)
-    LR = Coordinate(latitude=6.428055, longitude=-9.429499)
-    LS = Coordinate(latitude=-29.609988, longitude=28.233608)
-    LT = Coordinate(latitude=55.169438, longitude=23.881275)
-    LU = Coordinate(latitude=49.815273, longitude=6.129583)
-    LV = Coordinate(latitude=56.879635, longitude=24.603189)
-    LY = Coordinate(latitude=26.3351, longitude=17.228331)
-    MA = Coordinate(latitude=31.791702, longitude=-7.09262)
-    MC = Coordinate(latitude=43.750298, longitude=7.412841)
-    MD = Coordinate(latitude=47.411631, longitude=28.369885)
-    ME = Coordinate(latitude=42.708678, longitude=19.37439)
-    MG = Coordinate(latitude=-18.766947, longitude=46.869107)
-    MH = Coordinate(latitude=7.131474, longitude=171.184478)
-    MK = Coordinate(latitude=41.608635, longitude=21.745275)
-    ML = Coordinate(latitude=17.570692, longitude=-3.996166)
-    MM = Coordinate(latitude=21.913965, longitude=95.956223)
-    MN = Coordinate(latitude=46.862496, longitude=103.846656)
-    MO = Coordinate(latitude=22.198745, longitude=113.543873)
-    MP = Coordinate(latitude=17.33083, longitude=145.38469)
-    MQ = Coordinate(latitude=14.641528, longitude=-61.024174)
-    MR = Coordinate(latitude=21.00789, longitude=-10.940835)
-    MS = Coordinate(latitude=16.742498, longitude=-62.187366)
-    MT = Coordinate(latitude=35.937496, longitude=14.375416)
-    MU = Coordinate(latitude=-20.348404, longitude=57.552152)
-    MV = Coordinate(latitude=3.202778, longitude=73.22068)
-    MW = Coordinate(latitude=-13.254308, longitude=34.301525)
-    MX = Coordinate(latitude=23.634501, longitude=-102.552784)
-    MY = Coordinate(latitude=4.210484, longitude=101.975766)
-    MZ = Coordinate(latitude=-18.665695, longitude=35.529562)
-    NC = Coordinate(latitude=-20.904305, longitude=165.618042)
-    NE = Coordinate(latitude=17.607789, longitude=8.081666)
-    NF = Coordinate(latitude=-29.040835, longitude=167.954712)
-    NG = Coordinate(latitude=9.081999, longitude=8.675277)
-    NI = Coordinate(latitude=12.865416, longitude=-85.207229)
-    NL = Coordinate(latitude=52.132633, longitude=5.291266)
-    NO = Coordinate(latitude=60.472024, longitude=8.468946)
-    NP = Coordinate(latitude=28.394857, longitude=84.124008)
-    NR = Coordinate(latitude=-0.522778, longitude=166.931503)
-    NU = Coordinate(latitude=-19.054445, longitude=-169.867233)
-    NZ = Coordinate(latitude=-40.900557, longitude=174.885971)
-    OM = Coordinate(latitude=21.512583, longitude=55.923255)
-    PA = Coordinate(latitude=8.537981, longitude=-80.782127)
-    PE = Coordinate(latitude=-9.189967, longitude=-75.015152)
-    PF = Coordinate(latitude=-17.679742, longitude=-149.406843)
-    PG = Coordinate(latitude=-6.314993, longitude=143.95555)
-    PH = Coordinate(latitude=12.879721, longitude=121.774017)
-    PK = Coordinate(latitude=30.375321, longitude=69.345116)
-    PL = Coordinate(latitude=51.919438, longitude=19.145136)
-    PM = Coordinate(latitude=46.941936, longitude=-56.27111)
-    PN = Coordinate(latitude=-24.703615, longitude=-127.439308)
-    PR = Coordinate(latitude=18.220833, longitude=-66.590149)
-    PS = Coordinate(latitude=31.952162, longitude=35.233154)
-    PT = Coordinate(latitude=39.399872, longitude=-8.224454)
-    PW = Coordinate(latitude=7.51498, longitude=134.58252)
-    PY = Coordinate(latitude=-23.442503, longitude=-58.443832)
-    QA = Coordinate(latitude=25.354826, longitude=51.183884)
-    RE = Coordinate(latitude=-21.115141, longitude=55.536384)
-    RO = Coordinate(latitude=45.943161, longitude=24.96676)
-    RS = Coordinate(latitude=44.016521, longitude=21.005859)
-    RU = Coordinate(latitude=61.52401, longitude=105.318756)
-    RW = Coordinate(latitude=-1.940278, longitude=29.873888)
-    SA = Coordinate(latitude=23.885942, longitude=45.079162)
-    SB = Coordinate(latitude=-9.64571, longitude=160.156194)
-    SC = Coordinate(latitude=-4.679574, longitude=55.491977)
-    SD = Coordinate(latitude=12.862807, longitude=30.217636)
-    SE = Coordinate(latitude=60.128161, longitude=18.643501)
-    SG = Coordinate(latitude=1.352083, longitude=103.819836)
-    SH = Coordinate(latitude=-24.143474, longitude=-10.030696)
-    SI = Coordinate(latitude=46.151241, longitude=14.995463)
-    SJ = Coordinate(latitude=77.553604, longitude=23.670272)
-    SK = Coordinate(latitude=48.669026, longitude=19.699024)
-    SL = Coordinate(latitude=8.460555, longitude=-11.779889)
-    SM = Coordinate(latitude=43.94236, longitude=12.457777)
-    SN = Coordinate(latitude=14.497401, longitude=-14.452362)
-    SO = Coordinate(latitude=5.152149, longitude=46.199616)
-    SR = Coordinate(latitude=3.919305, longitude=-56.027783)
-    ST = Coordinate(latitude=0.18636, longitude=6.613081)
-    SV = Coordinate(latitude=13.794185, longitude=-88.89653)
-    SY = Coordinate(latitude=34.802075, longitude=38.996815)
-    SZ = Coordinate(latitude=-26.522503, longitude=31.465866)
-    TC = Coordinate(latitude=21.694025, longitude=-71.797928)
-    TD = Coordinate(latitude=15.454166, longitude=18.732207)
-    TF = Coordinate(latitude=-49.280366, longitude=69.348557)
-    TG = Coordinate(latitude=8.619543, longitude=0.824782)
-    TH = Coordinate(latitude=15.870032, longitude=100.992541)
-    TJ = Coordinate(latitude=38.861034, longitude=71.276093)
-    TK = Coordinate(latitude=-8.967363, longitude=-171.855881)
-    TL = Coordinate(latitude=-8.874217, longitude=125.727539)
-    TM = Coordinate(latitude=38.969719, longitude=59.556278)
-    TN = Coordinate(latitude=33.886917, longitude=9.537499)
-    TO = Coordinate(latitude=-21.178986, longitude=-175.198242)
-    TR = Coordinate(latitude=38.963745, longitude=35.243322)
-    TT = Coordinate(latitude=10.691803, longitude=-61.222503)
-    TV = Coordinate(latitude=-7.109535, longitude=177.64933)
-    TW = Coordinate(latitude=23.69781, longitude=120.960515)
-    TZ = Coordinate(latitude=-6.369028, longitude=34.888822)
-    UA = Coordinate(latitude=48.379433, longitude=31.16558)
-    UG = Coordinate(latitude=1.373333, longitude=32.290275)
-    US = Coordinate(latitude=37.09024, longitude=-95.712891)
-    UY = Coordinate(latitude=-32.522779, longitude=-55.765835)
-    UZ = Coordinate(latitude=41.377491, longitude=64.585262)
-    VA = Coordinate(latitude=41.902916, longitude=12.453389)
-    VC = Coordinate(latitude=12.984305, longitude=-61.287228)
-    VE = Coordinate(latitude=6.42375, longitude=-66.58973)
-    VG = Coordinate(latitude=18.420695, longitude=-64.639968)
-    VI = Coordinate(latitude=18.335765, longitude=-64.896335)
-    VN = Coordinate(latitude=14.058324, longitude=108.277199)
-    VU = Coordinate(latitude=-15.376706, longitude=166.959158)
-    WF = Coordinate(latitude=-13.768752, longitude=-177.156097)
-    WS = Coordinate(latitude=-13.759029, longitude=-172.104629)
-    XK = Coordinate(latitude=42.602636, longitude=20.902977)
-    YE = Coordinate(latitude=15.552727, longitude=48.516388)
-    YT = Coordinate(latitude=-12.8275, longitude=45.166244)
-    ZA = Coordinate(latitude=-30.559482, longitude=22.937506)
-    ZM = Coordinate(latitude=-13.133897, longitude=27.849332)
-    ZW = Coordinate(latitude=-19.015438, longitude=29.154857)
+    AD = (42.546245, 1.601554)
+    AE = (23.424076, 53.847818)
+    AF = (33.93911, 67.709953)
+    AG = (17.060816, -61.796428)
+    AI = (18.220554, -63.068615)
+    AL = (41.153332, 20.168331)
+    AM = (40.069099, 45.038189)
+    AN = (12.226079, -69.060087)
+    AO = (-11.202692, 17.873887)
+    AQ = (-75.250973, -0.071389)
+    AR = (-38.416097, -63.616672)
+    AS = (-14.270972, -170.132217)
+    AT = (47.516231, 14.550072)
+    AU = (-25.274398, 133.775136)
+    AW = (12.52111, -69.968338)
+    AZ = (40.143105, 47.576927)
+    BA = (43.915886, 17.679076)
+    BB = (13.193887, -59.543198)
+    BD = (23.684994, 90.356331)
+    BE = (50.503887, 4.469936)
+    BF = (12.238333, -1.561593)
+    BG = (42.733883, 25.48583)
+    BH = (25.930414, 50.637772)
+    BI = (-3.373056, 29.918886)
+    BJ = (9.30769, 2.315834)
+    BM = (32.321384, -64.75737)
+    BN = (4.535277, 114.727669)
+    BO = (-16.290154, -63.588653)
+    BR = (-14.235004, -51.92528)
+    BS = (25.03428, -77.39628)
+    BT = (27.514162, 90.433601)
+    BV = (-54.423199, 3.413194)
+    BW = (-22.328474, 24.684866)
+    BY = (53.709807, 27.953389)
+    BZ = (17.189877, -88.49765)
+    CA = (56.130366, -106.346771)
+    CC = (-12.164165, 96.870956)
+    CD = (-4.038333, 21.758664)
+    CF = (6.611111, 20.939444)
+    CG = (-0.228021, 15.827659)
+    CH = (46.818188, 8.227512)
+    CI = (7.539989, -5.54708)
+    CK = (-21.236736, -159.777671)
+    CL = (-35.675147, -71.542969)
+    CM = (7.369722, 12.354722)
+    CN = (35.86166, 104.195397)
+    CO = (4.570868, -74.297333)
+    CR = (9.748917, -83.753428)
+    CU = (21.521757, -77.781167)
+    CV = (16.002082, -24.013197)
+    CX = (-10.447525, 105.690449)
+    CY = (35.126413, 33.429859)
+    CZ = (49.817492, 15.472962)
+    DE = (51.165691, 10.451526)
+    DJ = (11.825138, 42.590275)
+    DK = (56.26392, 9.501785)
+    DM = (15.414999, -61.370976)
+    DO = (18.735693, -70.162651)
+    DZ = (28.033886, 1.659626)
+    EC = (-1.831239, -78.183406)
+    EE = (58.595272, 25.013607)
+    EG = (26.820553, 30.802498)
+    EH = (24.215527, -12.885834)
+    ER = (15.179384, 39.782334)
+    ES = (40.463667, -3.74922)
+    ET = (9.145, 40.489673)
+    FI = (61.92411, 25.748151)
+    FJ = (-16.578193, 179.414413)
+    FK = (-51.796253, -59.523613)
+    FM = (7.425554, 150.550812)
+    FO = (61.892635, -6.911806)
+    FR = (46.227638, 2.213749)
+    GA = (-0.803689, 11.609444)
+    GB = (55.378051, -3.435973)
+    GD = (12.262776, -61.604171)
+    GE = (42.315407, 43.356892)
+    GF = (3.933889, -53.125782)
+    GG = (49.465691, -2.585278)
+    GH = (7.946527, -1.023194)
+    GI = (36.137741, -5.345374)
+    GL = (71.706936, -42.604303)
+    GM = (13.443182, -15.310139)
+    GN = (9.945587, -9.696645)
+    GP = (16.995971, -62.067641)
+    GQ = (1.650801, 10.267895)
+    GR = (39.074208, 21.824312)
+    GS = (-54.429579, -36.587909)
+    GT = (15.783471, -90.230759)
+    GU = (13.444304, 144.793731)
+    GW = (11.803749, -15.180413)
+    GY = (4.860416, -58.93018)
+    GZ = (31.354676, 34.308825)
+    HK = (22.396428, 114.109497)
+    HM = (-53.08181, 73.504158)
+    HN = (15.199999, -86.241905)
+    HR = (45.1, 15.2)
+    HT = (18.971187, -72.285215)
+    HU = (47.162494, 19.503304)
+    ID = (-0.789275, 113.921327)
+    IE = (53.41291, -8.24389)
+    IL = (31.046051, 34.851612)
+    IM = (54.236107, -4.548056)
+    IN = (20.593684, 78.96288)
+    IO = (-6.343194, 71.876519)
+    IQ = (33.223191, 43.679291)
+    IR = (32.427908, 53.688046)
+    IS = (64.963051, -19.020835)
+    IT = (41.87194, 12.56738)
+    JE = (49.214439, -2.13125)
+    JM = (18.109581, -77.297508)
+    JO = (30.585164, 36.238414)
+    JP = (36.204824, 138.252924)
+    KE = (-0.023559, 37.906193)
+    KG = (41.20438, 74.766098)
+    KH = (12.565679, 104.990963)
+    KI = (-3.370417, -168.734039)
+    KM = (-11.875001, 43.872219)
+    KN = (17.357822, -62.782998)
+    KP = (40.339852, 127.510093)
+    KR = (35.907757, 127.766922)
+    KW = (29.31166, 47.481766)
+    KY = (19.513469, -80.566956)
+    KZ = (48.019573, 66.923684)
+    LA = (19.85627, 102.495496)
+    LB = (33.854721, 35.862285)
+    LC = (13.909444, -60.978893)
+    LI = (47.166, 9.555373)
+    LK = (7.873054, 80.771797)
+    LR = (6.428055, -9.429499)
+    LS = (-29.609988, 28.233608)
+    LT = (55.169438, 23.881275)
+    LU = (49.815273, 6.129583)
+    LV = (56.879635, 24.603189)
+    LY = (26.3351, 17.228331)
+    MA = (31.791702, -7.09262)
+    MC = (43.750298, 7.412841)
+    MD = (47.411631, 28.369885)
+    ME = (42.708678, 19.37439)
+    MG = (-18.766947, 46.869107)
+    MH = (7.131474, 171.184478)
+    MK = (41.608635, 21.745275)
+    ML = (17.570692, -3.996166)
+    MM = (21.913965, 95.956223)
+    MN = (46.862496, 103.846656)
+    MO = (22.198745, 113.543873)
+    MP = (17.33083, 145.38469)
+    MQ = (14.641528, -61.024174)
+    MR = (21.00789, -10.940835)
+    MS = (16.742498, -62.187366)
+    MT = (35.937496, 14.375416)
+    MU = (-20.348404, 57.552152)
+    MV = (3.202778, 73.22068)
+    MW = (-13.254308, 34.301525)
+    MX = (23.634501, -102.552784)
+    MY = (4.210484, 101.975766)
+    MZ = (-18.665695, 35.529562)
+    NC = (-20.904305, 165.618042)
+    NE = (17.607789, 8.081666)
+    NF = (-29.040835, 167.954712)
+    NG = (9.081999, 8.675277)
+    NI = (12.865416, -85.207229)
+    NL = (52.132633, 5.291266)
+    NO = (60.472024, 8.468946)
+    NP = (28.394857, 84.124008)
+    NR = (-0.522778, 166.931503)
+    NU = (-19.054445, -169.867233)
+    NZ = (-40.900557, 174.885971)
+    OM = (21.512583, 55.923255)
+    PA = (8.537981, -80.782127)
+    PE = (-9.189967, -75.015152)
+    PF = (-17.679742, -149.406843)
+    PG = (-6.314993, 143.95555)
+    PH = (12.879721, 121.774017)
+    PK = (30.375321, 69.345116)
+    PL = (51.919438, 19.145136)
+    PM = (46.941936, -56.27111)
+    PN = (-24.703615, -127.439308)
+    PR = (18.220833, -66.590149)
+    PS = (31.952162, 35.233154)
+    PT = (39.399872, -8.224454)
+    PW = (7.51498, 134.58252)
+    PY = (-23.442503, -58.443832)
+    QA = (25.354826, 51.183884)
+    RE = (-21.115141, 55.536384)
+    RO = (45.943161, 24.96676)
+    RS = (44.016521, 21.005859)
+    RU = (61.52401, 105.318756)
+    RW = (-1.940278, 29.873888)
+    SA = (23.885942, 45.079162)
+    SB = (-9.64571, 160.156194)
+    SC = (-4.679574, 55.491977)
+    SD = (12.862807, 30.217636)
+    SE = (60.128161, 18.643501)
+    SG = (1.352083, 103.819836)
+    SH = (-24.143474, -10.030696)
+    SI = (46.151241, 14.995463)
+    SJ = (77.553604, 23.670272)
+    SK = (48.669026, 19.699024)
+    SL = (8.460555, -11.779889)
+    SM = (43.94236, 12.457777)
+    SN = (14.497401, -14.452362)
+    SO = (5.152149, 46.199616)
+    SR = (3.919305, -56.027783)
+    ST = (0.18636, 6.613081)
+    SV = (13.794185, -88.89653)
+    SY = (34.802075, 38.996815)
+    SZ = (-26.522503, 31.465866)
+    TC = (21.694025, -71.797928)
+    TD = (15.454166, 18.732207)
+    TF = (-49.280366, 69.348557)
+    TG = (8.619543, 0.824782)
+    TH = (15.870032, 100.992541)
+    TJ = (38.861034, 71.276093)
+    TK = (-8.967363, -171.855881)
+    TL = (-8.874217, 125.727539)
+    TM = (38.969719, 59.556278)
+    TN = (33.886917, 9.537499)
+    TO = (-21.178986, -175.198242)
+    TR = (38.963745, 35.243322)
+    TT = (10.691803, -61.222503)
+    TV = (-7.109535, 177.64933)
+    TW = (23.69781, 120.960515)
+    TZ = (-6.369028, 34.888822)
+    UA = (48.379433, 31.16558)
+    UG = (1.373333, 32.290275)
+    US = (37.09024, -95.712891)
+    UY = (-32.522779, -55.765835)
+    UZ = (41.377491, 64.585262)
+    VA = (41.902916, 12.453389)
+    VC = (12.984305, -61.287228)
+    VE = (6.42375, -66.58973)
+    VG = (18.420695, -64.639968)
+    VI = (18.335765, -64.896335)
+    VN = (14.058324, 108.277199)
+    VU = (-15.376706, 166.959158)
+    WF = (-13.768752, -177.156097)
+    WS = (-13.759029, -172.104629)
+    XK = (42.602636, 20.902977)
+    YE = (15.552727, 48.516388)
+    YT = (-12.8275, 45.166244)
+    ZA = (-30.559482, 22.937506)
+    ZM = (-13.133897, 27.849332)
+    ZW = (-19.015438, 29.154857)
+
+    @classmethod
+    def _missing_(cls, value: Any) -> Optional["Countries"]:
+        # a `Coordinate`, as returned by `value`
+        centroid = (getattr(value, "latitude", None), getattr(value, "longitude", None))
+        return cls._value2member_map_.get(centroid)
+
+    @property
+    def value(self) -> "Coordinate":
+        return _coordinate(*self._value_)
+
+    @property
+    def centroid(self) -> Tuple[float, float]:
+        """(latitude, longitude) without building a `Coordinate`."""
+        return self._value_
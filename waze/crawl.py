@@ -0,0 +1,300 @@
+import json
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .logger import get_logger
+
+if TYPE_CHECKING:
+    from .waze import Waze
+
+Task = Callable[["Waze", Any], Any]
+
+
+def _jsonable(obj: Any) -> Any:
+    from pydantic import BaseModel
+
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def item_key(item: Any) -> str:
+    """Checkpoint key of a work item: strings as is, anything else as
+    canonical JSON."""
+    if isinstance(item, str):
+        return item
+    return json.dumps(item, sort_keys=True, separators=(",", ":"), default=_jsonable)
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Shard of `key`, stable across runs and processes unlike `hash`."""
+    return zlib.crc32(key.encode()) % shards
+
+
+def _coordinate(point: Any) -> Any:
+    from .models import Coordinate
+
+    if isinstance(point, Coordinate):
+        return point
+    latitude, longitude = point
+    return Coordinate(latitude=latitude, longitude=longitude)
+
+
+def plan_task(waze: "Waze", item: Any) -> Any:
+    """Plans an item of (src, dst), as `Coordinate`s or (lat, lon) pairs."""
+    src, dst = item
+    return waze.plan(_coordinate(src), _coordinate(dst))
+
+
+def geocode_task(waze: "Waze", query: str) -> Any:
+    return waze.geocode(query)
+
+
+def venue_task(waze: "Waze", venue_id: str) -> Any:
+    return waze.venue(venue_id)
+
+
+def reviews_task(waze: "Waze", venue_id: str) -> Any:
+    """Reviews of a venue id, the venue is fetched for its googlePlaceId."""
+    return waze.reviews(waze.venue(venue_id))
+
+
+TASKS: Dict[str, Task] = {
+    "plan": plan_task,
+    "geocode": geocode_task,
+    "venue": venue_task,
+    "reviews": reviews_task,
+}
+
+
+class ShardStats:
+    """Outcome of one shard of a `Crawler.run`."""
+
+    def __init__(self, shard: int):
+        self.shard = shard
+        self.done = 0  # items completed in this run
+        self.skipped = 0  # items completed by an earlier run
+        self.errors = 0  # items that failed, retried by the next run
+        self.seconds = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Items completed per second."""
+        return self.done / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"ShardStats(shard={self.shard}, done={self.done}, "
+            f"skipped={self.skipped}, errors={self.errors}, "
+            f"throughput={self.throughput:.1f}/s)"
+        )
+
+
+def _open_log(path: str) -> BinaryIO:
+    """Opens an append-only log, cutting a line torn by a crash."""
+    f = open(path, "ab+")
+    size = f.seek(0, os.SEEK_END)
+    if size:
+        # walk back to the last complete line
+        end = size
+        while end > 0:
+            step = min(end, 4096)
+            f.seek(end - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                end = end - step + newline + 1
+                break
+            end -= step
+        if end != size:
+            f.truncate(end)
+    return f
+
+
+def _read_lines(path: str) -> Iterator[bytes]:
+    """Complete lines of a log, without a torn last line."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n"):
+                yield line
+
+
+def _run_shard(
+    directory: str,
+    shard: int,
+    items: List[Tuple[str, Any]],
+    task: Union[str, Task],
+    client_kwargs: Dict[str, Any],
+) -> ShardStats:
+    from .waze import Waze
+
+    fn = TASKS[task] if isinstance(task, str) else task
+    stats = ShardStats(shard)
+    checkpoint = os.path.join(directory, f"shard-{shard:03d}.log")
+    done = {json.loads(line) for line in _read_lines(checkpoint)}
+    todo = [(key, item) for key, item in items if key not in done]
+    stats.skipped = len(items) - len(todo)
+    if not todo:
+        return stats
+
+    start = time.perf_counter()
+    output_path = os.path.join(directory, f"shard-{shard:03d}.ndjson")
+    with Waze(**client_kwargs) as waze, _open_log(output_path) as output:
+        with _open_log(checkpoint) as log:
+            for key, item in todo:
+                try:
+                    result = fn(waze, item)
+                except Exception as e:
+                    waze.logger.error("[crawl] shard %d, %r failed: %s", shard, key, e)
+                    stats.errors += 1
+                    continue
+                # the result is written before its key is checkpointed, so a
+                # crash in between repeats the item rather than losing it
+                record = {"key": key, "result": result}
+                output.write(json.dumps(record, default=_jsonable).encode() + b"\n")
+                output.flush()
+                log.write(json.dumps(key).encode() + b"\n")
+                log.flush()
+                stats.done += 1
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+class Crawler:
+    """Runs a task over a large work list in worker processes, resumably.
+
+    Items are split into `shards` by a stable hash of their key, and each
+    shard runs in a worker process with its own `Waze` session. A shard
+    appends each result to `shard-NNN.ndjson` in `directory` and then its key
+    to the append-only checkpoint log `shard-NNN.log`. A restarted run skips
+    the items already checkpointed, and failed items are retried by the next
+    run. `merge` combines the shard outputs once the crawl is complete.
+
+    Args:
+        directory (str): Directory of checkpoints and shard outputs
+        task (Union[str, Callable[[Waze, Any], Any]]): "plan", "geocode",
+            "venue" or "reviews", or a picklable module level function
+            called with the worker's client and an item. Its result must be
+            JSON serializable or a pydantic model.
+        shards (int, optional): Shards, keep it the same across restarts.
+            Defaults to 8.
+        processes (int, optional): Worker processes. Defaults to `shards`.
+        key (Callable[[Any], str], optional): Checkpoint key of an item.
+            Defaults to `item_key`.
+        client_kwargs (Dict[str, Any], optional): `Waze` arguments of every
+            worker's session. Defaults to None.
+        log_level (str, optional): Verbosity of the progress log. Defaults
+            to "normal".
+
+    Example:
+        >>> crawler = Crawler("crawl/", "venue", shards=8, client_kwargs={...})
+        >>> stats = crawler.run(venue_ids)  # rerun after a crash to resume
+        >>> crawler.merge("venues.ndjson")
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        task: Union[str, Task],
+        shards: int = 8,
+        processes: Optional[int] = None,
+        key: Callable[[Any], str] = item_key,
+        client_kwargs: Optional[Dict[str, Any]] = None,
+        log_level: Optional[Literal["normal", "verbose", "quiet"]] = "normal",
+    ):
+        if isinstance(task, str) and task not in TASKS:
+            raise ValueError(f"Unknown task {task!r}, expected one of {list(TASKS)}")
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.directory = directory
+        self.task = task
+        self.shards = shards
+        self.processes = processes or shards
+        self.key = key
+        self.client_kwargs = client_kwargs or {}
+        self.logger = get_logger(log_level)
+        os.makedirs(directory, exist_ok=True)
+
+    def _shard_items(self, items: Iterable[Any]) -> List[List[Tuple[str, Any]]]:
+        shards: List[List[Tuple[str, Any]]] = [[] for _ in range(self.shards)]
+        seen: Set[str] = set()
+        for item in items:
+            key = self.key(item)
+            if key not in seen:
+                seen.add(key)
+                shards[shard_of(key, self.shards)].append((key, item))
+        return shards
+
+    def run(self, items: Iterable[Any]) -> List[ShardStats]:
+        """Crawls the items not completed yet, returning stats per shard."""
+        shards = self._shard_items(items)
+        with ProcessPoolExecutor(self.processes) as executor:
+            futures = [
+                executor.submit(
+                    _run_shard,
+                    self.directory,
+                    shard,
+                    shard_items,
+                    self.task,
+                    self.client_kwargs,
+                )
+                for shard, shard_items in enumerate(shards)
+                if shard_items
+            ]
+            results = [future.result() for future in futures]
+        for stats in results:
+            self.logger.info("[crawl] %s", stats)
+        return results
+
+    def completed(self) -> Set[str]:
+        """Keys checkpointed by any run."""
+        keys: Set[str] = set()
+        for shard in range(self.shards):
+            path = os.path.join(self.directory, f"shard-{shard:03d}.log")
+            keys.update(json.loads(line) for line in _read_lines(path))
+        return keys
+
+    def results(self) -> Iterator[Tuple[str, Any]]:
+        """(key, result) of every completed item, once each."""
+        done = self.completed()
+        for shard in range(self.shards):
+            path = os.path.join(self.directory, f"shard-{shard:03d}.ndjson")
+            seen: Set[str] = set()
+            for line in _read_lines(path):
+                record = json.loads(line)
+                key = record["key"]
+                # results not yet checkpointed are repeated by the next run
+                if key in done and key not in seen:
+                    seen.add(key)
+                    yield key, record["result"]
+
+    def merge(self, path: str) -> int:
+        """Writes every completed result to one NDJSON file at `path`,
+        returning how many were written."""
+        count = 0
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            for key, result in self.results():
+                f.write(json.dumps({"key": key, "result": result}).encode() + b"\n")
+                count += 1
+        os.replace(tmp, path)
+        return count
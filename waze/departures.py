@@ -0,0 +1,121 @@
+import math
+from array import array
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from .models import Coordinate
+from .utils import _numpy
+
+# where a slot's travel time came from
+MISSING = 0
+HISTOGRAM = 1  # `etaHistograms` of some response
+REQUESTED = 2  # `totalSeconds` of a request departing in that slot
+
+
+class DepartureSeries:
+    """Travel time of one route by departure time, on a regular grid of
+    `step` second slots from `start`.
+
+    Minutes are kept in a float64 array with NaN for slots nothing covered
+    and a per-slot `source`, so a day of slots costs a few hundred bytes.
+    Histogram values never replace a requested one.
+    """
+
+    def __init__(
+        self, src: Coordinate, dst: Coordinate, start: int, step: int, slots: int
+    ):
+        self.src = src
+        self.dst = dst
+        self.start = start
+        self.step = step
+        self.minutes = array("d", [math.nan]) * slots
+        self.source = bytearray(slots)
+        self.requests = 0  # planner requests made to build the series
+        self.errors = 0
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def __repr__(self) -> str:
+        return (
+            f"DepartureSeries(slots={len(self)}, step={self.step}, "
+            f"gaps={len(self.gaps())}, requests={self.requests})"
+        )
+
+    def __iter__(self) -> Iterator[Tuple[int, Optional[float]]]:
+        """Yields (unix timestamp, minutes or None) per slot."""
+        for i, minutes in enumerate(self.minutes):
+            yield self.time(i), None if self.source[i] == MISSING else minutes
+
+    def time(self, index: int) -> int:
+        return self.start + index * self.step
+
+    def slot(self, timestamp: float) -> Optional[int]:
+        """Index of the slot nearest to `timestamp`, None if outside."""
+        index = round((timestamp - self.start) / self.step)
+        return index if 0 <= index < len(self) else None
+
+    def containing(self, timestamp: float) -> Optional[int]:
+        """Index of the slot `timestamp` falls in, None if outside."""
+        index = math.floor((timestamp - self.start) / self.step)
+        return index if 0 <= index < len(self) else None
+
+    def at(self, timestamp: float) -> Optional[float]:
+        """Travel minutes departing at `timestamp`, from its nearest slot."""
+        index = self.slot(timestamp)
+        if index is None or self.source[index] == MISSING:
+            return None
+        return self.minutes[index]
+
+    def fill(self, timestamp: float, minutes: float, source: int) -> bool:
+        """Sets the slot `timestamp` falls in, within a minute since `at` has
+        minute resolution. Returns False if there is no such slot or it
+        already held a value at least as good."""
+        index = self.slot(timestamp)
+        if (
+            index is None
+            or abs(self.time(index) - timestamp) > 60
+            or self.source[index] >= source
+        ):
+            return False
+        self.minutes[index] = minutes
+        self.source[index] = source
+        return True
+
+    def fill_histogram(self, histogram: Iterable[Tuple[int, int]]) -> int:
+        """Fills slots from (eta, routeLengthInMinutes) pairs, returning how
+        many were filled."""
+        return sum(self.fill(eta, minutes, HISTOGRAM) for eta, minutes in histogram)
+
+    def gaps(self) -> List[int]:
+        """Timestamps of the slots without a value."""
+        return [self.time(i) for i, s in enumerate(self.source) if s == MISSING]
+
+    def to_numpy(self) -> Tuple[Any, Any]:
+        """Returns (timestamps, minutes) arrays, NaN where missing.
+
+        Raises:
+            ImportError: if numpy is not installed
+        """
+        np = _numpy("DepartureSeries.to_numpy")
+        times = np.arange(len(self), dtype=np.int64) * self.step + self.start
+        return times, np.frombuffer(self.minutes, dtype=np.float64)
+
+
+def covering_departures(gaps: List[int], before: float, after: float) -> List[int]:
+    """Picks departure slots among `gaps` so that histograms reaching
+    `before` seconds earlier and `after` seconds later than their departure
+    would cover every gap, greedily from the earliest."""
+    departures = []
+    covered_until = -math.inf
+    for i, gap in enumerate(gaps):
+        if gap <= covered_until:
+            continue
+        # the latest gap whose histogram still reaches back to `gap`
+        depart = gap
+        for later in gaps[i + 1 :]:
+            if later - before > gap:
+                break
+            depart = later
+        departures.append(depart)
+        covered_until = depart + after
+    return departures
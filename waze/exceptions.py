@@ -0,0 +1,7 @@
+from typing import Optional
+
+
+class WazeHTTPError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
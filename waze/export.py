@@ -0,0 +1,415 @@
+import json
+import os
+from importlib.util import find_spec
+from abc import ABC, abstractmethod
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .models import PlanResult, WazeTravelPlan, WazeVenue
+from .parsing import RouteAlternatives, parse_route
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # pragma: no cover
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+# (column, type) per table; non-nullable int64/float64 columns are buffered in
+# typed arrays, everything else in lists
+SCHEMAS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "routes": (
+        ("route_id", "int64"),
+        ("alternative", "int64"),
+        ("src_latitude", "float64"),
+        ("src_longitude", "float64"),
+        ("dst_latitude", "float64"),
+        ("dst_longitude", "float64"),
+        ("routeName", "string"),
+        ("totalSeconds", "int64"),
+        ("totalLength", "int64"),
+        ("isToll", "bool"),
+        ("isFastest", "bool"),
+        ("tollPrice", "float64"),
+        ("cacheAge", "float64?"),
+        ("vertices", "int64"),
+    ),
+    "vertices": (
+        ("route_id", "int64"),
+        ("seq", "int64"),
+        ("longitude", "float64"),
+        ("latitude", "float64"),
+    ),
+    "alerts": (
+        ("route_id", "int64"),
+        ("id", "int64"),
+        ("type", "string"),
+        ("subtype", "string"),
+        ("latitude", "float64"),
+        ("longitude", "float64"),
+    ),
+    "eta_histograms": (
+        ("route_id", "int64"),
+        ("eta", "int64"),
+        ("routeLengthInMinutes", "int64"),
+        ("text", "string"),
+    ),
+    "venues": (
+        ("id", "string"),
+        ("name", "string"),
+        ("alternativeName", "string"),
+        ("googlePlaceId", "string"),
+        ("geoEnv", "string"),
+        ("latitude", "float64?"),
+        ("longitude", "float64?"),
+        ("countryCode", "string"),
+        ("countryName", "string"),
+        ("state", "string"),
+        ("city", "string"),
+        ("street", "string"),
+        ("houseNumber", "int64?"),
+        ("phone", "string"),
+        ("url", "string"),
+        ("services", "string"),  # comma separated
+        ("images", "int64"),
+        ("lastUpdateDate", "int64?"),
+        ("creationDate", "int64?"),
+    ),
+}
+
+_TYPECODES = {"int64": "q", "float64": "d"}
+
+# rough per-value sizes used to enforce the batch memory ceiling
+_VALUE_BYTES = {"int64": 8, "float64": 8, "bool": 1}
+_OBJECT_BYTES = 16
+
+
+def _new_column(kind: str) -> Union[array, List[Any]]:
+    typecode = _TYPECODES.get(kind)  # None for nullable "kind?" columns
+    return array(typecode) if typecode is not None else []
+
+
+def _row_bytes(schema: Tuple[Tuple[str, str], ...], row: Tuple[Any, ...]) -> int:
+    size = 0
+    for (_, kind), value in zip(schema, row):
+        if kind == "string":
+            size += _OBJECT_BYTES + len(value or "")
+        else:
+            size += _VALUE_BYTES.get(kind, _OBJECT_BYTES)  # nullable are boxed
+    return size
+
+
+class ColumnarSink(ABC):
+    """Buffers plans and venues into per-table columns and writes them out in
+    batches.
+
+    Plans are split into the `routes`, `vertices`, `alerts` and
+    `eta_histograms` tables joined on `route_id`, venues go to `venues`. A
+    table is flushed once its buffered columns reach `max_batch_bytes`, so
+    memory stays bounded whatever the length of the stream.
+
+    Args:
+        directory (str): Output directory, one file per table
+        max_batch_bytes (int, optional): Approximate size of a table's
+            buffered columns before they are written. Defaults to 16 MiB.
+    """
+
+    extension: str = ""
+
+    def __init__(self, directory: str, max_batch_bytes: int = 16 * 2**20):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_batch_bytes = max_batch_bytes
+        self.rows: Dict[str, int] = dict.fromkeys(SCHEMAS, 0)
+        self._next_route_id = 0
+        self._columns = {table: self._empty(table) for table in SCHEMAS}
+        self._bytes = dict.fromkeys(SCHEMAS, 0)
+
+    def __enter__(self) -> "ColumnarSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def _empty(table: str) -> List[Union[array, List[Any]]]:
+        return [_new_column(kind) for _, kind in SCHEMAS[table]]
+
+    def path(self, table: str) -> str:
+        return os.path.join(self.directory, table + self.extension)
+
+    def _append(self, table: str, row: Tuple[Any, ...]) -> None:
+        for column, value in zip(self._columns[table], row):
+            column.append(value)
+        self._buffered(table, _row_bytes(SCHEMAS[table], row))
+
+    def _buffered(self, table: str, size: int) -> None:
+        self._bytes[table] += size
+        if self._bytes[table] >= self.max_batch_bytes:
+            self.flush(table)
+
+    def write(self, item: Any) -> None:
+        """Writes a `WazeTravelPlan`, `RouteAlternatives`, `PlanResult` or
+        `WazeVenue`. Failed `PlanResult`s are skipped, the raw route dicts of
+        a `validate="none"` client are built into plans first."""
+        if isinstance(item, PlanResult):
+            if isinstance(item.plan, dict):
+                self.write_plan(
+                    parse_route(item.src, item.dst, item.plan, validate="fast")
+                )
+            elif item.plan is not None:
+                self.write(item.plan)
+        elif isinstance(item, WazeTravelPlan):
+            self.write_plan(item)
+        elif isinstance(item, RouteAlternatives):
+            for alternative, plan in enumerate(item):
+                self.write_plan(plan, alternative)
+        elif isinstance(item, WazeVenue):
+            self.write_venue(item)
+        else:
+            raise TypeError(f"Cannot export {type(item).__name__}")
+
+    def write_all(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.write(item)
+
+    def write_plan(self, plan: WazeTravelPlan, alternative: int = 0) -> int:
+        """Writes one route and returns its `route_id`."""
+        route_id = self._next_route_id
+        self._next_route_id += 1
+        n = len(plan.geoPath)
+        self._append(
+            "routes",
+            (
+                route_id,
+                alternative,
+                plan.src.latitude,
+                plan.src.longitude,
+                plan.dst.latitude,
+                plan.dst.longitude,
+                plan.routeName,
+                plan.totalSeconds,
+                plan.totalLength,
+                plan.isToll,
+                plan.isFastest,
+                plan.tollPriceInfo.tollPrice,
+                plan.cacheAge,
+                n,
+            ),
+        )
+
+        # vertices are exploded column-wise straight from the packed buffer
+        ids, seq, lons, lats = self._columns["vertices"]
+        ids.extend(array("q", [route_id]) * n)
+        seq.extend(array("q", range(n)))
+        lon, lat = plan.geoPath.columns()
+        lons.extend(lon)
+        lats.extend(lat)
+        self._buffered("vertices", 32 * n)
+
+        for alert in plan.alerts:
+            self._append(
+                "alerts",
+                (
+                    route_id,
+                    alert.id,
+                    alert.type,
+                    alert.subtype,
+                    alert.location.latitude,
+                    alert.location.longitude,
+                ),
+            )
+        for item in plan.etaHistograms or ():
+            self._append(
+                "eta_histograms",
+                (route_id, item.eta, item.routeLengthInMinutes, item.text),
+            )
+        return route_id
+
+    def write_venue(self, venue: WazeVenue) -> None:
+        address = venue.address
+        self._append(
+            "venues",
+            (
+                venue.id,
+                venue.name,
+                venue.alternativeName,
+                venue.googlePlaceId,
+                venue.geoEnv,
+                venue.latLng.latitude if venue.latLng else None,
+                venue.latLng.longitude if venue.latLng else None,
+                address.countryCode if address else None,
+                address.countryName if address else None,
+                address.state if address else None,
+                address.city if address else None,
+                address.street if address else None,
+                address.houseNumber if address else None,
+                venue.phone.text if venue.phone else None,
+                venue.url.href if venue.url else None,
+                ",".join(venue.services) if venue.services is not None else None,
+                len(venue.images or ()),
+                venue.lastUpdateDate,
+                venue.creationDate,
+            ),
+        )
+
+    def flush(self, table: Optional[str] = None) -> None:
+        """Writes the buffered rows of `table`, or of every table."""
+        for name in [table] if table is not None else list(SCHEMAS):
+            columns = self._columns[name]
+            n = len(columns[0])
+            if not n:
+                continue
+            self._write_batch(name, columns, n)
+            self.rows[name] += n
+            self._columns[name] = self._empty(name)
+            self._bytes[name] = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._close()
+
+    @abstractmethod
+    def _write_batch(
+        self, table: str, columns: List[Union[array, List[Any]]], n: int
+    ) -> None:
+        """Appends `n` buffered rows to the table's file."""
+
+    def _close(self) -> None:
+        """Releases any open files."""
+
+
+class NDJSONSink(ColumnarSink):
+    """Writes each table as newline delimited JSON, one object per row."""
+
+    extension = ".ndjson"
+
+    def __init__(self, directory: str, max_batch_bytes: int = 16 * 2**20):
+        super().__init__(directory, max_batch_bytes)
+        self._files: Dict[str, Any] = {}
+
+    def _write_batch(
+        self, table: str, columns: List[Union[array, List[Any]]], n: int
+    ) -> None:
+        f = self._files.get(table)
+        if f is None:
+            f = self._files[table] = open(self.path(table), "wb")
+        names = [name for name, _ in SCHEMAS[table]]
+        f.writelines(_dumps(dict(zip(names, row))) + b"\n" for row in zip(*columns))
+
+    def _close(self) -> None:
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+class ArrowSink(ColumnarSink):
+    """Writes each table as Parquet or as an Arrow IPC file, one row group
+    or record batch per flushed batch.
+
+    Typed columns are handed to Arrow as buffers without copying values
+    through Python objects.
+
+    Args:
+        directory (str): Output directory, one file per table
+        format (str, optional): "parquet" or "arrow". Defaults to "parquet".
+        max_batch_bytes (int, optional): See `ColumnarSink`.
+
+    Raises:
+        ImportError: if pyarrow is not installed
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        format: str = "parquet",
+        max_batch_bytes: int = 16 * 2**20,
+    ):
+        # imported here, pyarrow takes longer to import than the rest of the
+        # package
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError(
+                "ArrowSink requires pyarrow, install it with "
+                "`pip install waze-traffic-api[arrow]`"
+            ) from e
+        if format not in ("parquet", "arrow"):
+            raise ValueError(f"Unknown format {format!r}")
+        self._pa = pa
+        self.format = format
+        self.extension = "." + format
+        super().__init__(directory, max_batch_bytes)
+        self._writers: Dict[str, Any] = {}
+        types = {
+            "int64": pa.int64(),
+            "float64": pa.float64(),
+            "bool": pa.bool_(),
+            "string": pa.string(),
+        }
+        self._schemas = {
+            table: pa.schema(
+                [pa.field(name, types[kind.rstrip("?")]) for name, kind in schema]
+            )
+            for table, schema in SCHEMAS.items()
+        }
+
+    def _writer(self, table: str) -> Any:
+        writer = self._writers.get(table)
+        if writer is None:
+            schema = self._schemas[table]
+            if self.format == "parquet":
+                import pyarrow.parquet as pq
+
+                writer = pq.ParquetWriter(self.path(table), schema)
+            else:
+                writer = self._pa.ipc.new_file(self.path(table), schema)
+            self._writers[table] = writer
+        return writer
+
+    def _write_batch(
+        self, table: str, columns: List[Union[array, List[Any]]], n: int
+    ) -> None:
+        pa = self._pa
+        schema = self._schemas[table]
+        arrays = [
+            pa.Array.from_buffers(field.type, n, [None, pa.py_buffer(column)])
+            if isinstance(column, array)
+            else pa.array(column, type=field.type)
+            for field, column in zip(schema, columns)
+        ]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+        if self.format == "parquet":
+            self._writer(table).write_batch(batch)
+        else:
+            self._writer(table).write(batch)
+
+    def _close(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+
+def open_sink(
+    directory: str, format: Optional[str] = None, max_batch_bytes: int = 16 * 2**20
+) -> ColumnarSink:
+    """Opens a sink writing to `directory`.
+
+    Args:
+        directory (str): Output directory, one file per table
+        format (str, optional): "parquet", "arrow" or "ndjson". Defaults to
+            "parquet" when pyarrow is installed, "ndjson" otherwise.
+        max_batch_bytes (int, optional): See `ColumnarSink`.
+
+    Returns:
+        ColumnarSink: Use as a context manager, or call `close` when done
+    """
+    if format is None:
+        format = "parquet" if find_spec("pyarrow") is not None else "ndjson"
+    if format == "ndjson":
+        return NDJSONSink(directory, max_batch_bytes)
+    return ArrowSink(directory, format, max_batch_bytes)
@@ -0,0 +1,188 @@
+import struct
+import sys
+from array import array
+from itertools import chain
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    overload,
+)
+
+from pydantic_core import core_schema
+
+if TYPE_CHECKING:
+    from .models import Coordinate
+
+# WKB byte order flag matching the host, so the packed buffer needs no swapping
+_WKB_BYTE_ORDER = 1 if sys.byteorder == "little" else 0
+_WKB_LINESTRING = 2
+
+
+class GeoPath(Sequence["Coordinate"]):
+    """Route geometry stored as a packed float64 buffer of interleaved
+    (longitude, latitude) pairs.
+
+    Indexing and iteration yield `Coordinate` objects on demand, while
+    `to_numpy` and `to_wkb` expose the buffer without per-vertex work.
+
+    Args:
+        coords (optional): Flat float64 buffer of `x0, y0, x1, y1, ...`,
+            either an `array('d')`, a NumPy array or any iterable of floats.
+    """
+
+    __slots__ = ("_coords",)
+
+    def __init__(self, coords: Optional[Any] = None):
+        if coords is None:
+            coords = array("d")
+        elif hasattr(coords, "__array__"):
+            import numpy as np
+
+            coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1)
+        elif not isinstance(coords, array) or coords.typecode != "d":
+            coords = array("d", coords)
+        if len(coords) % 2:
+            raise ValueError("GeoPath buffer must hold (x, y) pairs")
+        self._coords = coords
+
+    @classmethod
+    def from_coords(cls, coords: Iterable[Any]) -> "GeoPath":
+        """Builds a `GeoPath` from raw Waze `{"x": .., "y": ..}` dicts or any
+        `Coordinate` compatible objects."""
+        coords = list(coords)
+        try:
+            return cls(
+                array("d", chain.from_iterable((o["x"], o["y"]) for o in coords))
+            )
+        except (KeyError, TypeError):
+            points = [
+                o if isinstance(o, models.Coordinate) else models.Coordinate(**o)
+                for o in coords
+            ]
+            return cls(
+                array(
+                    "d", chain.from_iterable((p.longitude, p.latitude) for p in points)
+                )
+            )
+
+    def __len__(self) -> int:
+        return len(self._coords) // 2
+
+    @overload
+    def __getitem__(self, index: int) -> "Coordinate": ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "GeoPath": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return GeoPath(
+                    chain.from_iterable(
+                        self._coords[2 * i : 2 * i + 2]
+                        for i in range(start, stop, step)
+                    )
+                )
+            return GeoPath(self._coords[2 * start : 2 * max(start, stop)])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("GeoPath index out of range")
+        return models.Coordinate.model_construct(
+            latitude=float(self._coords[2 * index + 1]),
+            longitude=float(self._coords[2 * index]),
+        )
+
+    def __iter__(self) -> Iterator["Coordinate"]:
+        coords = self._coords
+        for i in range(0, len(coords), 2):
+            yield models.Coordinate.model_construct(
+                latitude=float(coords[i + 1]), longitude=float(coords[i])
+            )
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, GeoPath):
+            return len(self._coords) == len(other._coords) and all(
+                a == b for a, b in zip(self._coords, other._coords)
+            )
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(
+                a.latitude == b.latitude and a.longitude == b.longitude
+                for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"GeoPath(n={len(self)})"
+
+    def columns(self) -> Tuple[array, array]:
+        """Returns the longitudes and latitudes as two `array('d')` columns."""
+        coords = self._coords
+        if isinstance(coords, array):
+            return coords[0::2], coords[1::2]
+        lons, lats = array("d"), array("d")
+        lons.frombytes(coords[0::2].tobytes())
+        lats.frombytes(coords[1::2].tobytes())
+        return lons, lats
+
+    def to_numpy(self):
+        """Returns an (N, 2) float64 array of (longitude, latitude) sharing
+        memory with this path."""
+        # `utils` imports `models`, which imports this module
+        from .utils import _numpy
+
+        np = _numpy("GeoPath.to_numpy")
+        return np.frombuffer(self._coords, dtype=np.float64).reshape(-1, 2)
+
+    def to_wkb(self) -> bytes:
+        """Returns the path as a WKB LineString in host byte order.
+
+        The coordinate buffer needs no conversion, only a copy behind the
+        header, readable by `shapely.from_wkb` or `geopandas.GeoSeries.from_wkb`.
+        """
+        header = struct.pack("=BII", _WKB_BYTE_ORDER, _WKB_LINESTRING, len(self))
+        return b"".join((header, memoryview(self._coords)))
+
+    def to_list(self) -> List["Coordinate"]:
+        return list(self)
+
+    @classmethod
+    def _validate(cls, value: Any) -> "GeoPath":
+        if isinstance(value, GeoPath):
+            return value
+        return cls.from_coords(value)
+
+    @staticmethod
+    def _serialize(value: "GeoPath") -> List["Coordinate"]:
+        return list(value)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any):
+        # serialized through the `Coordinate` schema, which also gives the
+        # plain validator the JSON schema it lacks
+        coordinates = core_schema.list_schema(
+            handler.generate_schema(models.Coordinate)
+        )
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls._serialize, return_schema=coordinates
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: Any, handler: Any):
+        # a list of `Coordinate` both ways
+        return handler(schema["serialization"]["return_schema"])
+
+
+# imported last, `models` imports `GeoPath` from this module for
+# `WazeTravelPlan.geoPath`
+from . import models  # noqa: E402
@@ -0,0 +1,115 @@
+import math
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .models import Coordinate
+from .utils import _numpy
+
+# per-cell status codes of `TravelMatrix.status`
+PENDING = 0
+OK = 1
+ERROR = 2
+
+Pair = Tuple[float, float, float, float]
+
+
+def _point(coordinate: Coordinate) -> Tuple[float, float]:
+    return coordinate.latitude, coordinate.longitude
+
+
+class TravelMatrix:
+    """Dense origin-destination matrix of travel times and distances.
+
+    Cells are stored row-major in flat arrays, `durations[i * m + j]` holding
+    the seconds from `origins[i]` to `destinations[j]`. Cells that were never
+    fetched or failed hold NaN, their `status` tells which.
+
+    Args:
+        origins (Sequence[Coordinate]): Row coordinates
+        destinations (Sequence[Coordinate]): Column coordinates
+    """
+
+    def __init__(
+        self, origins: Sequence[Coordinate], destinations: Sequence[Coordinate]
+    ):
+        self.origins = list(origins)
+        self.destinations = list(destinations)
+        size = len(self.origins) * len(self.destinations)
+        self.durations = array("d", [math.nan]) * size  # seconds
+        self.distances = array("d", [math.nan]) * size  # meters
+        self.fetched_at = array("d", [0.0]) * size  # unix timestamp
+        self.status = bytearray(size)
+        self.errors: Dict[Tuple[int, int], Exception] = {}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.origins), len(self.destinations)
+
+    def __repr__(self) -> str:
+        n, m = self.shape
+        return f"TravelMatrix({n}x{m}, ok={self.status.count(OK)})"
+
+    def duration(self, i: int, j: int) -> float:
+        return self.durations[i * len(self.destinations) + j]
+
+    def distance(self, i: int, j: int) -> float:
+        return self.distances[i * len(self.destinations) + j]
+
+    def set(
+        self,
+        i: int,
+        j: int,
+        duration: float,
+        distance: float,
+        fetched_at: Optional[float] = None,
+    ) -> None:
+        cell = i * len(self.destinations) + j
+        self.durations[cell] = duration
+        self.distances[cell] = distance
+        self.fetched_at[cell] = time.time() if fetched_at is None else fetched_at
+        self.status[cell] = OK
+        self.errors.pop((i, j), None)
+
+    def fail(self, i: int, j: int, error: Exception) -> None:
+        cell = i * len(self.destinations) + j
+        self.durations[cell] = self.distances[cell] = math.nan
+        self.status[cell] = ERROR
+        self.errors[i, j] = error
+
+    def stale(self, max_age: Optional[float] = None) -> Iterator[Tuple[int, int]]:
+        """Yields the cells that need fetching: pending, failed, or older than
+        `max_age` seconds when given."""
+        m = len(self.destinations)
+        cutoff = time.time() - max_age if max_age is not None else None
+        for cell, status in enumerate(self.status):
+            if status != OK or (cutoff is not None and self.fetched_at[cell] < cutoff):
+                yield divmod(cell, m)
+
+    def unique_pairs(
+        self, cells: Iterator[Tuple[int, int]], symmetric: bool = False
+    ) -> Iterator[Tuple[Pair, List[Tuple[int, int]]]]:
+        """Groups cells by the coordinate pair they need, so each distinct
+        pair is requested once. With `symmetric`, A->B and B->A share one
+        request."""
+        pairs: Dict[Pair, List[Tuple[int, int]]] = {}
+        for i, j in cells:
+            src, dst = _point(self.origins[i]), _point(self.destinations[j])
+            if symmetric and dst < src:
+                src, dst = dst, src
+            pairs.setdefault(src + dst, []).append((i, j))
+        return iter(pairs.items())
+
+    def to_numpy(self) -> Tuple[Any, Any, Any]:
+        """Returns (durations, distances, status) as zero-copy (n, m) arrays.
+
+        Raises:
+            ImportError: if numpy is not installed
+        """
+        np = _numpy("TravelMatrix.to_numpy")
+        shape = self.shape
+        return (
+            np.frombuffer(self.durations, dtype=np.float64).reshape(shape),
+            np.frombuffer(self.distances, dtype=np.float64).reshape(shape),
+            np.frombuffer(self.status, dtype=np.uint8).reshape(shape),
+        )
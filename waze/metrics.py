@@ -0,0 +1,282 @@
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from requests import PreparedRequest, RequestException, Response
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .adapters import PooledHTTPAdapter
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PARSE_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1)
+
+
+class RequestEvent(NamedTuple):
+    """One logical request, retries included.
+
+    `connect` covers DNS, TCP and TLS of a newly opened connection, neither
+    transport reports name resolution on its own; it is None when a pooled
+    connection was reused. `ttfb` is the time from sending the request to
+    receiving the response headers of the last attempt.
+    """
+
+    endpoint: Optional[str]
+    method: str
+    url: str
+    status_code: Optional[int]
+    retries: int
+    bytes_out: int
+    bytes_in: int
+    connect: Optional[float]
+    ttfb: Optional[float]
+    total: float
+    error: Optional[Exception] = None
+
+
+class ParseEvent(NamedTuple):
+    endpoint: str
+    phase: str  # "decode" or "validate"
+    seconds: float
+
+
+class Hooks:
+    """Callbacks invoked by the clients for every request and parse step.
+
+    A client without hooks skips all timing, so instrumentation costs nothing
+    unless it is enabled.
+    """
+
+    def __init__(self):
+        self.request: List[Callable[[RequestEvent], None]] = []
+        self.parse: List[Callable[[ParseEvent], None]] = []
+
+    def on_request(self, fn: Callable[[RequestEvent], None]) -> Callable:
+        self.request.append(fn)
+        return fn
+
+    def on_parse(self, fn: Callable[[ParseEvent], None]) -> Callable:
+        self.parse.append(fn)
+        return fn
+
+    def emit_request(self, event: RequestEvent) -> None:
+        for fn in self.request:
+            fn(event)
+
+    def emit_parse(self, event: ParseEvent) -> None:
+        for fn in self.parse:
+            fn(event)
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Prometheus style counters and histograms per endpoint, fed by `Hooks`.
+
+    Example:
+        >>> metrics = Metrics()
+        >>> waze = Waze(hooks=metrics.hooks)
+        >>> print(metrics.render())
+    """
+
+    def __init__(self, hooks: Optional[Hooks] = None, prefix: str = "waze"):
+        self.prefix = prefix
+        self.hooks = hooks if hooks is not None else Hooks()
+        self.hooks.on_request(self.observe_request)
+        self.hooks.on_parse(self.observe_parse)
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _inc(self, name: str, labels: Dict[str, Any], value: float = 1) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def _observe(
+        self,
+        name: str,
+        labels: Dict[str, Any],
+        value: float,
+        buckets: Tuple[float, ...] = DURATION_BUCKETS,
+    ) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = _Histogram(buckets)
+        histogram.observe(value)
+
+    def observe_request(self, event: RequestEvent) -> None:
+        endpoint = {"endpoint": event.endpoint or "other"}
+        status = event.status_code if event.error is None else "error"
+        with self._lock:
+            self._inc("requests_total", {**endpoint, "status": status})
+            self._inc("request_retries_total", endpoint, event.retries)
+            self._inc("request_bytes_sent_total", endpoint, event.bytes_out)
+            self._inc("request_bytes_received_total", endpoint, event.bytes_in)
+            self._observe("request_duration_seconds", endpoint, event.total)
+            if event.ttfb is not None:
+                self._observe("request_ttfb_seconds", endpoint, event.ttfb)
+            if event.connect is not None:
+                self._observe("request_connect_seconds", endpoint, event.connect)
+
+    def observe_parse(self, event: ParseEvent) -> None:
+        labels = {"endpoint": event.endpoint, "phase": event.phase}
+        with self._lock:
+            self._observe(
+                "parse_duration_seconds", labels, event.seconds, PARSE_BUCKETS
+            )
+
+    def counter(self, name: str, **labels: Any) -> float:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        return self._counters.get(key, 0)
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text exposition format."""
+
+        def fmt(labels: Tuple[Tuple[str, str], ...]) -> str:
+            return ",".join(f'{k}="{v}"' for k, v in labels)
+
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda i: i[0])
+            typed = set()
+            for (name, labels), value in counters:
+                name = f"{self.prefix}_{name}"
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{{{fmt(labels)}}} {value:g}")
+            for (name, labels), histogram in histograms:
+                name = f"{self.prefix}_{name}"
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                    cumulative += count
+                    le = (("le", f"{bound:g}" if bound != "+Inf" else bound),)
+                    lines.append(f"{name}_bucket{{{fmt(labels + le)}}} {cumulative}")
+                lines.append(f"{name}_sum{{{fmt(labels)}}} {histogram.sum:g}")
+                lines.append(f"{name}_count{{{fmt(labels)}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def timed(
+    hooks: Optional[Hooks],
+    endpoint: str,
+    phase: str,
+    fn: Callable[..., Any],
+    *args: Any,
+) -> Any:
+    """Calls `fn(*args)`, emitting a `ParseEvent` with its duration if
+    `hooks` is set."""
+    if hooks is None:
+        return fn(*args)
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        hooks.emit_parse(ParseEvent(endpoint, phase, time.perf_counter() - start))
+
+
+# connect time of the connections opened by the current thread's request
+_connect = threading.local()
+
+
+def reset_connect_time() -> None:
+    _connect.seconds = None
+
+
+def connect_time() -> Optional[float]:
+    return getattr(_connect, "seconds", None)
+
+
+def _record_connect(start: float) -> None:
+    _connect.seconds = (connect_time() or 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        super().connect()
+        _record_connect(start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        super().connect()
+        _record_connect(start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(PooledHTTPAdapter):
+    """`PooledHTTPAdapter` whose connections record how long they took to open.
+
+    The seconds spent connecting, None if a pooled connection was reused, are
+    set as `connect_time` on the response, or on the exception if the request
+    failed, so they survive requests sent from another thread.
+    """
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:
+        reset_connect_time()
+        try:
+            response = super().send(request, *args, **kwargs)
+        except RequestException as e:
+            e.connect_time = connect_time()
+            raise
+        response.connect_time = connect_time()
+        return response
+
+
+class HttpxTrace:
+    """httpx `trace` extension collecting connect time and TTFB."""
+
+    __slots__ = ("attempts", "connect", "ttfb", "_connect_start", "_send_start")
+
+    def __init__(self):
+        self.attempts = 0
+        self.connect: Optional[float] = None
+        self.ttfb: Optional[float] = None
+        self._connect_start = self._send_start = 0.0
+
+    async def __call__(self, name: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        if name == "connection.connect_tcp.started":
+            self._connect_start = now
+        elif name in (
+            "connection.connect_tcp.complete",
+            "connection.start_tls.complete",
+        ):
+            self.connect = now - self._connect_start
+        elif name.endswith("send_request_headers.started"):
+            self._send_start = now
+        elif name.endswith("receive_response_headers.complete"):
+            self.ttfb = now - self._send_start
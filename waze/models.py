@@ -1,8 +1,15 @@
-from typing import List, Optional, TypedDict
-from pydantic import AliasChoices, BaseModel, Field
+from typing import Any, Dict, List, Optional, TypedDict, Union
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
+from .geometry import GeoPath
 
-class Coordinate(BaseModel):
+
+class _Model(BaseModel):
+    # core schemas are built on first validation instead of at import
+    model_config = ConfigDict(defer_build=True)
+
+
+class Coordinate(_Model):
     name: Optional[str] = Field(default=None)
     latitude: float = Field(
         ...,
@@ -23,40 +30,41 @@ class WazeGeocodeParams(TypedDict):
     lang: str
 
 
-class WazeRequestBody(BaseModel):
+class WazeRequestBody(_Model):
     from_: Coordinate = Field(..., alias="from")
     to: Coordinate = Field(...)
     nPaths: int = Field(default=1)
     useCase: str = Field(default="LIVEMAP_PLANNING")
     interval: int = Field(default=100)
     arriveAt: bool = Field(default=True)
+    at: Optional[int] = Field(default=None)  # minutes from now, omitted if None
 
     class Config:
         populate_by_name = True
 
 
-class TollPriceItem(BaseModel):
+class TollPriceItem(_Model):
     tollPrice: float
 
 
-class ETAHistogramItem(BaseModel):
+class ETAHistogramItem(_Model):
     eta: int  # unix timestamp
     routeLengthInMinutes: int
     text: str
 
 
-class Alert(BaseModel):
+class Alert(_Model):
     id: int
     type: str
     subtype: str
     location: Coordinate
 
 
-class WazeTravelPlan(BaseModel):
+class WazeTravelPlan(_Model):
     src: Coordinate
     dst: Coordinate
     routeName: str
-    geoPath: List[Coordinate]
+    geoPath: GeoPath  # packed (longitude, latitude) buffer
     alerts: List[Alert]
     totalSeconds: int  # estimated journey time in seconds
     totalLength: int  # distance in meters
@@ -64,16 +72,33 @@ class WazeTravelPlan(BaseModel):
     isFastest: bool
     tollPriceInfo: TollPriceItem
     etaHistograms: Optional[List[ETAHistogramItem]] = None
+    cacheAge: Optional[float] = None  # seconds since fetched, None if fresh
+
+
+class PlanResult(_Model):
+    index: int  # position of the pair in the input
+    src: Coordinate
+    dst: Coordinate
+    # the raw route dict when the client has validate="none"
+    plan: Union[WazeTravelPlan, Dict[str, Any], None] = None
+    error: Optional[Exception] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
-class ViewBox(BaseModel):
+class ViewBox(_Model):
     long1: float
     lat1: float
     long2: float
     lat2: float
 
 
-class WazeLocation(BaseModel):
+class WazeLocation(_Model):
     address: str
     cleanName: str
     latLng: Coordinate
@@ -81,7 +106,7 @@ class WazeLocation(BaseModel):
     venueId: str
 
 
-class WazeVenueAddress(BaseModel):
+class WazeVenueAddress(_Model):
     countryCode: Optional[str] = None
     countryName: Optional[str] = None
     state: Optional[str] = None
@@ -93,27 +118,27 @@ class WazeVenueAddress(BaseModel):
     houseNumber: Optional[int] = None
 
 
-class WazeVenueLink(BaseModel):
+class WazeVenueLink(_Model):
     href: str
     text: str
 
 
-class ImageType(BaseModel):
+class ImageType(_Model):
     small: str
     large: str
 
 
-class WazeVenueImage(BaseModel):
+class WazeVenueImage(_Model):
     id: str
     src: ImageType
 
 
-class TimeUnit(BaseModel):
+class TimeUnit(_Model):
     hours: int
     minutes: int
 
 
-class WazeVenueHours(BaseModel):
+class WazeVenueHours(_Model):
     day: int
     from_: TimeUnit = Field(..., alias="from")
     to: TimeUnit
@@ -122,7 +147,7 @@ class WazeVenueHours(BaseModel):
         populate_by_name = True
 
 
-class WazeVenue(BaseModel):
+class WazeVenue(_Model):
     geoEnv: Optional[str] = None
     latLng: Optional[Coordinate] = None
     id: Optional[str] = None
@@ -139,7 +164,7 @@ class WazeVenue(BaseModel):
     alternativeName: Optional[str] = None
 
 
-class Review(BaseModel):
+class Review(_Model):
     author_name: str
     author_url: str
     profile_photo_url: str
@@ -149,11 +174,11 @@ class Review(BaseModel):
     time: int  # unix timestamp
 
 
-class Ratings(BaseModel):
+class Ratings(_Model):
     average: float
     counts: List[int]  # idk what this is
 
 
-class WazeReview(BaseModel):
+class WazeReview(_Model):
     reviews: List[Review]
     ratings: Ratings
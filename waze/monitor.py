@@ -0,0 +1,227 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .models import Coordinate
+from .parsing import route_summary
+
+if TYPE_CHECKING:
+    from .aio import AsyncWaze
+    from .waze import Waze
+
+
+class RouteRecord(NamedTuple):
+    timestamp: float  # unix time the request was issued
+    route: int  # position of the route in the watchlist
+    totalSeconds: Optional[int]
+    totalLength: Optional[int]
+    alertIds: Tuple[int, ...] = ()
+    error: Optional[str] = None  # repr of the exception if the request failed
+
+
+class RouteMonitor:
+    """Re-plans a fixed watchlist of routes every `interval` seconds.
+
+    Requests are spread evenly over the interval instead of being fired in
+    bursts: route i of n is planned at `i * interval / n` into every cycle.
+    Polls bypass the client's plan cache, so every record is a fresh
+    response. A route whose previous request is still running skips its
+    slot, and records wait in a buffer of `buffer_size` that drops the oldest
+    record when the consumer falls behind, so memory stays bounded however
+    long the monitor runs.
+
+    Works with either client: `stream`/`run` for `Waze`, `astream`/`arun`
+    for `AsyncWaze`.
+
+    Args:
+        client (Union[Waze, AsyncWaze]): Client used for planning
+        watchlist (Sequence[Tuple[Coordinate, Coordinate]]): (src, dst) pairs
+        interval (float, optional): Seconds between two plans of the same
+            route. Defaults to 300.
+        max_workers (int, optional): Worker threads of the sync client.
+            Defaults to 8.
+        buffer_size (int, optional): Records kept for a slow consumer.
+            Defaults to 1024.
+    """
+
+    def __init__(
+        self,
+        client: Union["Waze", "AsyncWaze"],
+        watchlist: Sequence[Tuple[Coordinate, Coordinate]],
+        interval: float = 300,
+        max_workers: int = 8,
+        buffer_size: int = 1024,
+    ):
+        if not watchlist:
+            raise ValueError("watchlist is empty")
+        self.client = client
+        self.watchlist = list(watchlist)
+        self.interval = interval
+        self.max_workers = max_workers
+        self.buffer_size = buffer_size
+        self.dropped = 0  # records discarded because the buffer was full
+        self.skipped = 0  # slots skipped because the route was still in flight
+        self._in_flight: List[bool] = [False] * len(self.watchlist)
+        self._stop = threading.Event()
+
+    def schedule(self, cycles: Optional[int] = None) -> Iterator[Tuple[float, int]]:
+        """Yields (monotonic due time, route index) in firing order."""
+        step = self.interval / len(self.watchlist)
+        start = time.monotonic()
+        slot = 0
+        total = cycles * len(self.watchlist) if cycles is not None else None
+        while total is None or slot < total:
+            yield start + slot * step, slot % len(self.watchlist)
+            slot += 1
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _reset(self) -> None:
+        self._stop.clear()
+        self._in_flight = [False] * len(self.watchlist)
+
+    def _claim(self, index: int) -> bool:
+        if self._in_flight[index]:
+            self.skipped += 1
+            self.client.logger.warning("[monitor] Route %d still in flight", index)
+            return False
+        self._in_flight[index] = True
+        return True
+
+    def _record(
+        self,
+        index: int,
+        timestamp: float,
+        payload: Any = None,
+        error: Optional[Exception] = None,
+    ) -> RouteRecord:
+        self._in_flight[index] = False
+        if error is not None:
+            self.client.logger.warning("[monitor] Route %d failed: %r", index, error)
+            return RouteRecord(timestamp, index, None, None, error=repr(error))
+        try:
+            return RouteRecord(timestamp, index, *route_summary(payload))
+        except Exception as e:
+            return RouteRecord(timestamp, index, None, None, error=repr(e))
+
+    def _plan(self, index: int) -> RouteRecord:
+        src, dst = self.watchlist[index]
+        timestamp = time.time()
+        try:
+            payload, _ = self.client._plan_payload(src, dst, fresh=True)
+        except Exception as e:
+            return self._record(index, timestamp, error=e)
+        return self._record(index, timestamp, payload)
+
+    def stream(self, cycles: Optional[int] = None) -> Iterator[RouteRecord]:
+        """Plans the watchlist with the sync client, yielding records as they
+        complete. Runs forever unless `cycles` or `stop()` ends it."""
+        self._reset()
+        buffer: "queue.Queue[RouteRecord]" = queue.Queue(self.buffer_size)
+        lock = threading.Lock()
+
+        def publish(record: RouteRecord) -> None:
+            with lock:
+                if buffer.full():
+                    buffer.get_nowait()
+                    self.dropped += 1
+                buffer.put_nowait(record)
+
+        def scheduler() -> None:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for due, index in self.schedule(cycles):
+                    if self._stop.wait(max(due - time.monotonic(), 0.0)):
+                        break
+                    if self._claim(index):
+                        future = executor.submit(self._plan, index)
+                        future.add_done_callback(lambda f: publish(f.result()))
+
+        thread = threading.Thread(target=scheduler, daemon=True)
+        thread.start()
+        try:
+            while thread.is_alive() or not buffer.empty():
+                try:
+                    yield buffer.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        finally:
+            self._stop.set()
+
+    def run(
+        self, callback: Callable[[RouteRecord], None], cycles: Optional[int] = None
+    ) -> None:
+        for record in self.stream(cycles):
+            callback(record)
+
+    async def _aplan(self, index: int, publish: Callable[[RouteRecord], None]):
+        src, dst = self.watchlist[index]
+        timestamp = time.time()
+        try:
+            payload, _ = await self.client._plan_payload(src, dst, fresh=True)
+        except Exception as e:
+            publish(self._record(index, timestamp, error=e))
+        else:
+            publish(self._record(index, timestamp, payload))
+
+    async def astream(self, cycles: Optional[int] = None) -> AsyncIterator[RouteRecord]:
+        """`stream` for `AsyncWaze`, planning on the running event loop."""
+        self._reset()
+        buffer: "asyncio.Queue[RouteRecord]" = asyncio.Queue(self.buffer_size)
+        tasks = set()
+
+        def publish(record: RouteRecord) -> None:
+            if buffer.full():
+                buffer.get_nowait()
+                self.dropped += 1
+            buffer.put_nowait(record)
+
+        async def scheduler() -> None:
+            for due, index in self.schedule(cycles):
+                await asyncio.sleep(max(due - time.monotonic(), 0.0))
+                if self._stop.is_set():
+                    break
+                if self._claim(index):
+                    task = asyncio.ensure_future(self._aplan(index, publish))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+
+        runner = asyncio.ensure_future(scheduler())
+        try:
+            while not runner.done() or not buffer.empty():
+                getter = asyncio.ensure_future(buffer.get())
+                done, _ = await asyncio.wait(
+                    {getter, runner}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if getter in done:
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            runner.result()
+        finally:
+            self._stop.set()
+            for task in (runner, *tasks):
+                task.cancel()
+
+    async def arun(
+        self, callback: Callable[[RouteRecord], None], cycles: Optional[int] = None
+    ) -> None:
+        async for record in self.astream(cycles):
+            callback(record)
@@ -0,0 +1,329 @@
+import json
+from array import array
+from functools import lru_cache
+from operator import itemgetter
+from typing import (
+    Any,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+from pydantic import TypeAdapter
+
+from .cfg import Countries
+from .geometry import GeoPath
+from .models import (
+    Alert,
+    Coordinate,
+    ETAHistogramItem,
+    TollPriceItem,
+    ViewBox,
+    WazeGeocodeParams,
+    WazeRequestBody,
+    WazeLocation,
+    WazeReview,
+    WazeTravelPlan,
+    WazeVenue,
+)
+
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover
+    loads = json.loads
+
+# "full" validates decoded JSON field by field, "fast" validates raw bytes in
+# one pass through a precompiled TypeAdapter, "none" returns decoded JSON as is.
+# Plans are always decoded, "fast" then builds them with `model_construct`, which
+# saves the field validation but not the decoding and geometry packing.
+ValidateMode = Literal["full", "fast", "none"]
+
+
+@lru_cache(maxsize=None)
+def _adapter(tp: Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+
+def decode(content: bytes, validate: ValidateMode = "full") -> Any:
+    """Decodes a response body for the given validation mode.
+
+    "fast" keeps the raw bytes so pydantic can validate them directly.
+    """
+    if validate == "fast":
+        return content
+    return loads(content)
+
+
+def _validate(tp: Any, payload: Any) -> Any:
+    if isinstance(payload, (bytes, str)):
+        return _adapter(tp).validate_json(payload)
+    return _adapter(tp).validate_python(payload)
+
+
+def resolve_locale(locale: Optional[Union[Coordinate, Countries]]) -> Coordinate:
+    """Resolves a user supplied locale into a `Coordinate`.
+
+    Raises:
+        ValueError: if no locale was given
+        TypeError: if the locale is neither a `Coordinate` nor `Countries`
+    """
+    if not locale:
+        raise ValueError("No locale specified, cannot geocode without a locale.")
+    elif isinstance(locale, Coordinate):
+        return locale
+    elif isinstance(locale, Countries):
+        return locale.value
+    raise TypeError("Unknown value passed in for `locale`")
+
+
+def plan_body(
+    src: Coordinate,
+    dst: Coordinate,
+    n_paths: int = 1,
+    interval: Optional[int] = None,
+    arrive_at: Optional[bool] = None,
+    at: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Planner request body, with the server defaults for options left None."""
+    options: Dict[str, Any] = {}
+    if interval is not None:
+        options["interval"] = interval
+    if arrive_at is not None:
+        options["arriveAt"] = arrive_at
+    body = WazeRequestBody(from_=src, to=dst, nPaths=n_paths, at=at, **options)
+    return body.model_dump(by_alias=True, exclude=None if at is not None else {"at"})
+
+
+def geocode_params(query: str, viewbox: ViewBox) -> WazeGeocodeParams:
+    return {
+        "q": query,
+        "v": f"{viewbox.lat1},{viewbox.long1};{viewbox.lat2},{viewbox.long2}",
+        "exp": "8,10,12",
+        "geo-env": "row",
+        "lang": "en",
+    }
+
+
+def venue_id(location: Union[WazeLocation, str]) -> str:
+    return (
+        location.venueId.replace("venues.", "").replace("googlePlaces.", "")
+        if isinstance(location, WazeLocation)
+        else location
+    )
+
+
+def parse_locations(
+    payload: Any, validate: ValidateMode = "full"
+) -> List[WazeLocation]:
+    if validate == "none":
+        return payload
+    if validate == "fast":
+        return _validate(List[WazeLocation], payload)
+    return [WazeLocation(**o) for o in payload]
+
+
+def parse_venue(payload: Any, validate: ValidateMode = "full") -> WazeVenue:
+    if validate == "none":
+        return payload
+    if validate == "fast":
+        return _validate(WazeVenue, payload)
+    return WazeVenue(**payload)
+
+
+def parse_review(payload: Any, validate: ValidateMode = "full") -> WazeReview:
+    if validate == "none":
+        return payload
+    if validate == "fast":
+        return _validate(WazeReview, payload)
+    return WazeReview(**payload)
+
+
+_xy = itemgetter("x", "y")
+
+
+def _coordinate(o: Dict[str, Any]) -> Coordinate:
+    return Coordinate.model_construct(latitude=o["y"], longitude=o["x"])
+
+
+def _construct_route(
+    src: Coordinate,
+    dst: Coordinate,
+    plan: Dict[str, Any],
+    coords: List[Dict[str, Any]],
+    cache_age: Optional[float],
+) -> WazeTravelPlan:
+    """Builds a plan from a trusted route dict without validating any field,
+    packing the geometry straight from the "x"/"y" values."""
+    histograms = plan.get("etaHistograms")
+    return WazeTravelPlan.model_construct(
+        src=src,
+        dst=dst,
+        routeName=plan["routeName"],
+        geoPath=GeoPath(array("d", [v for xy in map(_xy, coords) for v in xy])),
+        alerts=[
+            Alert.model_construct(
+                id=o["id"],
+                type=o["type"],
+                subtype=o["subtype"],
+                location=_coordinate(o["location"]),
+            )
+            for o in plan["alerts"]
+        ],
+        totalSeconds=plan["totalSeconds"],
+        totalLength=plan["totalLength"],
+        isToll=plan["isToll"],
+        isFastest=plan["isFastest"],
+        tollPriceInfo=TollPriceItem.model_construct(**plan["tollPriceInfo"]),
+        etaHistograms=None
+        if histograms is None
+        else [ETAHistogramItem.model_construct(**o) for o in histograms],
+        cacheAge=cache_age,
+    )
+
+
+def parse_route(
+    src: Coordinate,
+    dst: Coordinate,
+    route: Dict[str, Any],
+    cache_age: Optional[float] = None,
+    validate: ValidateMode = "full",
+) -> WazeTravelPlan:
+    """Parses one planner route.
+
+    With `validate="fast"` the route is trusted and built with
+    `model_construct`, a malformed route raises `ValueError`.
+    """
+    plan = route.get("response")
+    if not plan:
+        raise ValueError(f"Plan is empty:\n{route}")
+
+    if validate == "fast":
+        try:
+            return _construct_route(src, dst, plan, route["coords"], cache_age)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed route, missing {e}:\n{route}") from None
+
+    geo_path = GeoPath.from_coords(route.get("coords"))
+
+    return WazeTravelPlan(
+        src=src, dst=dst, geoPath=geo_path, cacheAge=cache_age, **plan
+    )
+
+
+def _fastest_route(payload: Any) -> Dict[str, Any]:
+    if isinstance(payload, (bytes, str)):
+        payload = loads(payload)
+    try:
+        return payload["alternatives"][0]["response"]
+    except (KeyError, IndexError, TypeError):
+        raise ValueError(f"Response is empty:\n{payload}") from None
+
+
+def route_totals(payload: Any) -> Tuple[int, int]:
+    """Returns (totalSeconds, totalLength) of the fastest route without
+    building any models or geometry."""
+    plan = _fastest_route(payload)
+    return plan["totalSeconds"], plan["totalLength"]
+
+
+def route_etas(payload: Any) -> Tuple[int, List[Tuple[int, int]]]:
+    """Returns totalSeconds and the (eta, routeLengthInMinutes) pairs of the
+    `etaHistograms` of the fastest route."""
+    plan = _fastest_route(payload)
+    histogram = [
+        (item["eta"], item["routeLengthInMinutes"])
+        for item in plan.get("etaHistograms") or ()
+    ]
+    return plan["totalSeconds"], histogram
+
+
+def route_summary(payload: Any) -> Tuple[int, int, Tuple[int, ...]]:
+    """Returns (totalSeconds, totalLength, alert ids) of the fastest route."""
+    plan = _fastest_route(payload)
+    alert_ids = tuple(alert["id"] for alert in plan.get("alerts") or ())
+    return plan["totalSeconds"], plan["totalLength"], alert_ids
+
+
+class RouteAlternatives(Sequence[WazeTravelPlan]):
+    """Route alternatives from a single planner response.
+
+    Each alternative is only parsed into a `WazeTravelPlan` when it is first
+    accessed, so unused alternatives never have their geometry built.
+    """
+
+    def __init__(
+        self,
+        src: Coordinate,
+        dst: Coordinate,
+        routes: List[Dict[str, Any]],
+        cache_age: Optional[float] = None,
+        validate: ValidateMode = "full",
+    ):
+        self.src = src
+        self.dst = dst
+        self.cache_age = cache_age
+        self.validate = validate
+        self._routes = routes
+        self._plans: List[Optional[WazeTravelPlan]] = [None] * len(routes)
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    @overload
+    def __getitem__(self, index: int) -> WazeTravelPlan: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[WazeTravelPlan]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        plan = self._plans[index]
+        if plan is None:
+            plan = parse_route(
+                self.src, self.dst, self._routes[index], self.cache_age, self.validate
+            )
+            self._plans[index] = plan
+        return plan
+
+    def __repr__(self) -> str:
+        return f"RouteAlternatives(n={len(self)})"
+
+    @property
+    def fastest(self) -> WazeTravelPlan:
+        return self[0]
+
+
+def parse_plan(
+    src: Coordinate,
+    dst: Coordinate,
+    payload: Any,
+    n_paths: int = 1,
+    cache_age: Optional[float] = None,
+    validate: ValidateMode = "full",
+) -> Union[WazeTravelPlan, RouteAlternatives]:
+    """Parses a planner response.
+
+    The planner payload is always decoded first since alternatives are built
+    lazily, with `validate="none"` the raw route dicts are returned instead and
+    with `validate="fast"` routes are built without validation.
+    """
+    if isinstance(payload, (bytes, str)):
+        payload = loads(payload)
+    alternatives = payload.get("alternatives")
+    if not alternatives:
+        raise ValueError(f"Response is empty:\n{payload}")
+
+    if validate == "none":
+        return alternatives[0] if n_paths == 1 else alternatives[:n_paths]
+
+    if n_paths == 1:
+        return parse_route(src, dst, alternatives[0], cache_age, validate)
+    return RouteAlternatives(src, dst, alternatives[:n_paths], cache_age, validate)
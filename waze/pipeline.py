@@ -0,0 +1,274 @@
+import asyncio
+import queue
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+from pydantic import BaseModel
+
+from .models import WazeLocation, WazeReview, WazeVenue
+from .sweep import new_locations
+
+if TYPE_CHECKING:
+    from .aio import AsyncWaze
+    from .waze import Waze
+
+# marks the end of a stage's input
+_DONE = object()
+
+
+class EnrichedVenue(BaseModel):
+    location: WazeLocation
+    venue: Optional[WazeVenue] = None
+    reviews: Optional[WazeReview] = None  # None if skipped or there are none
+    error: Optional[Exception] = None
+    stage: Optional[str] = None  # stage that raised `error`
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class EnrichmentPipeline:
+    """Streams search results through geocode -> venue -> reviews.
+
+    Every stage has its own workers and hands records to the next stage
+    through a queue of `queue_size`, so a slow stage applies backpressure
+    instead of buffering without bound, and a record is yielded as soon as
+    its last stage finishes. Venues without a `googlePlaceId` skip the
+    reviews stage, and a failing stage yields the record with `error` set
+    rather than aborting the stream.
+
+    Works with either client: `stream` for `Waze`, `astream` for `AsyncWaze`.
+    Records hold models, so the client can't have `validate="none"`.
+
+    Args:
+        client (Union[Waze, AsyncWaze]): Client used for requests
+        geocode_workers (int, optional): Concurrent searches. Defaults to 2.
+        venue_workers (int, optional): Concurrent venue lookups. Defaults to 8.
+        review_workers (int, optional): Concurrent review lookups.
+            Defaults to 4.
+        queue_size (int, optional): Capacity of each inter-stage queue.
+            Defaults to 64.
+    """
+
+    def __init__(
+        self,
+        client: Union["Waze", "AsyncWaze"],
+        geocode_workers: int = 2,
+        venue_workers: int = 8,
+        review_workers: int = 4,
+        queue_size: int = 64,
+    ):
+        if client.validate == "none":
+            raise ValueError(
+                'EnrichmentPipeline needs a client with models, not validate="none"'
+            )
+        self.client = client
+        self.geocode_workers = geocode_workers
+        self.venue_workers = venue_workers
+        self.review_workers = review_workers
+        self.queue_size = queue_size
+
+    def _failed(self, record: EnrichedVenue, stage: str, error: Exception) -> None:
+        self.client.logger.warning(
+            "[enrich] %s failed for %s: %r", stage, record.location.venueId, error
+        )
+        record.error, record.stage = error, stage
+
+    @staticmethod
+    def _reviews(result: Any) -> Optional[WazeReview]:
+        # `reviews` returns [] when the venue has none
+        return result or None
+
+    def stream(self, queries: Union[str, Iterable[str]]) -> Iterator[EnrichedVenue]:
+        """Enriches every distinct location found for `queries` with the
+        sync client, yielding records in completion order."""
+        client = self.client
+        queries = iter([queries] if isinstance(queries, str) else queries)
+        seen: set = set()
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def put(q: queue.Queue, item: Any) -> None:
+            while not stop.is_set():
+                try:
+                    return q.put(item, timeout=0.1)
+                except queue.Full:
+                    pass
+
+        def get(q: queue.Queue) -> Any:
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            return _DONE
+
+        def geocode(query: str) -> List[EnrichedVenue]:
+            try:
+                locations = client.geocode(query)
+            except Exception as e:
+                client.logger.warning("[enrich] geocode failed for %r: %r", query, e)
+                return []
+            with lock:
+                return [
+                    EnrichedVenue(location=o) for o in new_locations(locations, seen)
+                ]
+
+        def venue(record: EnrichedVenue) -> List[EnrichedVenue]:
+            try:
+                record.venue = client.venue(record.location)
+            except Exception as e:
+                self._failed(record, "venue", e)
+            return [record]
+
+        def reviews(record: EnrichedVenue) -> List[EnrichedVenue]:
+            if record.ok and record.venue.googlePlaceId:
+                try:
+                    record.reviews = self._reviews(client.reviews(record.venue))
+                except Exception as e:
+                    self._failed(record, "reviews", e)
+            return [record]
+
+        queues = [queue.Queue(self.queue_size) for _ in range(3)]
+        stages = [
+            (geocode, self.geocode_workers, None, queues[0], self.venue_workers),
+            (venue, self.venue_workers, queues[0], queues[1], self.review_workers),
+            (reviews, self.review_workers, queues[1], queues[2], 1),
+        ]
+        threads = []
+        for fn, workers, source, sink, downstream in stages:
+            remaining = [workers]
+
+            def work(
+                fn: Callable[[Any], List[EnrichedVenue]] = fn,
+                source: Optional[queue.Queue] = source,
+                sink: queue.Queue = sink,
+                downstream: int = downstream,
+                remaining: List[int] = remaining,
+            ) -> None:
+                try:
+                    while not stop.is_set():
+                        if source is None:
+                            with lock:
+                                item = next(queries, _DONE)
+                        else:
+                            item = get(source)
+                        if item is _DONE:
+                            break
+                        for record in fn(item):
+                            put(sink, record)
+                except Exception as e:
+                    client.logger.error("[enrich] Worker crashed: %r", e)
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:  # one end marker per worker of the next stage
+                    for _ in range(downstream):
+                        put(sink, _DONE)
+
+            threads += [
+                threading.Thread(target=work, daemon=True) for _ in range(workers)
+            ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                record = get(queues[2])
+                if record is _DONE:
+                    break
+                yield record
+        finally:
+            stop.set()
+
+    async def astream(
+        self, queries: Union[str, Iterable[str]]
+    ) -> AsyncIterator[EnrichedVenue]:
+        """`stream` for `AsyncWaze`, with each worker an asyncio task."""
+        client = self.client
+        queries = iter([queries] if isinstance(queries, str) else queries)
+        seen: set = set()
+
+        async def geocode(query: str) -> List[EnrichedVenue]:
+            try:
+                locations = await client.geocode(query)
+            except Exception as e:
+                client.logger.warning("[enrich] geocode failed for %r: %r", query, e)
+                return []
+            return [EnrichedVenue(location=o) for o in new_locations(locations, seen)]
+
+        async def venue(record: EnrichedVenue) -> List[EnrichedVenue]:
+            try:
+                record.venue = await client.venue(record.location)
+            except Exception as e:
+                self._failed(record, "venue", e)
+            return [record]
+
+        async def reviews(record: EnrichedVenue) -> List[EnrichedVenue]:
+            if record.ok and record.venue.googlePlaceId:
+                try:
+                    record.reviews = self._reviews(await client.reviews(record.venue))
+                except Exception as e:
+                    self._failed(record, "reviews", e)
+            return [record]
+
+        queues = [asyncio.Queue(self.queue_size) for _ in range(3)]
+        stages = [
+            (geocode, self.geocode_workers, None, queues[0], self.venue_workers),
+            (venue, self.venue_workers, queues[0], queues[1], self.review_workers),
+            (reviews, self.review_workers, queues[1], queues[2], 1),
+        ]
+        tasks = []
+        for fn, workers, source, sink, downstream in stages:
+            remaining = [workers]
+
+            async def work(
+                fn: Callable[[Any], Awaitable[List[EnrichedVenue]]] = fn,
+                source: Optional[asyncio.Queue] = source,
+                sink: asyncio.Queue = sink,
+                downstream: int = downstream,
+                remaining: List[int] = remaining,
+            ) -> None:
+                try:
+                    while True:
+                        if source is None:
+                            item = next(queries, _DONE)
+                        else:
+                            item = await source.get()
+                        if item is _DONE:
+                            break
+                        for record in await fn(item):
+                            await sink.put(record)
+                except Exception as e:
+                    client.logger.error("[enrich] Worker crashed: %r", e)
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    for _ in range(downstream):
+                        await sink.put(_DONE)
+
+            tasks += [asyncio.ensure_future(work()) for _ in range(workers)]
+
+        try:
+            while True:
+                record = await queues[2].get()
+                if record is _DONE:
+                    break
+                yield record
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,184 @@
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Iterator, List, Mapping, Optional, Union
+
+from .cache import CacheStats
+from .models import (
+    Coordinate,
+    ViewBox,
+    WazeLocation,
+    WazeReview,
+    WazeTravelPlan,
+    WazeVenue,
+)
+from .parsing import RouteAlternatives, resolve_locale
+from .singleflight import SingleFlight
+from .utils import nearest_country
+from .waze import Waze
+
+
+class WazePool:
+    """Thread-safe facade over a pool of `Waze` sessions.
+
+    `requests.Session` is not documented as thread-safe, so rather than share
+    one session every call borrows a session for its duration. Sessions are
+    created on demand up to `size` and share one connection pool, cache,
+    request coalescing, rate limits and hooks, so threads reuse each other's
+    connections and report into the same counters.
+
+    The configuration is frozen in `config` at construction. The locale is
+    resolved once as well; without one it is inferred from the first planned
+    route and then used by every session.
+
+    Args:
+        size (int, optional): Sessions, and pooled connections per host.
+            Defaults to 8.
+        keep_alive (float, optional): Idle seconds before TCP keep-alive
+            probes on pooled connections, None disables them. Defaults to 60.
+        **client_kwargs: `Waze` arguments shared by every session
+
+    Example:
+        >>> pool = WazePool(size=16, locale=Countries.MY)
+        >>> pool.plan(src, dst)  # from any thread
+        >>> with pool.client() as waze:
+        ...     locations = list(waze.sweep("petronas", region))
+    """
+
+    def __init__(
+        self, size: int = 8, keep_alive: Optional[float] = 60, **client_kwargs
+    ):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        locale = client_kwargs.pop("locale", None)
+        self.size = size
+        self.config: Mapping[str, Any] = MappingProxyType(
+            {
+                **client_kwargs,
+                # one connection per session, callers wait for a free one
+                # instead of opening connections that are discarded after use
+                "pool_maxsize": size,
+                "pool_block": True,
+                "keep_alive": keep_alive,
+            }
+        )
+        self._locale = resolve_locale(locale) if locale is not None else None
+        self._idle: List[Waze] = []  # most recently returned last
+        self._clients: List[Waze] = []
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._closed = False
+        self.cache_stats = CacheStats()
+        coalesce = client_kwargs.get("coalesce_requests", True)
+        self._single_flight = SingleFlight() if coalesce else None
+
+    def __repr__(self) -> str:
+        return f"WazePool(size={self.size}, sessions={len(self._clients)})"
+
+    def __enter__(self) -> "WazePool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def locale(self) -> Optional[Coordinate]:
+        return self._locale
+
+    def _ensure_locale(self, near: Coordinate) -> None:
+        if self._locale is not None:
+            return
+        locale = resolve_locale(nearest_country(near))
+        with self._lock:
+            if self._locale is None:
+                self._locale = locale
+
+    def _new_client(self) -> Waze:
+        client = Waze(locale=self._locale, **self.config)
+        client.cache_stats = self.cache_stats
+        client.single_flight = self._single_flight
+        if self._clients:
+            # every session goes through the first session's connection pool
+            adapter = self._clients[0].get_adapter("https://")
+            client.mount("https://", adapter)
+            client.mount("http://", adapter)
+        return client
+
+    def _acquire(self) -> Waze:
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("WazePool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if len(self._clients) < self.size:
+                    client = self._new_client()
+                    self._clients.append(client)
+                    return client
+                self._available.wait()
+
+    def _release(self, client: Waze) -> None:
+        with self._available:
+            if self._closed:
+                return  # closed along with the others by `close`
+            self._idle.append(client)
+            self._available.notify()
+
+    @contextmanager
+    def client(self) -> Iterator[Waze]:
+        """Borrows a session for exclusive use inside the `with` block.
+
+        Raises:
+            RuntimeError: if the pool is closed, also raised in threads still
+                waiting for a session when it closes
+        """
+        client = self._acquire()
+        if client.locale is None:
+            client.locale = self._locale
+        try:
+            yield client
+        finally:
+            self._release(client)
+
+    def plan(
+        self,
+        src: Coordinate,
+        dst: Coordinate,
+        n_paths: int = 1,
+        *,
+        interval: Optional[int] = None,
+        arrive_at: Optional[bool] = None,
+        at: Optional[int] = None,
+    ) -> Union[WazeTravelPlan, RouteAlternatives]:
+        """`Waze.plan` on a pooled session."""
+        self._ensure_locale(src)
+        with self.client() as client:
+            return client.plan(
+                src, dst, n_paths, interval=interval, arrive_at=arrive_at, at=at
+            )
+
+    def geocode(
+        self, query: str, radius: int = 100, viewbox: Optional[ViewBox] = None
+    ) -> List[WazeLocation]:
+        """`Waze.geocode` on a pooled session."""
+        with self.client() as client:
+            return client.geocode(query, radius, viewbox)
+
+    def venue(self, location: Union[WazeLocation, str]) -> WazeVenue:
+        """`Waze.venue` on a pooled session."""
+        with self.client() as client:
+            return client.venue(location)
+
+    def reviews(self, venue: WazeVenue) -> List[WazeReview]:
+        """`Waze.reviews` on a pooled session."""
+        with self.client() as client:
+            return client.reviews(venue)
+
+    def close(self) -> None:
+        with self._available:
+            self._closed = True
+            clients, self._clients = self._clients, []
+            self._idle.clear()
+            self._available.notify_all()
+        for client in clients:
+            client.close()
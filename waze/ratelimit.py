@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+class TokenBucket:
+    """Token bucket rate limiter shared by threads and asyncio tasks.
+
+    Callers reserve a token up front and then wait out the returned delay,
+    so waiters are served in arrival order and the lock is never held while
+    sleeping.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float, optional): Maximum burst size. Defaults to `rate`.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Takes `tokens` from the bucket and returns how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= tokens
+            return max(-self._tokens / self.rate, 0.0)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class AIMDLimiter:
+    """Adaptive concurrency limit using additive increase, multiplicative
+    decrease.
+
+    Every uncongested response grows the limit by about `increase` per round
+    trip. A 429 or a latency spike, i.e. a response slower than
+    `latency_factor` times the smoothed latency, multiplies the limit by
+    `decrease`, at most once per round trip.
+
+    Args:
+        initial (int, optional): Starting limit. Defaults to 4.
+        min_limit (int, optional): Lower bound. Defaults to 1.
+        max_limit (int, optional): Upper bound. Defaults to 64.
+        increase (float, optional): Additive step per round trip. Defaults to 1.
+        decrease (float, optional): Multiplicative backoff. Defaults to 0.5.
+        latency_factor (float, optional): Spike threshold relative to the
+            smoothed latency, None to ignore latency. Defaults to 3.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_factor: Optional[float] = 3.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._in_flight = 0
+        self._latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _try_acquire(self) -> bool:
+        if self._in_flight < int(self._limit):
+            self._in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> float:
+        """Blocks until a slot is free and returns the start timestamp to
+        pass back to `release`."""
+        with self._cond:
+            while not self._try_acquire():
+                self._cond.wait()
+        return time.monotonic()
+
+    async def acquire_async(self) -> float:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._try_acquire():
+                    return time.monotonic()
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, started_at: float, congested: bool = False) -> None:
+        """Frees a slot and adapts the limit to the observed response."""
+        now = time.monotonic()
+        latency = now - started_at
+        with self._cond:
+            self._in_flight -= 1
+            spike = (
+                self.latency_factor is not None
+                and self._latency is not None
+                and latency > self.latency_factor * self._latency
+            )
+            if congested or spike:
+                # requests that started before the last decrease saw the old limit
+                if started_at >= self._last_decrease:
+                    self._limit = max(self.min_limit, self._limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                self._limit = min(
+                    self.max_limit, self._limit + self.increase / self._limit
+                )
+            if not congested:
+                self._latency = (
+                    latency
+                    if self._latency is None
+                    else 0.9 * self._latency + 0.1 * latency
+                )
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:  # loop already closed
+                pass
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
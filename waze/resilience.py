@@ -0,0 +1,236 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Deque, Optional
+
+from .exceptions import WazeHTTPError
+
+
+class CircuitOpenError(WazeHTTPError):
+    """Raised without making a request while an endpoint's circuit is open."""
+
+
+class CircuitBreaker:
+    """Fails fast while an endpoint keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    every call raises `CircuitOpenError` without a request. Once
+    `reset_timeout` seconds have passed a single trial request is let through:
+    success closes the circuit, failure opens it again. Server errors,
+    timeouts and connection errors count as failures, responses below 500
+    mean the endpoint is up.
+
+    Args:
+        failure_threshold (int, optional): Consecutive failures that open the
+            circuit. Defaults to 5.
+        reset_timeout (float, optional): Seconds the circuit stays open before
+            a trial request. Defaults to 30.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.rejected = 0  # calls failed fast
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"CircuitBreaker(state={self.state!r}, failures={self.failures}, "
+            f"rejected={self.rejected})"
+        )
+
+    @staticmethod
+    def is_failure(status_code: Optional[int]) -> bool:
+        return status_code is None or status_code >= 500
+
+    def before(self, endpoint: Optional[str] = None) -> None:
+        """Admits a call, or raises `CircuitOpenError` while open."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at >= self.reset_timeout:
+                    self.state, self._trial = self.HALF_OPEN, True
+                    return
+            elif self.state == self.CLOSED or not self._trial:
+                self._trial = self.state == self.HALF_OPEN
+                return
+            self.rejected += 1
+        raise CircuitOpenError(
+            f"Circuit open for {endpoint or 'endpoint'} after "
+            f"{self.failures} consecutive failures"
+        )
+
+    def record(self, failed: Optional[bool]) -> None:
+        """Records the outcome of an admitted call, None if it ended without
+        an answer from the endpoint, e.g. it was cancelled."""
+        with self._lock:
+            if failed is None:
+                self._trial = False
+            elif not failed:
+                self.state, self.failures, self._trial = self.CLOSED, 0, False
+            else:
+                self.failures += 1
+                if self.state == self.HALF_OPEN or (
+                    self.failures >= self.failure_threshold
+                ):
+                    self.state, self._trial = self.OPEN, False
+                    self._opened_at = time.monotonic()
+
+
+class Hedge:
+    """Sends a duplicate request when the first is slower than usual.
+
+    The delay is the `quantile` of the latencies of the last `window` calls,
+    so only the slowest calls are duplicated, and whichever copy answers
+    first wins. Until `min_samples` calls were seen nothing is hedged. Only
+    use it for idempotent requests, the losing copy is still sent.
+
+    Args:
+        quantile (float, optional): Latency quantile after which to hedge.
+            Defaults to 0.95.
+        window (int, optional): Latencies kept. Defaults to 200.
+        min_samples (int, optional): Latencies needed before hedging.
+            Defaults to 20.
+        min_delay (float, optional): Lower bound of the delay in seconds.
+            Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        window: int = 200,
+        min_samples: int = 20,
+        min_delay: float = 0.0,
+    ):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.hedged = 0  # duplicates sent
+        self.wins = 0  # duplicates that answered first
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"Hedge(quantile={self.quantile}, hedged={self.hedged}, wins={self.wins})"
+        )
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, None while there are too few
+        samples."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(int(self.quantile * len(latencies)), len(latencies) - 1)
+        return max(latencies[index], self.min_delay)
+
+    def call(self, fn: Callable[[], Any], executor: Executor) -> Any:
+        """Runs `fn`, and a second `fn` on `executor` if the first has not
+        returned after `delay`.
+
+        The delay counts from when the first call starts running, so time
+        queued for a busy `executor` never triggers a duplicate, and a
+        duplicate that only gets a worker after the first call returned is
+        not sent.
+        """
+        start = time.perf_counter()
+        delay = self.delay()
+        if delay is None:
+            result = fn()
+            self.observe(time.perf_counter() - start)
+            return result
+
+        started = threading.Event()
+
+        def attempt() -> Any:
+            started.set()
+            return fn()
+
+        def duplicate() -> Any:
+            if first.done() and first.exception() is None:
+                return first.result()  # answered while this waited for a worker
+            with self._lock:
+                self.hedged += 1
+            return fn()
+
+        first = executor.submit(attempt)
+        first.add_done_callback(lambda _: started.set())  # e.g. if cancelled
+        started.wait()
+        start = time.perf_counter()
+        try:
+            result = first.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        else:
+            self.observe(time.perf_counter() - start)
+            return result
+
+        second = executor.submit(duplicate)
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: f is second):
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    if future is second:
+                        with self._lock:
+                            self.wins += 1
+                    self.observe(time.perf_counter() - start)
+                    return future.result()
+            raise error
+        finally:
+            for future in pending:
+                future.cancel()  # only stops a duplicate that has not started
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """`call` for coroutines, the losing copy is cancelled."""
+        start = time.perf_counter()
+        delay = self.delay()
+        if delay is None:
+            result = await fn()
+            self.observe(time.perf_counter() - start)
+            return result
+
+        first = asyncio.ensure_future(fn())
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                second = asyncio.ensure_future(fn())
+                pending.add(second)
+                with self._lock:
+                    self.hedged += 1
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    if task is not first:
+                        with self._lock:
+                            self.wins += 1
+                    self.observe(time.perf_counter() - start)
+                    return task.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def request_key(
+    method: str,
+    url: str,
+    params: Optional[Any] = None,
+    json_body: Optional[Any] = None,
+    data: Optional[Any] = None,
+) -> str:
+    """Identifies a request by method, URL, query parameters and body."""
+    return json.dumps(
+        [method.upper(), url, params, json_body, data],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+class SingleFlight:
+    """Collapses concurrent calls sharing a key into a single call.
+
+    The first caller for a key runs the call, callers arriving while it is in
+    flight block and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self.shared = 0  # calls answered by another caller's request
+        self._calls: Dict[str, "Future[Any]"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of `SingleFlight`.
+
+    The call runs in its own task, so a cancelled waiter does not cancel the
+    request for the others.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls: Dict[str, "asyncio.Task[Any]"] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
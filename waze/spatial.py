@@ -0,0 +1,305 @@
+import heapq
+import math
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .geometry import GeoPath
+from .models import Alert, Coordinate, ViewBox, WazeTravelPlan
+from .utils import haversine
+
+Cell = Tuple[int, int]
+
+METERS_PER_DEGREE = 111_320.0
+
+
+def _segment_intersects_box(
+    x0: float, y0: float, x1: float, y1: float, box: ViewBox
+) -> bool:
+    # Liang-Barsky clipping of the segment against the box
+    t0, t1 = 0.0, 1.0
+    dx, dy = x1 - x0, y1 - y0
+    for p, q in (
+        (-dx, x0 - box.long1),
+        (dx, box.long2 - x0),
+        (-dy, y0 - box.lat1),
+        (dy, box.lat2 - y0),
+    ):
+        if p == 0:
+            if q < 0:
+                return False
+        else:
+            t = q / p
+            if p < 0:
+                t0 = max(t0, t)
+            else:
+                t1 = min(t1, t)
+            if t0 > t1:
+                return False
+    return True
+
+
+def _segment_distance(
+    lat: float, lon: float, x0: float, y0: float, x1: float, y1: float
+) -> float:
+    """Meters from (lat, lon) to a segment, on a local equirectangular
+    projection around the point."""
+    kx = math.cos(math.radians(lat)) * METERS_PER_DEGREE
+    ax, ay = (x0 - lon) * kx, (y0 - lat) * METERS_PER_DEGREE
+    bx, by = (x1 - lon) * kx, (y1 - lat) * METERS_PER_DEGREE
+    dx, dy = bx - ax, by - ay
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else min(max(-(ax * dx + ay * dy) / length, 0.0), 1.0)
+    return math.hypot(ax + t * dx, ay + t * dy)
+
+
+class SpatialIndex:
+    """In-memory grid index over alert locations and route geometry.
+
+    Points and route segments are bucketed into square cells of
+    `cell_degrees`, so bbox, radius and nearest neighbour queries only visit
+    the cells around the query instead of scanning everything. Alerts are
+    deduplicated by `Alert.id`, routes are keyed by an integer route id.
+
+    Args:
+        cell_degrees (float, optional): Cell size in degrees, ~1.1km at the
+            default. Pick it close to typical query sizes. Defaults to 0.01.
+    """
+
+    def __init__(self, cell_degrees: float = 0.01):
+        self.cell_degrees = cell_degrees
+        self.alerts: Dict[int, Alert] = {}
+        self.routes: Dict[int, GeoPath] = {}
+        self._alert_ids = array("q")
+        self._lats = array("d")
+        self._lons = array("d")
+        self._alert_cells: Dict[Cell, array] = {}
+        # (route id, segment index) pairs, interleaved
+        self._route_cells: Dict[Cell, array] = {}
+        self._next_route_id = 0
+        self._bounds: Optional[List[int]] = None  # min/max row and col of alerts
+
+    def __repr__(self) -> str:
+        return f"SpatialIndex(alerts={len(self.alerts)}, routes={len(self.routes)})"
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def _cells_in_box(self, box: ViewBox, cells: Dict[Cell, array]) -> Iterator[Cell]:
+        row0, col0 = self._cell(box.lat1, box.long1)
+        row1, col1 = self._cell(box.lat2, box.long2)
+        if (row1 - row0 + 1) * (col1 - col0 + 1) > len(cells):
+            # a box wider than the populated area, only visit occupied cells
+            for row, col in list(cells):
+                if row0 <= row <= row1 and col0 <= col <= col1:
+                    yield row, col
+            return
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                yield row, col
+
+    def _radius_box(self, point: Coordinate, meters: float) -> ViewBox:
+        dlat = meters / METERS_PER_DEGREE
+        dlon = dlat / max(math.cos(math.radians(point.latitude)), 1e-6)
+        return ViewBox(
+            long1=point.longitude - dlon,
+            lat1=point.latitude - dlat,
+            long2=point.longitude + dlon,
+            lat2=point.latitude + dlat,
+        )
+
+    def add_alert(self, alert: Alert) -> bool:
+        """Indexes `alert`, returning False if its id was already indexed."""
+        if alert.id in self.alerts:
+            return False
+        self.alerts[alert.id] = alert
+        lat, lon = alert.location.latitude, alert.location.longitude
+        self._alert_ids.append(alert.id)
+        self._lats.append(lat)
+        self._lons.append(lon)
+        cell = self._cell(lat, lon)
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[0], cell[1], cell[1]]
+        else:
+            bounds = self._bounds
+            bounds[0], bounds[1] = min(bounds[0], cell[0]), max(bounds[1], cell[0])
+            bounds[2], bounds[3] = min(bounds[2], cell[1]), max(bounds[3], cell[1])
+        bucket = self._alert_cells.get(cell)
+        if bucket is None:
+            bucket = self._alert_cells[cell] = array("q")
+        bucket.append(len(self._lats) - 1)
+        return True
+
+    def _segment_cells(self, path: GeoPath) -> Iterator[Tuple[Cell, int]]:
+        """(cell, segment index) of every cell a segment of `path` touches."""
+        lons, lats = path.columns()
+        seen: Set[Cell] = set()
+        for i in range(max(len(lons) - 1, 1) if len(lons) else 0):
+            j = min(i + 1, len(lons) - 1)
+            row0, col0 = self._cell(min(lats[i], lats[j]), min(lons[i], lons[j]))
+            row1, col1 = self._cell(max(lats[i], lats[j]), max(lons[i], lons[j]))
+            seen.clear()
+            for row in range(row0, row1 + 1):
+                for col in range(col0, col1 + 1):
+                    if (row, col) not in seen:
+                        seen.add((row, col))
+                        yield (row, col), i
+
+    def add_route(self, path: GeoPath, route_id: Optional[int] = None) -> int:
+        """Indexes every segment of `path` and returns its route id. A route
+        already indexed under `route_id` is replaced."""
+        if route_id is None:
+            route_id = self._next_route_id
+        elif route_id in self.routes:
+            self.remove_route(route_id)
+        self._next_route_id = max(self._next_route_id, route_id + 1)
+        self.routes[route_id] = path
+        for cell, i in self._segment_cells(path):
+            bucket = self._route_cells.get(cell)
+            if bucket is None:
+                bucket = self._route_cells[cell] = array("q")
+            bucket.extend((route_id, i))
+        return route_id
+
+    def remove_route(self, route_id: int) -> None:
+        """Drops a route from the index, raising KeyError if it isn't indexed."""
+        path = self.routes.pop(route_id)
+        for cell in {cell for cell, _ in self._segment_cells(path)}:
+            bucket = self._route_cells[cell]
+            kept = array("q")
+            for k in range(0, len(bucket), 2):
+                if bucket[k] != route_id:
+                    kept.extend((bucket[k], bucket[k + 1]))
+            if kept:
+                self._route_cells[cell] = kept
+            else:
+                del self._route_cells[cell]
+
+    def add_plan(self, plan: WazeTravelPlan, route_id: Optional[int] = None) -> int:
+        """Indexes the route geometry and alerts of `plan`."""
+        for alert in plan.alerts:
+            self.add_alert(alert)
+        return self.add_route(plan.geoPath, route_id)
+
+    def add_plans(self, plans: Iterable[WazeTravelPlan]) -> List[int]:
+        return [self.add_plan(plan) for plan in plans]
+
+    def alerts_in_bbox(self, box: ViewBox) -> List[Alert]:
+        lats, lons, ids = self._lats, self._lons, self._alert_ids
+        found = []
+        for cell in self._cells_in_box(box, self._alert_cells):
+            for i in self._alert_cells.get(cell, ()):
+                if (
+                    box.lat1 <= lats[i] <= box.lat2
+                    and box.long1 <= lons[i] <= box.long2
+                ):
+                    found.append(self.alerts[ids[i]])
+        return found
+
+    def alerts_within(self, point: Coordinate, meters: float) -> List[Alert]:
+        """Alerts within `meters` of `point`, nearest first."""
+        lats, lons, ids = self._lats, self._lons, self._alert_ids
+        found = []
+        for cell in self._cells_in_box(
+            self._radius_box(point, meters), self._alert_cells
+        ):
+            for i in self._alert_cells.get(cell, ()):
+                d = haversine(point.latitude, point.longitude, lats[i], lons[i])
+                if d <= meters:
+                    found.append((d, ids[i]))
+        found.sort()
+        return [self.alerts[id_] for _, id_ in found]
+
+    def nearest_alerts(
+        self, point: Coordinate, k: int = 1
+    ) -> List[Tuple[float, Alert]]:
+        """The `k` alerts closest to `point` as (meters, alert) pairs.
+
+        Searches rings of cells outwards from the point's cell, stopping once
+        the k-th candidate is closer than anything the next ring could hold.
+        """
+        if self._bounds is None or k <= 0:
+            return []
+        lats, lons, ids = self._lats, self._lons, self._alert_ids
+        row, col = self._cell(point.latitude, point.longitude)
+        min_row, max_row, min_col, max_col = self._bounds
+        max_ring = max(
+            abs(row - min_row),
+            abs(row - max_row),
+            abs(col - min_col),
+            abs(col - max_col),
+        )
+        # rings closer than the populated area are empty
+        first_ring = max(0, row - max_row, min_row - row, col - max_col, min_col - col)
+        best: List[Tuple[float, int]] = []  # max-heap of (-meters, index)
+
+        def visit(bucket: array) -> None:
+            for i in bucket:
+                d = haversine(point.latitude, point.longitude, lats[i], lons[i])
+                if len(best) < k:
+                    heapq.heappush(best, (-d, i))
+                elif d < -best[0][0]:
+                    heapq.heapreplace(best, (-d, i))
+
+        visited = 0
+        for ring in range(first_ring, max_ring + 1):
+            for r in range(row - ring, row + ring + 1):
+                step = 1 if abs(r - row) == ring else 2 * ring
+                for c in range(col - ring, col + ring + 1, max(step, 1)):
+                    visit(self._alert_cells.get((r, c), ()))
+                    visited += 1
+            # anything outside this ring is at least `ring` cells away
+            lat = abs(point.latitude) + (ring + 1) * self.cell_degrees
+            reach = (
+                ring
+                * self.cell_degrees
+                * METERS_PER_DEGREE
+                * max(math.cos(math.radians(min(lat, 90.0))), 0.0)
+            )
+            if len(best) == k and -best[0][0] <= reach:
+                break
+            if visited > len(self._alert_cells):
+                # sparse data far away, cheaper to visit the remaining cells
+                for (r, c), bucket in self._alert_cells.items():
+                    if max(abs(r - row), abs(c - col)) > ring:
+                        visit(bucket)
+                break
+        return [(-d, self.alerts[ids[i]]) for d, i in sorted(best, reverse=True)]
+
+    def _segment(self, route_id: int, i: int) -> Tuple[float, float, float, float]:
+        coords = self.routes[route_id]._coords
+        j = min(i + 1, len(coords) // 2 - 1)
+        return coords[2 * i], coords[2 * i + 1], coords[2 * j], coords[2 * j + 1]
+
+    def routes_in_bbox(self, box: ViewBox) -> Set[int]:
+        """Ids of the routes passing through `box`."""
+        found: Set[int] = set()
+        for cell in self._cells_in_box(box, self._route_cells):
+            bucket = self._route_cells.get(cell, ())
+            for k in range(0, len(bucket), 2):
+                route_id = bucket[k]
+                if route_id in found:
+                    continue
+                if _segment_intersects_box(
+                    *self._segment(route_id, bucket[k + 1]), box
+                ):
+                    found.add(route_id)
+        return found
+
+    def routes_within(self, point: Coordinate, meters: float) -> Set[int]:
+        """Ids of the routes passing within `meters` of `point`."""
+        found: Set[int] = set()
+        for cell in self._cells_in_box(
+            self._radius_box(point, meters), self._route_cells
+        ):
+            bucket = self._route_cells.get(cell, ())
+            for k in range(0, len(bucket), 2):
+                route_id = bucket[k]
+                if route_id in found:
+                    continue
+                segment = self._segment(route_id, bucket[k + 1])
+                if (
+                    _segment_distance(point.latitude, point.longitude, *segment)
+                    <= meters
+                ):
+                    found.add(route_id)
+        return found
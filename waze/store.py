@@ -0,0 +1,433 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import time
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, overload
+
+from .geometry import GeoPath
+from .models import (
+    Alert,
+    Coordinate,
+    ETAHistogramItem,
+    TollPriceItem,
+    WazeTravelPlan,
+)
+
+# File layout, little endian:
+#   header     magic, version, precision
+#   geometries delta-encoded paths, each identical path stored once
+#   routes     fixed-width ROUTE records
+#   alerts     fixed-width ALERT records, referenced by range from routes
+#   histograms fixed-width HISTOGRAM records, likewise
+#   strings    varint length prefixed UTF-8, referenced by index
+#   footer     offsets and counts of the tables above
+MAGIC = b"WZRS"
+VERSION = 1
+HEADER = struct.Struct("<4sBB2x")
+FOOTER = struct.Struct("<8Q4s")
+# timestamp, src/dst fixed-point lat/lon, routeName, totalSeconds,
+# totalLength, flags, tollPrice, cacheAge (NaN for None), geometry offset,
+# bytes and vertices, alerts start/count, histograms start/count
+ROUTE = struct.Struct("<d4iIiiBddQ6I")
+# id, type, subtype, fixed-point lat/lon
+ALERT = struct.Struct("<qIIii")
+# eta, routeLengthInMinutes, text
+HISTOGRAM = struct.Struct("<qiI")
+
+_TOLL, _FASTEST, _HISTOGRAMS = 1, 2, 4
+
+COLUMNS = {
+    name: i
+    for i, name in enumerate(
+        (
+            "timestamp",
+            "src_latitude",
+            "src_longitude",
+            "dst_latitude",
+            "dst_longitude",
+            "routeName",
+            "totalSeconds",
+            "totalLength",
+            "flags",
+            "tollPrice",
+            "cacheAge",
+            "geometry_offset",
+            "geometry_bytes",
+            "vertices",
+        )
+    )
+}
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf: Any, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_path(path: GeoPath, precision: int = 6) -> bytes:
+    """Encodes a path as zigzag varint deltas of fixed-point coordinates with
+    `precision` decimals, the Google polyline scheme in binary."""
+    scale = 10**precision
+    out = bytearray()
+    previous = [0, 0]
+    for i, value in enumerate(path._coords):
+        fixed = round(value * scale)
+        delta = fixed - previous[i & 1]
+        previous[i & 1] = fixed
+        _write_varint(out, delta << 1 if delta >= 0 else (-delta << 1) - 1)
+    return bytes(out)
+
+
+def decode_path(buf: Any, vertices: int, precision: int = 6) -> GeoPath:
+    """Inverse of `encode_path`, `buf` may be any buffer such as a slice of
+    a memory map."""
+    scale = 10**precision
+    coords = array("d", bytes(16 * vertices))
+    previous = [0, 0]
+    pos = 0
+    for i in range(2 * vertices):
+        zigzag, pos = _read_varint(buf, pos)
+        previous[i & 1] += (zigzag >> 1) ^ -(zigzag & 1)
+        coords[i] = previous[i & 1] / scale
+    return GeoPath(coords)
+
+
+class RouteStoreWriter:
+    """Writes plans to a compact route store file, read with `RouteStore`.
+
+    Geometry is delta encoded at `precision` decimals, ~11cm at 6, and a
+    geometry identical to one already written is stored once, so repeated
+    polls of a corridor cost one route record each. The file is written
+    under a temporary name and renamed on `close`, so a store is complete or
+    absent; keep history as one store per day or week.
+
+    Args:
+        path (str): File to create
+        precision (int, optional): Decimals kept of coordinates, at most 7.
+            Defaults to 6.
+
+    Example:
+        >>> with RouteStoreWriter("routes-2024-06-01.wzrs") as store:
+        ...     store.write(plan)
+    """
+
+    def __init__(self, path: str, precision: int = 6):
+        if not 0 <= precision <= 7:
+            raise ValueError("precision must be between 0 and 7")
+        self.path = path
+        self.precision = precision
+        self._scale = 10**precision
+        self._tmp = f"{path}.tmp"
+        self._file = open(self._tmp, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, precision))
+        self._offset = HEADER.size
+        self._geometries: Dict[bytes, Tuple[int, int]] = {}  # digest: offset, size
+        self._raw: Dict[bytes, Tuple[int, int]] = {}  # same by unencoded digest
+        self._routes = bytearray()
+        self._alerts = bytearray()
+        self._histograms = bytearray()
+        self._strings: Dict[str, int] = {}
+        self.routes = 0
+        self.deduplicated = 0  # routes whose geometry was already stored
+
+    def __enter__(self) -> "RouteStoreWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            os.remove(self._tmp)
+
+    def _string(self, value: str) -> int:
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings)
+        return index
+
+    def _fixed(self, degrees: float) -> int:
+        return round(degrees * self._scale)
+
+    def _geometry(self, path: GeoPath) -> Tuple[int, int]:
+        # repeated polls mostly return the very same buffer, skip encoding it
+        raw = hashlib.blake2b(path._coords, digest_size=16).digest()
+        location = self._raw.get(raw)
+        if location is not None:
+            self.deduplicated += 1
+            return location
+        location = self._raw[raw] = self._encoded_geometry(path)
+        return location
+
+    def _encoded_geometry(self, path: GeoPath) -> Tuple[int, int]:
+        encoded = encode_path(path, self.precision)
+        digest = hashlib.blake2b(encoded, digest_size=16).digest()
+        location = self._geometries.get(digest)
+        if location is not None:
+            self.deduplicated += 1
+            return location
+        location = self._geometries[digest] = (self._offset, len(encoded))
+        self._file.write(encoded)
+        self._offset += len(encoded)
+        return location
+
+    def write(self, plan: WazeTravelPlan, timestamp: Optional[float] = None) -> int:
+        """Appends a plan polled at `timestamp`, now by default, and returns
+        its index in the store."""
+        offset, size = self._geometry(plan.geoPath)
+        alerts_start = len(self._alerts) // ALERT.size
+        for alert in plan.alerts:
+            self._alerts += ALERT.pack(
+                alert.id,
+                self._string(alert.type),
+                self._string(alert.subtype),
+                self._fixed(alert.location.latitude),
+                self._fixed(alert.location.longitude),
+            )
+        histograms_start = len(self._histograms) // HISTOGRAM.size
+        for item in plan.etaHistograms or ():
+            self._histograms += HISTOGRAM.pack(
+                item.eta, item.routeLengthInMinutes, self._string(item.text)
+            )
+        flags = (
+            (_TOLL if plan.isToll else 0)
+            | (_FASTEST if plan.isFastest else 0)
+            | (_HISTOGRAMS if plan.etaHistograms is not None else 0)
+        )
+        self._routes += ROUTE.pack(
+            time.time() if timestamp is None else timestamp,
+            self._fixed(plan.src.latitude),
+            self._fixed(plan.src.longitude),
+            self._fixed(plan.dst.latitude),
+            self._fixed(plan.dst.longitude),
+            self._string(plan.routeName),
+            plan.totalSeconds,
+            plan.totalLength,
+            flags,
+            plan.tollPriceInfo.tollPrice,
+            math.nan if plan.cacheAge is None else plan.cacheAge,
+            offset,
+            size,
+            len(plan.geoPath),
+            alerts_start,
+            len(plan.alerts),
+            histograms_start,
+            len(plan.etaHistograms or ()),
+        )
+        self.routes += 1
+        return self.routes - 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        f = self._file
+        offsets = []
+        for table, count in (
+            (self._routes, self.routes),
+            (self._alerts, len(self._alerts) // ALERT.size),
+            (self._histograms, len(self._histograms) // HISTOGRAM.size),
+        ):
+            offsets += [f.tell(), count]
+            f.write(table)
+        strings = bytearray()
+        for value in self._strings:  # insertion ordered, i.e. by index
+            encoded = value.encode()
+            _write_varint(strings, len(encoded))
+            strings += encoded
+        offsets += [f.tell(), len(self._strings)]
+        f.write(strings)
+        f.write(FOOTER.pack(*offsets, MAGIC))
+        f.close()
+        os.replace(self._tmp, self.path)
+
+
+class RouteStore(Sequence[WazeTravelPlan]):
+    """Memory-mapped reader of a `RouteStoreWriter` file.
+
+    Opening only reads the footer and string table; `store[i]` decodes one
+    route from its fixed-width record, `geometry(i)` only its path, and
+    `column` a scalar of every route without building any plan.
+
+    Example:
+        >>> with RouteStore("routes-2024-06-01.wzrs") as store:
+        ...     plan = store[-1]
+        ...     seconds = store.column("totalSeconds")
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.precision = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} route store")
+        (
+            self._routes_at,
+            self._count,
+            self._alerts_at,
+            _,
+            self._histograms_at,
+            _,
+            strings_at,
+            strings,
+            magic,
+        ) = FOOTER.unpack_from(self._map, len(self._map) - FOOTER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is truncated")
+        self._scale = 10**self.precision
+        # routes share deduplicated geometries, keep the last few decoded
+        self._path = lru_cache(maxsize=64)(self._decode)
+        self._strings: List[str] = []
+        pos = strings_at
+        for _ in range(strings):
+            size, pos = _read_varint(self._map, pos)
+            self._strings.append(self._map[pos : pos + size].decode())
+            pos += size
+
+    def __enter__(self) -> "RouteStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"RouteStore({self.path!r}, routes={self._count})"
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("route index out of range")
+        return index
+
+    def record(self, index: int) -> Tuple[Any, ...]:
+        """Raw fixed-width record of a route, see `COLUMNS`."""
+        return ROUTE.unpack_from(
+            self._map, self._routes_at + self._index(index) * ROUTE.size
+        )
+
+    def timestamp(self, index: int) -> float:
+        return self.record(index)[0]
+
+    def geometry(self, index: int) -> GeoPath:
+        """Path of a route, decoded from the memory map."""
+        return self._path(*self.record(index)[11:14])
+
+    def _decode(self, offset: int, size: int, vertices: int) -> GeoPath:
+        with memoryview(self._map) as view:
+            return decode_path(view[offset : offset + size], vertices, self.precision)
+
+    def column(self, name: str) -> List[Any]:
+        """One field of `COLUMNS` for every route, coordinates in degrees."""
+        i = COLUMNS[name]
+        end = self._routes_at + self._count * ROUTE.size
+        with memoryview(self._map) as view:
+            values = [r[i] for r in ROUTE.iter_unpack(view[self._routes_at : end])]
+        if name.endswith(("latitude", "longitude")):
+            return [v / self._scale for v in values]
+        if name == "routeName":
+            return [self._strings[v] for v in values]
+        return values
+
+    def _coordinate(self, latitude: int, longitude: int) -> Coordinate:
+        return Coordinate.model_construct(
+            latitude=latitude / self._scale, longitude=longitude / self._scale
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> WazeTravelPlan: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[WazeTravelPlan]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        (
+            _,
+            src_lat,
+            src_lon,
+            dst_lat,
+            dst_lon,
+            route_name,
+            total_seconds,
+            total_length,
+            flags,
+            toll_price,
+            cache_age,
+            _,
+            _,
+            _,
+            alerts_start,
+            alerts,
+            histograms_start,
+            histograms,
+        ) = self.record(index)
+        strings = self._strings
+        alert_list = []
+        for i in range(alerts_start, alerts_start + alerts):
+            alert_id, kind, subkind, lat, lon = ALERT.unpack_from(
+                self._map, self._alerts_at + i * ALERT.size
+            )
+            alert_list.append(
+                Alert.model_construct(
+                    id=alert_id,
+                    type=strings[kind],
+                    subtype=strings[subkind],
+                    location=self._coordinate(lat, lon),
+                )
+            )
+        histogram_list = None
+        if flags & _HISTOGRAMS:
+            histogram_list = []
+            for i in range(histograms_start, histograms_start + histograms):
+                eta, minutes, text = HISTOGRAM.unpack_from(
+                    self._map, self._histograms_at + i * HISTOGRAM.size
+                )
+                histogram_list.append(
+                    ETAHistogramItem.model_construct(
+                        eta=eta, routeLengthInMinutes=minutes, text=strings[text]
+                    )
+                )
+        # records were validated when written
+        return WazeTravelPlan.model_construct(
+            src=self._coordinate(src_lat, src_lon),
+            dst=self._coordinate(dst_lat, dst_lon),
+            routeName=strings[route_name],
+            geoPath=self.geometry(index),
+            alerts=alert_list,
+            totalSeconds=total_seconds,
+            totalLength=total_length,
+            isToll=bool(flags & _TOLL),
+            isFastest=bool(flags & _FASTEST),
+            tollPriceInfo=TollPriceItem.model_construct(tollPrice=toll_price),
+            etaHistograms=histogram_list,
+            cacheAge=None if math.isnan(cache_age) else cache_age,
+        )
+
+    def __iter__(self) -> Iterator[WazeTravelPlan]:
+        for i in range(self._count):
+            yield self[i]
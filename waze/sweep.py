@@ -0,0 +1,66 @@
+import math
+from typing import Any, Iterator, List
+
+from .models import ViewBox, WazeLocation
+
+METERS_PER_DEGREE = 111_320.0
+
+
+def location_id(location: Any) -> str:
+    """`venueId` of a `WazeLocation`, or of its raw dict with validate="none"."""
+    if isinstance(location, WazeLocation):
+        return location.venueId
+    return location["venueId"]
+
+
+def tile_viewbox(box: ViewBox, tile_km: float) -> List[ViewBox]:
+    """Covers `box` with a grid of tiles roughly `tile_km` wide."""
+    mid_lat = math.radians((box.lat1 + box.lat2) / 2)
+    lat_step = tile_km * 1000 / METERS_PER_DEGREE
+    lon_step = lat_step / max(math.cos(mid_lat), 1e-6)
+    rows = max(math.ceil((box.lat2 - box.lat1) / lat_step), 1)
+    cols = max(math.ceil((box.long2 - box.long1) / lon_step), 1)
+    return split_viewbox(box, rows, cols)
+
+
+def split_viewbox(box: ViewBox, rows: int = 2, cols: int = 2) -> List[ViewBox]:
+    """Splits `box` into `rows` x `cols` equal tiles."""
+    dlat = (box.lat2 - box.lat1) / rows
+    dlon = (box.long2 - box.long1) / cols
+    return [
+        ViewBox(
+            long1=box.long1 + col * dlon,
+            lat1=box.lat1 + row * dlat,
+            long2=box.long1 + (col + 1) * dlon,
+            lat2=box.lat1 + (row + 1) * dlat,
+        )
+        for row in range(rows)
+        for col in range(cols)
+    ]
+
+
+class SweepStats:
+    """Request and coverage counters of a `Waze.sweep`."""
+
+    def __init__(self):
+        self.requests = 0
+        self.saturated = 0  # tiles that were subdivided
+        self.max_depth = 0
+        self.locations = 0  # distinct venues yielded
+        self.errors = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"SweepStats(requests={self.requests}, saturated={self.saturated}, "
+            f"max_depth={self.max_depth}, locations={self.locations}, "
+            f"errors={self.errors})"
+        )
+
+
+def new_locations(locations: List[Any], seen: set) -> Iterator[Any]:
+    """Yields the locations whose `venueId` is not in `seen`, adding them."""
+    for location in locations:
+        id_ = location_id(location)
+        if id_ not in seen:
+            seen.add(id_)
+            yield location
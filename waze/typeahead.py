@@ -0,0 +1,337 @@
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .cache import normalize_query
+from .models import ViewBox
+from .parsing import resolve_locale
+from .utils import get_search_bbox
+
+if TYPE_CHECKING:
+    from .aio import AsyncWaze
+    from .waze import Waze
+
+Scope = Tuple[float, float, float, float]
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def matches(location: Any, query: str) -> bool:
+    """Whether every word of `query` starts a word of the location's name or
+    address, the way autocomplete matches partially typed words."""
+    if isinstance(location, dict):
+        text = f"{location.get('name', '')} {location.get('address', '')}"
+    else:
+        text = f"{location.name} {location.address}"
+    words = _words(text)
+    return all(any(w.startswith(t) for w in words) for t in _words(query))
+
+
+class _Node:
+    __slots__ = ("children", "entry")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # (results, complete, stored_at)
+        self.entry: Optional[Tuple[List[Any], bool, float]] = None
+
+
+class TypeaheadStats:
+    """Counters of a `TypeaheadCache`."""
+
+    def __init__(self):
+        self.hits = 0  # answered by a cached query
+        self.filtered = 0  # answered by filtering a shorter complete prefix
+        self.misses = 0  # results stored after a request
+        self.superseded = 0  # queries dropped for a newer keystroke
+
+    def __repr__(self) -> str:
+        return (
+            f"TypeaheadStats(hits={self.hits}, filtered={self.filtered}, "
+            f"misses={self.misses}, superseded={self.superseded})"
+        )
+
+
+class TypeaheadCache:
+    """Prefix trie of recent geocode results, one trie per search area.
+
+    A result list shorter than `saturation` is complete: the server had no
+    more matches, so results for any longer query are the subset of those
+    that still match it, and the longer query needs no request.
+
+    Args:
+        saturation (int, optional): Result count the server truncates at.
+            Defaults to 10.
+        max_entries (int, optional): Queries kept, least recently used are
+            evicted first. Defaults to 1024.
+        ttl (float, optional): Seconds a result stays usable. Defaults to 300.
+    """
+
+    def __init__(self, saturation: int = 10, max_entries: int = 1024, ttl: float = 300):
+        self.saturation = saturation
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = TypeaheadStats()
+        self._roots: Dict[Scope, _Node] = {}
+        self._lru: "OrderedDict[Tuple[Scope, str], None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def lookup(self, scope: Scope, query: str) -> Optional[List[Any]]:
+        """Results for the normalized `query`, or None if it needs a request."""
+        now = time.monotonic()
+        with self._lock:
+            node = self._roots.get(scope)
+            prefix: Optional[Tuple[List[Any], bool, float]] = None
+            for depth, char in enumerate(query, 1):
+                if node is None:
+                    break
+                node = node.children.get(char)
+                if node is None or node.entry is None:
+                    continue
+                if now - node.entry[2] > self.ttl:
+                    continue
+                if depth == len(query):
+                    self.stats.hits += 1
+                    self._lru.move_to_end((scope, query))
+                    return node.entry[0]
+                if node.entry[1]:
+                    prefix = node.entry
+            if prefix is None:
+                return None
+            self.stats.filtered += 1
+        return [location for location in prefix[0] if matches(location, query)]
+
+    def store(self, scope: Scope, query: str, results: List[Any]) -> None:
+        with self._lock:
+            self.stats.misses += 1
+            node = self._roots.setdefault(scope, _Node())
+            for char in query:
+                node = node.children.setdefault(char, _Node())
+            complete = len(results) < self.saturation
+            node.entry = (results, complete, time.monotonic())
+            self._lru[(scope, query)] = None
+            self._lru.move_to_end((scope, query))
+            while len(self._lru) > self.max_entries:
+                self._evict(*self._lru.popitem(last=False)[0])
+
+    def _evict(self, scope: Scope, query: str) -> None:
+        path = [self._roots[scope]]
+        for char in query:
+            path.append(path[-1].children[char])
+        path[-1].entry = None
+        # drop the nodes left without entries or children
+        for char, parent, node in zip(query[::-1], path[-2::-1], path[:0:-1]):
+            if node.entry is not None or node.children:
+                break
+            del parent.children[char]
+        if not path[0].children:
+            del self._roots[scope]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._roots.clear()
+            self._lru.clear()
+
+
+class _TypeaheadBase:
+    def __init__(
+        self,
+        client: Any,
+        viewbox: Optional[ViewBox],
+        radius: int,
+        debounce: float,
+        cache: Optional[TypeaheadCache],
+    ):
+        self.client = client
+        self.viewbox = viewbox
+        self.radius = radius
+        self.debounce = debounce
+        self.cache = cache if cache is not None else TypeaheadCache()
+
+    @property
+    def stats(self) -> TypeaheadStats:
+        return self.cache.stats
+
+    def _area(self) -> ViewBox:
+        if self.viewbox is not None:
+            return self.viewbox
+        # the client's locale may only be inferred after construction
+        return get_search_bbox(resolve_locale(self.client.locale), self.radius)
+
+    @staticmethod
+    def _scope(viewbox: ViewBox) -> Scope:
+        return (viewbox.long1, viewbox.lat1, viewbox.long2, viewbox.lat2)
+
+
+class Typeahead(_TypeaheadBase):
+    """Geocoding for a search box, on a `Waze` client.
+
+    `search` answers from a `TypeaheadCache` when it can. `type` is meant to
+    be called on every keystroke: queries the cache can answer are answered
+    at once, the others wait for `debounce` seconds without a newer
+    keystroke before a request is made, and results of superseded queries
+    are dropped.
+
+    Args:
+        client (Waze): Client making the requests
+        viewbox (ViewBox, optional): Area to search instead of the one
+            around the client's locale. Defaults to None.
+        radius (int, optional): Kilometers around the locale to search.
+            Defaults to 100.
+        debounce (float, optional): Seconds without a keystroke before a
+            request. Defaults to 0.15.
+        cache (TypeaheadCache, optional): Results cache, can be shared by
+            several search boxes. Defaults to a new one.
+
+    Example:
+        >>> box = Typeahead(waze)
+        >>> for text in ("s", "su", "sub", "suba"):
+        ...     box.type(text, lambda query, results: print(query, results))
+    """
+
+    def __init__(
+        self,
+        client: "Waze",
+        viewbox: Optional[ViewBox] = None,
+        radius: int = 100,
+        debounce: float = 0.15,
+        cache: Optional[TypeaheadCache] = None,
+    ):
+        super().__init__(client, viewbox, radius, debounce, cache)
+        self._latest = 0
+        self._pending = False  # the latest query awaits its results
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def search(self, query: str) -> List[Any]:
+        """Locations matching `query`, from the cache when possible."""
+        key = normalize_query(query)
+        if not key:
+            return []
+        viewbox = self._area()
+        scope = self._scope(viewbox)
+        results = self.cache.lookup(scope, key)
+        if results is None:
+            results = self.client.geocode(query, viewbox=viewbox)
+            self.cache.store(scope, key, results)
+        return results
+
+    def type(self, query: str, callback: Callable[[str, List[Any]], None]) -> None:
+        """Handles a keystroke, calling `callback(query, results)` unless a
+        newer keystroke arrives before the results."""
+        with self._lock:
+            if self._pending:
+                self.stats.superseded += 1
+            self._latest += 1
+            generation = self._latest
+            self._pending = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        key = normalize_query(query)
+        cached = self.cache.lookup(self._scope(self._area()), key) if key else []
+        if cached is not None:
+            callback(query, cached)
+            return
+        timer = threading.Timer(self.debounce, self._run, (query, callback, generation))
+        timer.daemon = True
+        with self._lock:
+            if generation != self._latest:
+                return
+            self._timer, self._pending = timer, True
+        timer.start()
+
+    def _run(self, query: str, callback: Callable, generation: int) -> None:
+        with self._lock:
+            if generation != self._latest:
+                return
+            self._timer = None
+        try:
+            results: Optional[List[Any]] = self.search(query)
+        except Exception as e:
+            self.client.logger.error("[typeahead] %r failed: %s", query, e)
+            results = None
+        with self._lock:
+            if generation != self._latest:
+                return
+            self._pending = False
+        if results is not None:
+            callback(query, results)
+
+
+class AsyncTypeahead(_TypeaheadBase):
+    """`Typeahead` on an `AsyncWaze` client, superseded queries are
+    cancelled.
+
+    With `coalesce_requests` on, a cancelled query stops waiting but its
+    request still completes for any other waiter.
+
+    Example:
+        >>> box = AsyncTypeahead(waze)
+        >>> results = await box.type("suba")  # None if superseded
+    """
+
+    def __init__(
+        self,
+        client: "AsyncWaze",
+        viewbox: Optional[ViewBox] = None,
+        radius: int = 100,
+        debounce: float = 0.15,
+        cache: Optional[TypeaheadCache] = None,
+    ):
+        super().__init__(client, viewbox, radius, debounce, cache)
+        self._task: Optional["asyncio.Task[List[Any]]"] = None
+
+    async def search(self, query: str) -> List[Any]:
+        """Locations matching `query`, from the cache when possible."""
+        key = normalize_query(query)
+        if not key:
+            return []
+        viewbox = self._area()
+        scope = self._scope(viewbox)
+        results = self.cache.lookup(scope, key)
+        if results is None:
+            results = await self.client.geocode(query, viewbox=viewbox)
+            self.cache.store(scope, key, results)
+        return results
+
+    async def _debounced(self, query: str) -> List[Any]:
+        await asyncio.sleep(self.debounce)
+        return await self.search(query)
+
+    async def type(self, query: str) -> Optional[List[Any]]:
+        """Handles a keystroke, returning its results or None if a newer
+        keystroke superseded it."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            self.stats.superseded += 1
+        self._task = None
+        key = normalize_query(query)
+        cached = self.cache.lookup(self._scope(self._area()), key) if key else []
+        if cached is not None:
+            return cached
+        task = self._task = asyncio.ensure_future(self._debounced(query))
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if task is self._task:
+                raise  # cancelled by our caller, not by a newer keystroke
+            return None
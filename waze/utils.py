@@ -1,9 +1,20 @@
 import math
-from functools import partial
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+from urllib3.util.retry import Retry
+
+from .cfg import RETRY_ALLOWED_METHODS, RETRY_STATUS_FORCELIST, Countries
 from .models import ViewBox, Coordinate
 
+if TYPE_CHECKING:
+    from .geometry import GeoPath
+
 sevendp = partial(round, ndigits=7)
 
+EARTH_RADIUS_M = 6_371_000.0
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
 
 def get_search_bbox(point: Coordinate, radius: int = 100) -> ViewBox:
     """Computes a rectangular feasible search area around
@@ -35,3 +46,188 @@ def get_search_bbox(point: Coordinate, radius: int = 100) -> ViewBox:
         long2=sevendp(math.degrees(max_lon)),
         lat2=sevendp(math.degrees(max_lat)),
     )
+
+
+def make_retry(max_retries: int = 3, backoff_factor: float = 0.3) -> Retry:
+    """Builds the retry strategy shared by the sync and async clients.
+
+    Args:
+        max_retries (int, optional): Total number of retries. Defaults to 3.
+        backoff_factor (float, optional): Exponential backoff factor.
+            Defaults to 0.3.
+
+    Returns:
+        Retry: Configured urllib3 retry strategy
+    """
+    return Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        allowed_methods=RETRY_ALLOWED_METHODS,
+        # hand back the last response once retries run out, so errors keep
+        # their status code instead of becoming a bare `RetryError`
+        raise_on_status=False,
+    )
+
+
+def geohash(point: Coordinate, precision: int = 7) -> str:
+    """Encodes a point as a geohash string.
+
+    Args:
+        point (Coordinate): Point to encode
+        precision (int, optional): Number of characters, 7 is roughly a
+            150m cell. Defaults to 7.
+
+    Returns:
+        str: Geohash of the cell containing `point`
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, interval = (
+            (point.longitude, lon_range) if even else (point.latitude, lat_range)
+        )
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit = 0, 0
+    return "".join(chars)
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters between two points in degrees."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(math.sqrt(a), 1.0))
+
+
+def _numpy(feature: str = "vectorized geo utilities"):
+    """Imports numpy, raising an ImportError naming `feature` without it."""
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError(
+            f"numpy is required by {feature}, install it with "
+            "`pip install waze-traffic-api[numpy]`"
+        ) from e
+    return np
+
+
+def get_search_bboxes(lats: Any, lons: Any, radius: float = 100) -> Any:
+    """Array version of `get_search_bbox`.
+
+    Args:
+        lats (array-like): Latitudes in degrees
+        lons (array-like): Longitudes in degrees
+        radius (float, optional): Radius in kilometers. Defaults to 100.
+
+    Returns:
+        np.ndarray: (N, 4) array of `long1, lat1, long2, lat2` rows
+    """
+    np = _numpy()
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    dlat = radius * 1000 / EARTH_RADIUS_M
+    dlon = dlat / np.cos(lat)
+    return np.round(
+        np.degrees(np.stack([lon - dlon, lat - dlat, lon + dlon, lat + dlat], -1)), 7
+    )
+
+
+def haversine_many(lat1: Any, lon1: Any, lat2: Any, lon2: Any) -> Any:
+    """Array version of `haversine`, broadcasting its arguments."""
+    np = _numpy()
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dlambda = np.radians(np.subtract(lon2, lon1))
+    a = (
+        np.sin((phi2 - phi1) / 2) ** 2
+        + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def segment_lengths(path: "GeoPath") -> Any:
+    """Length in meters of every segment of `path`."""
+    coords = path.to_numpy()
+    lon, lat = coords[:, 0], coords[:, 1]
+    return haversine_many(lat[:-1], lon[:-1], lat[1:], lon[1:])
+
+
+def path_length(path: "GeoPath") -> float:
+    """Length of `path` in meters."""
+    return float(segment_lengths(path).sum())
+
+
+def segment_bearings(path: "GeoPath") -> Any:
+    """Initial bearing in degrees clockwise from north of every segment."""
+    np = _numpy()
+    coords = np.radians(path.to_numpy())
+    lon, lat = coords[:, 0], coords[:, 1]
+    dlambda = lon[1:] - lon[:-1]
+    y = np.sin(dlambda) * np.cos(lat[1:])
+    x = np.cos(lat[:-1]) * np.sin(lat[1:]) - np.sin(lat[:-1]) * np.cos(
+        lat[1:]
+    ) * np.cos(dlambda)
+    return np.degrees(np.arctan2(y, x)) % 360
+
+
+def _unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lon)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def _build_kdtree(points: list, depth: int = 0) -> Optional[tuple]:
+    if not points:
+        return None
+    axis = depth % 3
+    points.sort(key=lambda p: p[0][axis])
+    mid = len(points) // 2
+    return (
+        points[mid],
+        axis,
+        _build_kdtree(points[:mid], depth + 1),
+        _build_kdtree(points[mid + 1 :], depth + 1),
+    )
+
+
+@lru_cache(maxsize=None)
+def _countries_kdtree() -> tuple:
+    # 3D unit vectors, so nearest by chord is nearest on the sphere with no
+    # special casing of the antimeridian
+    return _build_kdtree([(_unit_vector(*c.centroid), c) for c in Countries])
+
+
+def nearest_country(point: Coordinate) -> Countries:
+    """Returns the `Countries` member whose centroid is closest to `point`,
+    using a KD-tree built once over the centroids."""
+    target = _unit_vector(point.latitude, point.longitude)
+    best: list = [math.inf, None]
+
+    def search(node: Optional[tuple]) -> None:
+        if node is None:
+            return
+        (vector, country), axis, left, right = node
+        d = sum((a - b) ** 2 for a, b in zip(vector, target))
+        if d < best[0]:
+            best[0], best[1] = d, country
+        diff = target[axis] - vector[axis]
+        near, far = (left, right) if diff < 0 else (right, left)
+        search(near)
+        if diff * diff < best[0]:
+            search(far)
+
+    search(_countries_kdtree())
+    return best[1]
@@ -1,17 +1,49 @@
+import itertools
+import math
+import threading
+import time
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from typing import Any, Dict, List, Literal, Optional, Union
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
+from .cache import (
+    Cache,
+    CacheStats,
+    PlanCache,
+    make_cache_key,
+    normalize_query,
+)
+from .adapters import PooledHTTPAdapter
+from .exceptions import WazeHTTPError
 from .logger import get_logger
-from .utils import get_search_bbox
+from .departures import REQUESTED, DepartureSeries, covering_departures
+from .matrix import TravelMatrix
+from .metrics import Hooks, RequestEvent, TimedHTTPAdapter, timed
+from .ratelimit import AIMDLimiter, TokenBucket
+from .resilience import CircuitBreaker, Hedge
+from .singleflight import SingleFlight, request_key
+from .sweep import SweepStats, new_locations, split_viewbox, tile_viewbox
+from .utils import get_search_bbox, make_retry, nearest_country
 
 from .models import (
     Coordinate,
+    PlanResult,
     ViewBox,
     WazeGeocodeParams,
     WazeLocation,
-    WazeRequestBody,
     WazeReview,
     WazeTravelPlan,
     WazeVenue,
@@ -19,17 +51,38 @@ from .models import (
 
 from .cfg import (
     BASE_URL,
+    DEFAULT_CACHE_TTL,
     DEFAULT_HEADERS,
+    DEFAULT_TIMEOUTS,
     GEOCODE_EXT,
     PLANNER_EXT,
     REVIEWS_EXT,
     VENUES_EXT,
     Countries,
 )
+from .parsing import (
+    RouteAlternatives,
+    ValidateMode,
+    decode,
+    geocode_params,
+    loads,
+    parse_locations,
+    parse_plan,
+    parse_review,
+    parse_venue,
+    plan_body,
+    resolve_locale,
+    route_etas,
+    route_totals,
+    venue_id,
+)
 
 
-class WazeHTTPError(Exception):
-    pass
+def _is_throttled(response: requests.Response) -> bool:
+    if response.status_code == 429:
+        return True
+    retries = getattr(response.raw, "retries", None)
+    return any(h.status == 429 for h in getattr(retries, "history", ()))
 
 
 class Waze(requests.Session):
@@ -45,10 +98,26 @@ class Waze(requests.Session):
         _headers: Dict[str, Any] = DEFAULT_HEADERS,
         max_retries: int = 3,
         backoff_factor: float = 0.3,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: Optional[float] = None,
+        cache: Optional[Cache] = None,
+        cache_ttl: Optional[Dict[str, float]] = None,
+        plan_cache: Optional[PlanCache] = None,
+        rate_limits: Optional[Dict[str, TokenBucket]] = None,
+        concurrency_limiter: Optional[AIMDLimiter] = None,
+        coalesce_requests: bool = True,
+        validate: ValidateMode = "full",
+        hooks: Optional[Hooks] = None,
+        timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+        hedging: Optional[Dict[str, Hedge]] = None,
+        breakers: Optional[Dict[str, CircuitBreaker]] = None,
         **session_kwargs,
     ):
         super().__init__(**session_kwargs)
-        self.locale = locale
+        # resolved once, afterwards only set if it was None, see `_infer_locale`
+        self.locale = resolve_locale(locale) if locale is not None else None
+        self._locale_lock = threading.Lock()
         self.logger = get_logger(log_level)
         self._base_url = _base_url
         self._planner_ext = _planner_ext
@@ -56,110 +125,669 @@ class Waze(requests.Session):
         self._venues_ext = _venues_ext
         self._reviews_ext = _reviews_ext
         self._headers = _headers
+        self.cache = cache
+        self.cache_ttl = {**DEFAULT_CACHE_TTL, **(cache_ttl or {})}
+        self.cache_stats = CacheStats()
+        self.plan_cache = plan_cache
+        self.rate_limits = rate_limits or {}
+        self.concurrency_limiter = concurrency_limiter
+        self.validate = validate
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.instrumentation = hooks  # Session.hooks is taken by requests
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.hedging = hedging or {}
+        self.breakers = breakers or {}
+        # a hedged request and its duplicate both run on this executor
+        self._hedge_executor = (
+            ThreadPoolExecutor(2 * pool_maxsize, thread_name_prefix="waze-hedge")
+            if self.hedging
+            else None
+        )
 
         # Configure retry strategy
-        retry_strategy = Retry(
-            total=max_retries,
-            backoff_factor=backoff_factor,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS", "POST"],
+        self._retry = make_retry(max_retries, backoff_factor)
+        # timed connections are only used when someone listens
+        adapter_cls = TimedHTTPAdapter if hooks is not None else PooledHTTPAdapter
+        adapter = adapter_cls(
+            keep_alive=keep_alive,
+            max_retries=self._retry,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
         self.mount("https://", adapter)
         self.mount("http://", adapter)
 
-    def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
+    def close(self) -> None:
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        super().close()
+
+    def _make_request(
+        self, method: str, url: str, endpoint: Optional[str] = None, **kwargs
+    ) -> requests.Response:
+        if self.single_flight is None:
+            return self._request(method, url, endpoint, **kwargs)
+        # identical requests already in flight share one response
+        key = request_key(
+            method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data")
+        )
+        return self.single_flight.do(
+            key, lambda: self._request(method, url, endpoint, **kwargs)
+        )
+
+    def _request(
+        self, method: str, url: str, endpoint: Optional[str] = None, **kwargs
+    ) -> requests.Response:
+        breaker = self.breakers.get(endpoint)
+        if breaker is not None:
+            breaker.before(endpoint)
+        if endpoint in self.timeouts:
+            kwargs.setdefault("timeout", self.timeouts[endpoint])
+        bucket = self.rate_limits.get(endpoint)
+        if bucket is not None:
+            bucket.acquire()
+        limiter = self.concurrency_limiter
+        started_at = limiter.acquire() if limiter is not None else 0.0
+        throttled = False
+        if self.instrumentation is not None:
+            start = time.perf_counter()
+        response: Optional[requests.Response] = None
+        error: Optional[Exception] = None
+        failed: Optional[bool] = None
         try:
-            response = self.request(method, url, **kwargs)
+            response = self._send(method, url, endpoint, **kwargs)
+            throttled = _is_throttled(response)
             response.raise_for_status()
+            failed = False
             return response
         except requests.RequestException as e:
-            self.logger.error(f"HTTP request failed: {e}")
-            raise WazeHTTPError(f"HTTP request failed: {e}") from e
-
-    def _infer_locale(self) -> None:
-        if not self.locale:
-            raise ValueError("No locale specified, cannot geocode without a locale.")
-        elif isinstance(self.locale, Coordinate):
-            pass
-        elif isinstance(self.locale, Countries):
-            self.locale = self.locale.value
-            self.logger.info(f"Locale set to {self.locale}")
-        else:
-            raise TypeError("Unknown value passed in for `locale`")
+            error = e
+            self.logger.error("HTTP request failed: %s", e)
+            status_code = e.response.status_code if e.response is not None else None
+            failed = CircuitBreaker.is_failure(status_code)
+            raise WazeHTTPError(f"HTTP request failed: {e}", status_code) from e
+        finally:
+            if breaker is not None:
+                breaker.record(failed)
+            if limiter is not None:
+                limiter.release(started_at, congested=throttled)
+            if self.instrumentation is not None:
+                self._emit_request(endpoint, method, url, response, error, start)
+
+    def _send(
+        self, method: str, url: str, endpoint: Optional[str], **kwargs
+    ) -> requests.Response:
+        hedge = self.hedging.get(endpoint)
+        if hedge is None:
+            return self.request(method, url, **kwargs)
+        bucket = self.rate_limits.get(endpoint)
+        sent = itertools.count()
+
+        def send() -> requests.Response:
+            if next(sent) and bucket is not None:
+                bucket.acquire()  # the duplicate is a request too
+            return self.request(method, url, **kwargs)
+
+        return hedge.call(send, self._hedge_executor)
+
+    def _emit_request(
+        self,
+        endpoint: Optional[str],
+        method: str,
+        url: str,
+        response: Optional[requests.Response],
+        error: Optional[Exception],
+        start: float,
+    ) -> None:
+        total = time.perf_counter() - start
+        status_code, retries, bytes_out, bytes_in, ttfb = None, 0, 0, 0, None
+        # set by `TimedHTTPAdapter` on whichever thread sent the request
+        connect = getattr(
+            response if response is not None else error, "connect_time", None
+        )
+        if response is not None:
+            retries = len(
+                getattr(getattr(response.raw, "retries", None), "history", ())
+            )
+            body = response.request.body if response.request is not None else None
+            status_code = response.status_code
+            bytes_out, bytes_in = len(body or b""), len(response.content)
+            ttfb = response.elapsed.total_seconds()
+        elif isinstance(error, requests.exceptions.RetryError):
+            retries = self._retry.total
+        self.instrumentation.emit_request(
+            RequestEvent(
+                endpoint,
+                method,
+                url,
+                status_code,
+                retries,
+                bytes_out,
+                bytes_in,
+                connect,
+                ttfb,
+                total,
+                error,
+            )
+        )
+
+    def _fetch_payload(
+        self, endpoint: str, key: str, fetch: Callable[[], requests.Response]
+    ) -> Any:
+        if self.cache is None:
+            content = fetch().content
+            return timed(
+                self.instrumentation, endpoint, "decode", decode, content, self.validate
+            )
+        payload = self.cache.get(key)
+        self.cache_stats.record(endpoint, hit=payload is not None)
+        if payload is None:
+            payload = timed(
+                self.instrumentation, endpoint, "decode", loads, fetch().content
+            )
+            self.cache.set(key, payload, self.cache_ttl.get(endpoint))
+        return payload
+
+    def _infer_locale(self, near: Coordinate) -> None:
+        if self.locale is not None:
+            return
+        # no locale given, use the country closest to a point we were handed;
+        # set once, so concurrent first requests agree on it
+        locale = resolve_locale(nearest_country(near))
+        with self._locale_lock:
+            if self.locale is None:
+                self.locale = locale
+                self.logger.info("Locale set to %s", self.locale)
 
     def _prepare_geocode_params(
         self, query: str, viewbox: ViewBox
     ) -> WazeGeocodeParams:
-        return {
-            "q": query,
-            "v": f"{viewbox.lat1},{viewbox.long1};{viewbox.lat2},{viewbox.long2}",
-            "exp": "8,10,12",
-            "geo-env": "row",
-            "lang": "en",
-        }
-
-    def geocode(self, query: str, radius: int = 100) -> List[WazeLocation]:
-        self._infer_locale()
-        params = self._prepare_geocode_params(
-            query=query, viewbox=get_search_bbox(self.locale, radius)
-        )
+        return geocode_params(query, viewbox)
+
+    def geocode(
+        self, query: str, radius: int = 100, viewbox: Optional[ViewBox] = None
+    ) -> List[WazeLocation]:
+        """Searches for places matching `query`.
+
+        Args:
+            query (str): Search text
+            radius (int, optional): Kilometers around the locale to search.
+                Defaults to 100.
+            viewbox (ViewBox, optional): Area to search instead of the one
+                around the locale. Defaults to None.
+
+        Returns:
+            List[WazeLocation]: Matching places
+        """
+        if viewbox is None:
+            viewbox = get_search_bbox(resolve_locale(self.locale), radius)
+        params = self._prepare_geocode_params(query=query, viewbox=viewbox)
         self.logger.info(
-            f"[geocode] Making request with the following parameters:\n{params}"
+            "[geocode] Making request with the following parameters:\n%s", params
         )
 
-        response = self._make_request(
-            "GET", self._base_url + self._geocode_ext, params=params
+        def fetch() -> requests.Response:
+            return self._make_request(
+                "GET",
+                self._base_url + self._geocode_ext,
+                params=params,
+                endpoint="geocode",
+            )
+
+        key = make_cache_key("geocode", normalize_query(query), viewbox.model_dump())
+        payload = self._fetch_payload("geocode", key, fetch)
+        return timed(
+            self.instrumentation,
+            "geocode",
+            "validate",
+            parse_locations,
+            payload,
+            self.validate,
         )
-        return [WazeLocation(**o) for o in response.json()]
 
     def venue(self, location: Union[WazeLocation, str]) -> WazeVenue:
-        venue_id = (
-            location.venueId.replace("venues.", "").replace("googlePlaces.", "")
-            if isinstance(location, WazeLocation)
-            else location
-        )
-        response = self._make_request(
-            "GET", f"{self._base_url}{self._venues_ext}/{venue_id}"
+        id_ = venue_id(location)
+
+        def fetch() -> requests.Response:
+            return self._make_request(
+                "GET",
+                f"{self._base_url}{self._venues_ext}/{id_}",
+                endpoint="venue",
+            )
+
+        key = make_cache_key("venue", id_)
+        payload = self._fetch_payload("venue", key, fetch)
+        return timed(
+            self.instrumentation,
+            "venue",
+            "validate",
+            parse_venue,
+            payload,
+            self.validate,
         )
-        return WazeVenue(**response.json())
 
     def reviews(self, venue: WazeVenue) -> List[WazeReview]:
+        if not venue.googlePlaceId:
+            self.logger.info("Venue has no googlePlaceId, skipping reviews.")
+            return []
+
+        def fetch() -> requests.Response:
+            return self._make_request(
+                "GET",
+                f"{self._base_url}{self._reviews_ext}/{venue.googlePlaceId}",
+                endpoint="reviews",
+            )
+
+        key = make_cache_key("reviews", venue.googlePlaceId)
         try:
-            response = self._make_request(
-                "GET", f"{self._base_url}{self._reviews_ext}/{venue.googlePlaceId}"
+            payload = self._fetch_payload("reviews", key, fetch)
+            if payload == []:  # cached "no reviews" answer
+                return []
+            return timed(
+                self.instrumentation,
+                "reviews",
+                "validate",
+                parse_review,
+                payload,
+                self.validate,
             )
-            return WazeReview(**response.json())
         except WazeHTTPError as e:
-            if "500" in str(e):
+            if e.status_code == 500:
                 self.logger.info("No reviews found for this venue.")
+                # spares the next call the whole retry sequence
+                if self.cache is not None:
+                    self.cache.set(key, [], self.cache_ttl.get("no_reviews"))
                 return []
             raise
 
-    def plan(self, src: Coordinate, dst: Coordinate) -> WazeTravelPlan:
-        params = WazeRequestBody(from_=src, to=dst)
+    def plan(
+        self,
+        src: Coordinate,
+        dst: Coordinate,
+        n_paths: int = 1,
+        *,
+        interval: Optional[int] = None,
+        arrive_at: Optional[bool] = None,
+        at: Optional[int] = None,
+    ) -> Union[WazeTravelPlan, RouteAlternatives]:
+        """Plans a route from `src` to `dst`.
+
+        With `n_paths` > 1 every alternative of the single round trip is
+        returned as a lazily parsed `RouteAlternatives`, fastest first.
+        `interval` and `arrive_at` are sent as the planner's `interval` and
+        `arriveAt` fields, `at` departs that many minutes from now; left None
+        the server defaults apply.
+        """
+        if self.locale is None:
+            self._infer_locale(near=src)
+        payload, age = self._plan_payload(
+            src, dst, n_paths, interval=interval, arrive_at=arrive_at, at=at
+        )
+        return timed(
+            self.instrumentation,
+            "plan",
+            "validate",
+            parse_plan,
+            src,
+            dst,
+            payload,
+            n_paths,
+            age,
+            self.validate,
+        )
+
+    def _plan_payload(
+        self,
+        src: Coordinate,
+        dst: Coordinate,
+        n_paths: int = 1,
+        interval: Optional[int] = None,
+        arrive_at: Optional[bool] = None,
+        at: Optional[int] = None,
+        fresh: bool = False,
+    ) -> Tuple[Any, Optional[float]]:
+        """Returns the decoded planner payload and its age if it came from
+        the plan cache. `fresh` skips the cache lookup, the response is still
+        cached."""
+        body = plan_body(src, dst, n_paths, interval, arrive_at, at)
+        # the plan cache only holds responses for the default options
+        plan_cache = (
+            self.plan_cache
+            if interval is None and arrive_at is None and at is None
+            else None
+        )
         self.logger.info(
-            f"[plan] Making request with the following parameters:\n{params.model_dump(by_alias=True)}"
+            "[plan] Making request with the following parameters:\n%s", body
         )
 
+        if plan_cache is not None and not fresh:
+            cached = plan_cache.get(src, dst, n_paths)
+            self.cache_stats.record("plan", hit=cached is not None)
+            if cached is not None:
+                return cached
+
         response = self._make_request(
             "POST",
             self._base_url + self._planner_ext,
+            endpoint="plan",
             headers=self._headers,
-            json=params.model_dump(by_alias=True),
+            json=body,
         )
+        payload = timed(self.instrumentation, "plan", "decode", loads, response.content)
+        if plan_cache is not None:
+            plan_cache.put(src, dst, n_paths, payload)
+        return payload, None
+
+    def _map_pairs(
+        self,
+        fn: Callable[[Coordinate, Coordinate], Any],
+        pairs: Iterable[Tuple[Coordinate, Coordinate]],
+        max_workers: int,
+        ordered: bool,
+    ) -> Iterator[Tuple[int, Coordinate, Coordinate, Any, Optional[Exception]]]:
+        """Runs `fn` over `pairs` in a thread pool, keeping a bounded window of
+        pairs in flight, and yields (index, src, dst, result, error)."""
+
+        def call(index: int, src: Coordinate, dst: Coordinate) -> Tuple:
+            try:
+                return index, src, dst, fn(src, dst), None
+            except Exception as e:
+                return index, src, dst, None, e
+
+        indexed_pairs = enumerate(pairs)
+        window = 2 * max_workers
+        pending = {}
+        buffered: Dict[int, Tuple] = {}
+        next_index = 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+            def fill() -> None:
+                n = window - len(pending) - len(buffered)
+                for index, (src, dst) in itertools.islice(indexed_pairs, max(n, 0)):
+                    pending[executor.submit(call, index, src, dst)] = index
+
+            try:
+                fill()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = pending.pop(future)
+                        if ordered:
+                            buffered[index] = future.result()
+                        else:
+                            yield future.result()
+                    while next_index in buffered:
+                        yield buffered.pop(next_index)
+                        next_index += 1
+                    fill()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def plan_many(
+        self,
+        pairs: Iterable[Tuple[Coordinate, Coordinate]],
+        max_workers: int = 8,
+        ordered: bool = True,
+    ) -> Iterator[PlanResult]:
+        """Plans routes for many (src, dst) pairs concurrently.
+
+        Requests are spread over a thread pool sharing this session's
+        connection pool; size `pool_maxsize` to at least `max_workers`.
+        Failures are returned as `PlanResult`s with `error` set instead of
+        aborting the batch.
+
+        Args:
+            pairs (Iterable[Tuple[Coordinate, Coordinate]]): (src, dst) pairs
+            max_workers (int, optional): Number of worker threads. Defaults to 8.
+            ordered (bool, optional): Yield results in input order, otherwise
+                in completion order. Defaults to True.
+
+        Yields:
+            PlanResult: One result per input pair
+        """
+        for index, src, dst, plan, error in self._map_pairs(
+            self.plan, pairs, max_workers, ordered
+        ):
+            if error is not None:
+                self.logger.warning("[plan_many] Pair %d failed: %r", index, error)
+            yield PlanResult(index=index, src=src, dst=dst, plan=plan, error=error)
+
+    def _plan_totals(
+        self, src: Coordinate, dst: Coordinate
+    ) -> Tuple[int, int, Optional[float]]:
+        payload, age = self._plan_payload(src, dst)
+        seconds, length = route_totals(payload)
+        return seconds, length, time.time() - age if age is not None else None
+
+    def matrix(
+        self,
+        origins: Sequence[Coordinate],
+        destinations: Sequence[Coordinate],
+        max_workers: int = 8,
+        symmetric: bool = False,
+    ) -> TravelMatrix:
+        """Builds a travel time and distance matrix between every origin and
+        destination.
+
+        Each distinct pair is requested once and only `totalSeconds` and
+        `totalLength` are read from the response, so no route geometry is
+        built. Failed cells are marked `ERROR` in `TravelMatrix.status`, with
+        the exception kept in `TravelMatrix.errors`.
+
+        Args:
+            origins (Sequence[Coordinate]): Row coordinates
+            destinations (Sequence[Coordinate]): Column coordinates
+            max_workers (int, optional): Number of worker threads. Defaults to 8.
+            symmetric (bool, optional): Assume A->B takes as long as B->A and
+                request only one of them. Defaults to False.
+
+        Returns:
+            TravelMatrix: Durations in seconds and distances in meters
+        """
+        return self.refresh_matrix(
+            TravelMatrix(origins, destinations),
+            max_workers=max_workers,
+            symmetric=symmetric,
+        )
+
+    def refresh_matrix(
+        self,
+        matrix: TravelMatrix,
+        max_age: Optional[float] = None,
+        max_workers: int = 8,
+        symmetric: bool = False,
+    ) -> TravelMatrix:
+        """Re-queries the cells of `matrix` that are pending, failed, or older
+        than `max_age` seconds, leaving the others untouched.
+
+        Returns:
+            TravelMatrix: `matrix`, updated in place
+        """
+        groups = []
+        for key, cells in matrix.unique_pairs(matrix.stale(max_age), symmetric):
+            if key[:2] == key[2:]:
+                for i, j in cells:
+                    matrix.set(i, j, 0, 0)
+            else:
+                groups.append(cells)
+
+        pairs = [
+            (matrix.origins[i], matrix.destinations[j])
+            for i, j in (cells[0] for cells in groups)
+        ]
+        for index, _, _, totals, error in self._map_pairs(
+            self._plan_totals, pairs, max_workers, ordered=False
+        ):
+            for i, j in groups[index]:
+                if error is None:
+                    matrix.set(i, j, *totals)
+                else:
+                    matrix.fail(i, j, error)
+        return matrix
+
+    def departures(
+        self,
+        src: Coordinate,
+        dst: Coordinate,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        step: int = 3600,
+        interval: Optional[int] = None,
+        arrive_at: Optional[bool] = None,
+        max_workers: int = 8,
+    ) -> DepartureSeries:
+        """Travel time from `src` to `dst` by departure time, with as few
+        requests as the server's `etaHistograms` allow.
+
+        The first request departs now and fills the slot `now` falls in and
+        every slot its histogram covers. Later departures are then picked so
+        that their histograms should cover the remaining gaps, and only slots
+        still missing after that are requested one by one. Both rounds run
+        concurrently. Past slots no histogram covers stay missing.
+
+        Args:
+            src (Coordinate): Origin
+            dst (Coordinate): Destination
+            start (float, optional): Unix time of the first slot. Defaults to
+                now, rounded down to `step`.
+            end (float, optional): Unix time the slots end at, exclusive.
+                Defaults to 24 hours after `start`.
+            step (int, optional): Seconds between slots. Defaults to 3600.
+            interval (int, optional): Planner `interval` field, see `plan`.
+            arrive_at (bool, optional): Planner `arriveAt` field, see `plan`.
+            max_workers (int, optional): Concurrent requests. Defaults to 8.
+
+        Returns:
+            DepartureSeries: Minutes per slot, with where each came from
+        """
+        if self.locale is None:
+            self._infer_locale(near=src)
+        now = time.time()
+        if start is None:
+            start = now - now % step
+        if end is None:
+            end = start + 24 * 60 * 60
+        slots = max(math.ceil((end - start) / step), 1)
+        series = DepartureSeries(src, dst, int(start), step, slots)
+
+        def fetch(depart: Optional[int]) -> Tuple[int, List[Tuple[int, int]]]:
+            at = None if depart is None else max(round((depart - now) / 60), 0)
+            payload, _ = self._plan_payload(
+                src, dst, 1, interval=interval, arrive_at=arrive_at, at=at
+            )
+            return route_etas(payload)
+
+        def fetch_slot(depart: int) -> Tuple[int, Any, Optional[Exception]]:
+            try:
+                return depart, fetch(depart), None
+            except Exception as e:
+                return depart, None, e
+
+        total, histogram = fetch(None)
+        series.requests += 1
+        # `now` is usually well past the time of the slot it falls in
+        current = series.containing(now)
+        if current is not None:
+            series.fill(series.time(current), total / 60, REQUESTED)
+        series.fill_histogram(histogram)
+        # how far a histogram reaches around its departure time
+        etas = [eta for eta, _ in histogram]
+        before = max(now - min(etas), 0) if etas else 0
+        after = max(max(etas) - now, 0) if etas else 0
+
+        requested: Set[int] = set()
+        for covering in (True, False):
+            gaps = [t for t in series.gaps() if t >= now and t not in requested]
+            if not gaps:
+                break
+            if covering:
+                gaps = covering_departures(gaps, before, after)
+            requested.update(gaps)
+            series.requests += len(gaps)
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(gaps))) as pool:
+                for depart, result, error in pool.map(fetch_slot, gaps):
+                    if error is not None:
+                        self.logger.warning(
+                            "[departures] Slot %d failed: %r", depart, error
+                        )
+                        series.errors += 1
+                        continue
+                    total, histogram = result
+                    series.fill(depart, total / 60, REQUESTED)
+                    series.fill_histogram(histogram)
+        return series
+
+    def sweep(
+        self,
+        query: str,
+        region: ViewBox,
+        tile_km: float = 50,
+        saturation: int = 10,
+        max_depth: int = 6,
+        max_workers: int = 8,
+        stats: Optional[SweepStats] = None,
+    ) -> Iterator[WazeLocation]:
+        """Runs `query` over every tile of `region`, subdividing dense tiles.
+
+        The region is tiled into viewboxes about `tile_km` wide, which are
+        geocoded concurrently. A tile that returns `saturation` or more
+        results was probably truncated by the server, so it is split into
+        four and searched again, down to `max_depth` levels. Sparse areas
+        therefore cost one request per tile and only dense ones get a fine
+        grid.
+
+        Args:
+            query (str): Search text
+            region (ViewBox): Area to cover
+            tile_km (float, optional): Width of the initial tiles. Defaults to 50.
+            saturation (int, optional): Result count treated as a truncated
+                response. Defaults to 10.
+            max_depth (int, optional): Maximum subdivisions of a tile.
+                Defaults to 6.
+            max_workers (int, optional): Number of worker threads. Defaults to 8.
+            stats (SweepStats, optional): Filled with request counters as the
+                sweep runs. Defaults to None.
 
-        resp_json = response.json()
-        alternatives = resp_json.get("alternatives")
-        if not alternatives:
-            raise ValueError(f"Response is empty:\n{resp_json}")
+        Yields:
+            WazeLocation: Each distinct venue, as soon as it is first found
+        """
+        stats = stats if stats is not None else SweepStats()
+        seen: set = set()
+        tiles = [(tile, 0) for tile in tile_viewbox(region, tile_km)]
 
-        assert len(alternatives) == params.nPaths, "Only get the fastest route (1)"
-        route = alternatives[0]
-        plan = route.get("response")
-        if not plan:
-            raise ValueError(f"Plan is empty:\n{alternatives}")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
 
-        geo_path = [Coordinate(**o) for o in route.get("coords")]
+            def fill() -> None:
+                while tiles and len(pending) < 2 * max_workers:
+                    tile, depth = tiles.pop()
+                    future = executor.submit(self.geocode, query, viewbox=tile)
+                    pending[future] = tile, depth
+                    stats.requests += 1
 
-        return WazeTravelPlan(src=src, dst=dst, geoPath=geo_path, **plan)
+            try:
+                fill()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        tile, depth = pending.pop(future)
+                        try:
+                            locations = future.result()
+                        except Exception as e:
+                            stats.errors += 1
+                            self.logger.warning("[sweep] Tile %s failed: %r", tile, e)
+                            continue
+                        if len(locations) >= saturation and depth < max_depth:
+                            stats.saturated += 1
+                            stats.max_depth = max(stats.max_depth, depth + 1)
+                            tiles.extend((t, depth + 1) for t in split_viewbox(tile))
+                        for location in new_locations(locations, seen):
+                            stats.locations += 1
+                            yield location
+                    fill()
+            finally:
+                for future in pending:
+                    future.cancel()
+        self.logger.info("[sweep] %s", stats)